@@ -0,0 +1,157 @@
+"""
+Compression tier for old daily logs.
+
+Daily files pile up forever as plain text. The rotation job gzips every
+daily markdown file and journal older than N days in place
+(YYYY-MM-DD.md → YYYY-MM-DD.md.gz) and records the original and
+compressed sizes in daily/archive.json. Readers go through open_daily(),
+which falls back to the .gz file and decompresses it as a stream, so
+nothing else needs to know a day was archived.
+
+    python -m core.archive --days 30
+"""
+
+import re
+import gzip
+import json
+import time
+import shutil
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+DAILY_DIR = Path("memory") / "daily"
+ARCHIVE_INDEX = "archive.json"
+ARCHIVABLE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.(md|jsonl)$")
+READ_BLOCK = 1 << 20
+
+
+@dataclass
+class ArchiveReport:
+    files: int = 0
+    original_bytes: int = 0
+    compressed_bytes: int = 0
+    read_bytes: int = 0
+    read_seconds: float = 0.0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.compressed_bytes
+
+    @property
+    def read_throughput(self) -> float:
+        """Streaming decompression throughput in MB/s."""
+        return self.read_bytes / self.read_seconds / 1e6 if self.read_seconds else 0.0
+
+    def __str__(self) -> str:
+        if not self.files:
+            return "Nothing to archive."
+        ratio = self.compressed_bytes / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"Archived {self.files} files: {self.original_bytes / 1e6:.2f} MB → "
+            f"{self.compressed_bytes / 1e6:.2f} MB ({ratio:.0%}), saved {self.saved_bytes / 1e6:.2f} MB. "
+            f"Read-back throughput: {self.read_throughput:.1f} MB/s"
+        )
+
+
+def resolve(path: Path) -> Path | None:
+    """The file for a daily log path, plain or archived."""
+    if path.exists():
+        return path
+    archived = path.with_name(path.name + ".gz")
+    return archived if archived.exists() else None
+
+
+def open_daily(path: Path) -> BinaryIO:
+    """Open a daily log for binary reading, decompressing archived files as a stream."""
+    resolved = resolve(path)
+    if resolved is None:
+        raise FileNotFoundError(path)
+    if resolved.suffix == ".gz":
+        return gzip.open(resolved, "rb")
+    return open(resolved, "rb")
+
+
+def read_text(path: Path) -> str:
+    with open_daily(path) as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def load_index(daily_dir: Path) -> dict:
+    index_file = daily_dir / ARCHIVE_INDEX
+    if index_file.exists():
+        return json.loads(index_file.read_text())
+    return {}
+
+
+def original_size(path: Path) -> int:
+    """Uncompressed size of a daily log, plain or archived."""
+    if path.exists():
+        return path.stat().st_size
+    entry = load_index(path.parent).get(path.name)
+    if entry:
+        return entry["original"]
+    with open_daily(path) as f:
+        return sum(len(block) for block in iter(lambda: f.read(READ_BLOCK), b""))
+
+
+def compress_old(daily_dir: Path = DAILY_DIR, days: int = 30, today: date | None = None) -> ArchiveReport:
+    """Gzip daily files older than `days` days and measure read-back throughput."""
+    cutoff = ((today or date.today()) - timedelta(days=days)).isoformat()
+    index = load_index(daily_dir)
+    report = ArchiveReport()
+    archived = []
+
+    for path in sorted(daily_dir.iterdir()):
+        match = ARCHIVABLE.match(path.name)
+        if not match or match.group(1) >= cutoff:
+            continue
+
+        target = path.with_name(path.name + ".gz")
+        tmp = target.with_name(target.name + ".tmp")
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst, READ_BLOCK)
+        tmp.rename(target)
+
+        original, compressed = path.stat().st_size, target.stat().st_size
+        path.unlink()
+        index[path.name] = {
+            "archive": target.name,
+            "original": original,
+            "compressed": compressed,
+            "archived_at": date.today().isoformat(),
+        }
+        report.files += 1
+        report.original_bytes += original
+        report.compressed_bytes += compressed
+        archived.append(target)
+
+    if archived:
+        (daily_dir / ARCHIVE_INDEX).write_text(json.dumps(index, indent=2, sort_keys=True) + "\n")
+
+    start = time.perf_counter()
+    for target in archived:
+        with gzip.open(target, "rb") as f:
+            for block in iter(lambda: f.read(READ_BLOCK), b""):
+                report.read_bytes += len(block)
+    report.read_seconds = time.perf_counter() - start
+
+    logger.info(str(report))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress daily logs older than N days")
+    parser.add_argument("--days", type=int, default=30, help="Keep the last N days uncompressed")
+    parser.add_argument("--dir", default=str(DAILY_DIR), help="Daily log directory")
+    args = parser.parse_args()
+    print(compress_old(Path(args.dir), args.days))
+
+
+if __name__ == "__main__":
+    main()
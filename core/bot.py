@@ -3,18 +3,31 @@ Discord Agent Swarm — Core Bot
 
 Connects agents to Discord, routes messages, handles mentions.
 Each agent defined in config/ becomes a listener in its assigned channels.
+
+Sharded mode (set SWARM_SHARD_COUNT):
+- SWARM_SHARD_ID=i  → this process runs shard i only; start one process per shard
+- no SWARM_SHARD_ID → one process runs every shard (AutoShardedClient)
+Either way, nodes coordinate through core.store.SharedStore.
 """
 
 import os
 import asyncio
 import logging
+import sqlite3
 from pathlib import Path
 
 import discord
 import yaml
 
+from core.bus import AgentBus, Delegation, parse_delegations
+from core.knowledge import KnowledgeBase
 from core.llm import LLMClient
 from core.memory import MemoryManager
+from core.search import backfill
+from core.usage import BudgetExceeded
+from core.seen import SeenMessages
+from core.store import SharedStore, node_id
+from core.summary import DEFAULT_MODEL, DailySummarizer
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +35,32 @@ logger = logging.getLogger(__name__)
 class AgentBot(discord.Client):
     """A Discord bot that hosts multiple AI agents."""
 
-    def __init__(self, config_dir: str = "config"):
+    def __init__(
+        self,
+        config_dir: str = "config",
+        store: SharedStore | None = None,
+        **options,
+    ):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
-        super().__init__(intents=intents)
+        super().__init__(intents=intents, **options)
 
+        self.store = store
+        self.node = node_id(options.get("shard_id"))
         self.config_dir = Path(config_dir)
         self.agents: dict[str, dict] = {}
         self.llm = LLMClient()
         self.memory = MemoryManager()
+        self.summarizer = DailySummarizer(
+            self.memory.journal,
+            self.llm,
+            model=os.getenv("SWARM_SUMMARY_MODEL", DEFAULT_MODEL),
+            threshold=int(os.getenv("SWARM_SUMMARY_THRESHOLD", "32000")),
+        )
+        self.knowledge = KnowledgeBase(budget=int(os.getenv("SWARM_KNOWLEDGE_BUDGET", "600")))
+        self.bus = AgentBus(self._handle_delegation)
+        self.seen = SeenMessages()
         self._load_agents()
 
     def _load_agents(self):
@@ -43,8 +72,23 @@ class AgentBot(discord.Client):
                 config = yaml.safe_load(f)
             name = config["name"].lower()
             self.agents[name] = config
+            self.bus.register(name)
             logger.info(f"Loaded agent: {config['name']} ({config['model']})")
 
+    async def setup_hook(self):
+        await self.knowledge.warm()
+        try:
+            # Catch up on days written while the bot was down; later writes are indexed as they happen
+            await asyncio.to_thread(backfill, self.memory.memory_dir)
+        except sqlite3.Error as e:
+            logger.warning(f"Search index backfill failed: {e}")
+        await self.bus.start()
+
+    async def close(self):
+        await self.bus.stop()
+        self.llm.usage.flush()
+        await super().close()
+
     async def on_ready(self):
         logger.info(f"Swarm online: {self.user} with {len(self.agents)} agents")
         for name, agent in self.agents.items():
@@ -55,6 +99,20 @@ class AgentBot(discord.Client):
         if message.author == self.user:
             return
 
+        # Gateway resumes can replay a message we've already handled
+        if self.seen.check(message.id):
+            logger.info(
+                f"Suppressed duplicate delivery of message {message.id} "
+                f"({self.seen.suppressed} suppressed so far)"
+            )
+            return
+
+        # In sharded mode another node may already own this message. The claim
+        # may wait on another node's write lock: keep it off the event loop
+        if self.store and not await asyncio.to_thread(self.store.claim, f"message:{message.id}", self.node):
+            logger.debug(f"Message {message.id} already claimed by another node")
+            return
+
         # Determine which agent(s) should respond
         channel_name = message.channel.name if hasattr(message.channel, "name") else "dm"
         content = message.content.lower()
@@ -84,34 +142,108 @@ class AgentBot(discord.Client):
 
     async def _handle_message(self, agent: dict, message: discord.Message):
         """Process a message with the specified agent."""
-        # Load memory context
-        context = self.memory.get_context(agent)
-
-        # Build the prompt
-        system = agent.get("system_prompt", "You are a helpful assistant.")
-        system += f"\n\nMemory context:\n{context}"
+        channel_name = message.channel.name if hasattr(message.channel, "name") else "dm"
 
-        # Get response from LLM
-        async with message.channel.typing():
-            response = await self.llm.chat(
-                model=agent["model"],
-                system=system,
-                message=message.content,
-                tools=agent.get("tools", []),
-            )
+        try:
+            async with message.channel.typing():
+                response = await self._generate(agent, message.content, channel_name)
+        except BudgetExceeded as e:
+            logger.warning(str(e))
+            await message.channel.send(f"**{agent['name']}** is out of budget for now.")
+            return
+        response, delegations = parse_delegations(response)
 
         # Save to daily memory
-        self.memory.log_interaction(
+        record = self.memory.log_interaction(
             agent=agent["name"],
-            channel=message.channel.name if hasattr(message.channel, "name") else "dm",
+            channel=channel_name,
             user=str(message.author),
             message=message.content,
             response=response,
         )
+        self.summarizer.schedule(record["ts"][:10])
 
         # Send response (split if too long for Discord)
-        for chunk in self._split_message(response):
-            await message.channel.send(chunk)
+        if response:
+            await self._send(message.channel, response)
+
+        if delegations:
+            sender = agent["name"].lower()
+            await asyncio.gather(*(
+                self._delegate(sender, target, task, message.channel, (sender,))
+                for target, task in delegations
+            ))
+
+    async def _generate(self, agent: dict, content: str, channel: str) -> str:
+        """Run one LLM turn for an agent with its memory context."""
+        context = self.memory.get_context(agent)
+
+        system = agent.get("system_prompt", "You are a helpful assistant.")
+        system += f"\n\nMemory context:\n{context}"
+        entities = self.knowledge.context(content, agent.get("knowledge_budget"))
+        if entities:
+            system += f"\n\nEntities mentioned (from the knowledge graph):\n{entities}"
+
+        return await self.llm.chat(
+            model=agent["model"],
+            system=system,
+            message=content,
+            tools=agent.get("tools", []),
+            agent=agent["name"],
+            channel=channel,
+            budget=agent.get("budget"),
+            cascade=agent.get("cascade"),
+        )
+
+    async def _delegate(self, sender: str, target: str, task: str, channel, chain: tuple[str, ...]):
+        """Hand a task to another agent over the bus and mirror it to Discord."""
+        channel_name = channel.name if hasattr(channel, "name") else "dm"
+        sender_name = self.agents[sender]["name"]
+
+        if not self.bus.has_agent(target):
+            await channel.send(f"**{sender_name}:** can't delegate to unknown agent `{target}`")
+            return
+
+        target_name = self.agents[target]["name"]
+        await self._send(channel, f"**{sender_name} → {target_name}:** {task}")
+        try:
+            reply = await self.bus.delegate(sender, target, task, channel_name, chain, origin=channel)
+        except Exception as e:
+            logger.warning(f"Delegation {sender} → {target} failed: {e}")
+            await channel.send(f"**{target_name}:** delegation failed ({e})")
+            return
+        if reply:
+            await self._send(channel, f"**{target_name}:** {reply}")
+
+    async def _handle_delegation(self, delegation: Delegation) -> str:
+        """Bus handler: run the target agent on a delegated task."""
+        agent = self.agents[delegation.target]
+        sender_name = self.agents[delegation.sender]["name"]
+
+        response = await self._generate(
+            agent, f"Task from {sender_name}: {delegation.task}", delegation.channel
+        )
+        response, delegations = parse_delegations(response)
+
+        record = self.memory.log_interaction(
+            agent=agent["name"],
+            channel=delegation.channel,
+            user=sender_name,
+            message=delegation.task,
+            response=response,
+        )
+        self.summarizer.schedule(record["ts"][:10])
+
+        # Nested delegations are mirrored like top-level ones; the bus refuses loops
+        chain = delegation.chain + (delegation.target,)
+        for target, task in delegations:
+            await self._delegate(delegation.target, target, task, delegation.origin, chain)
+
+        return response
+
+    async def _send(self, channel, text: str):
+        for chunk in self._split_message(text):
+            await channel.send(chunk)
 
     @staticmethod
     def _split_message(text: str, limit: int = 2000) -> list[str]:
@@ -132,13 +264,24 @@ class AgentBot(discord.Client):
         return chunks
 
 
+class ShardedAgentBot(AgentBot, discord.AutoShardedClient):
+    """AgentBot running every shard in one process."""
+
+
 def main():
     logging.basicConfig(level=logging.INFO)
     token = os.getenv("DISCORD_BOT_TOKEN")
     if not token:
         raise ValueError("DISCORD_BOT_TOKEN not set. Copy .env.example to .env and add your token.")
 
-    bot = AgentBot()
+    shard_count = os.getenv("SWARM_SHARD_COUNT")
+    shard_id = os.getenv("SWARM_SHARD_ID")
+    if not shard_count:
+        bot = AgentBot()
+    elif shard_id:
+        bot = AgentBot(store=SharedStore(), shard_id=int(shard_id), shard_count=int(shard_count))
+    else:
+        bot = ShardedAgentBot(store=SharedStore(), shard_count=int(shard_count))
     bot.run(token)
 
 
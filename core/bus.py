@@ -0,0 +1,154 @@
+"""
+In-process delegation bus for agents.
+
+Delegating through Discord means a send, a gateway echo and another
+routing pass for every hop. When the target agent lives in the same
+process we can skip all of that: the delegation goes straight onto the
+target's queue and the sender awaits a reply future.
+
+Discord still gets a mirrored transcript so every hop stays auditable.
+
+Each delegation runs as its own task, so an agent busy waiting on a
+delegation of its own still takes new ones. With one delegation at a time
+per agent, two chains crossing the same agents in opposite orders
+(A → B → C while D → C → B) would each wait on the other's busy inbox
+until the timeout.
+
+Agents delegate with a line of the form:
+
+    DELEGATE researcher: find the latest release notes for discord.py
+"""
+
+import re
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DELEGATE_PATTERN = re.compile(r"^\s*DELEGATE\s+@?([\w-]+)\s*:\s*(.+?)\s*$", re.MULTILINE)
+
+
+@dataclass
+class Delegation:
+    """A task handed from one agent to another."""
+    sender: str
+    target: str
+    task: str
+    channel: str
+    chain: tuple[str, ...] = ()
+    origin: Any = None
+    created: float = field(default_factory=time.monotonic)
+    reply: Optional[asyncio.Future] = None
+
+
+def parse_delegations(text: str) -> tuple[str, list[tuple[str, str]]]:
+    """Split DELEGATE lines out of an agent response.
+
+    Returns the response with those lines removed and a list of
+    (target, task) pairs in the order they appeared.
+    """
+    delegations = [(m.group(1).lower(), m.group(2)) for m in DELEGATE_PATTERN.finditer(text)]
+    if not delegations:
+        return text, []
+    remaining = DELEGATE_PATTERN.sub("", text)
+    remaining = re.sub(r"\n{3,}", "\n\n", remaining).strip()
+    return remaining, delegations
+
+
+class AgentBus:
+    """Per-agent async queues with reply futures."""
+
+    def __init__(
+        self,
+        handler: Callable[[Delegation], Awaitable[str]],
+        max_depth: int = 3,
+        timeout: float = 300.0,
+    ):
+        self.handler = handler
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: list[asyncio.Task] = []
+        self._running: set[asyncio.Task] = set()
+
+    def register(self, name: str):
+        """Give an agent its own inbox."""
+        self._queues.setdefault(name, asyncio.Queue())
+
+    def has_agent(self, name: str) -> bool:
+        return name in self._queues
+
+    async def start(self):
+        """Start one worker per registered agent."""
+        for name, queue in self._queues.items():
+            self._workers.append(asyncio.create_task(self._serve(name, queue)))
+        logger.info(f"Delegation bus started for {len(self._queues)} agents")
+
+    async def stop(self):
+        tasks = [*self._workers, *self._running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+
+    async def delegate(
+        self,
+        sender: str,
+        target: str,
+        task: str,
+        channel: str,
+        chain: tuple[str, ...] = (),
+        origin: Any = None,
+    ) -> str:
+        """Queue a task for another agent and wait for its reply.
+
+        `chain` lists the agents already waiting on this delegation; a target
+        that is in the chain would start a loop, so it is refused.
+
+        `origin` is passed through untouched (e.g. the Discord channel to
+        mirror the transcript into).
+        """
+        if target not in self._queues:
+            raise ValueError(f"Unknown agent: {target}")
+        chain = chain or (sender,)
+        if target in chain:
+            raise RuntimeError(f"Delegation loop: {' → '.join(chain)} → {target}")
+        if len(chain) > self.max_depth:
+            raise RuntimeError(f"Delegation depth {len(chain)} exceeds limit of {self.max_depth}")
+
+        delegation = Delegation(
+            sender=sender,
+            target=target,
+            task=task,
+            channel=channel,
+            chain=chain,
+            origin=origin,
+            reply=asyncio.get_running_loop().create_future(),
+        )
+        await self._queues[target].put(delegation)
+        reply = await asyncio.wait_for(delegation.reply, timeout=self.timeout)
+        elapsed_ms = (time.monotonic() - delegation.created) * 1000
+        logger.info(f"Delegation {sender} → {target} answered in {elapsed_ms:.1f}ms")
+        return reply
+
+    async def _serve(self, name: str, queue: asyncio.Queue):
+        """Start every delegation in an agent's inbox as its own task."""
+        while True:
+            delegation = await queue.get()
+            task = asyncio.create_task(self._run(name, delegation))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            queue.task_done()
+
+    async def _run(self, name: str, delegation: Delegation):
+        try:
+            result = await self.handler(delegation)
+            if not delegation.reply.done():
+                delegation.reply.set_result(result)
+        except Exception as e:
+            logger.exception(f"Delegation to {name} failed")
+            if not delegation.reply.done():
+                delegation.reply.set_exception(e)
@@ -0,0 +1,252 @@
+"""
+Cheap-first model cascade.
+
+Most messages an agent sees are acknowledgements, quick lookups or
+status questions that don't need the agent's expensive model. With a
+`cascade` block in the agent YAML, each message is routed in two steps:
+
+1. A local heuristic scores how demanding the message looks (0.0-1.0).
+   Very low scores go to the cheap model outright; very high scores go
+   straight to the expensive model.
+2. Everything in between goes to the cheap model, which either answers
+   or replies with ESCALATE — in which case the expensive model answers.
+
+    cascade:
+      model: claude-3-5-haiku-latest
+      answer_below: 0.15     # cheap model answers, no escalation option
+      escalate_above: 0.6    # skip the cheap model entirely
+
+Escalation rate and estimated latency saved are logged periodically.
+
+Evaluate routing offline against recorded daily logs with stub models:
+    python -m core.cascade memory/daily/*.jsonl
+"""
+
+import re
+import time
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from core.archive import read_text
+from core.journal import Journal
+
+logger = logging.getLogger(__name__)
+
+ESCALATE = "ESCALATE"
+
+ESCALATION_INSTRUCTIONS = (
+    "\n\nIf answering this message well needs careful reasoning, a decision, "
+    "multi-step planning or delegation to another agent, reply with exactly "
+    f"{ESCALATE} and nothing else. Otherwise answer it directly."
+)
+
+TRIVIAL = re.compile(
+    r"^\s*(ok(ay)?|k|thanks?( you)?|thx|ty|cool|nice|great|got it|ack|yes|no|yep|nope|"
+    r"hi|hello|hey|gm|gn|lol|👍|🙏|✅)[\s!.]*$",
+    re.IGNORECASE,
+)
+DEMANDING = re.compile(
+    r"\b(why|how|plan|decide|decision|strategy|analy[sz]e|compare|evaluate|review|"
+    r"approve|design|trade-?offs?|prioriti[sz]e|debug|investigate|delegate|should we)\b",
+    re.IGNORECASE,
+)
+
+LOG_EVERY = 50
+
+
+def complexity_score(message: str) -> float:
+    """Heuristic 0.0-1.0 estimate of how much reasoning a message needs."""
+    text = message.strip()
+    if not text or TRIVIAL.match(text):
+        return 0.0
+
+    score = min(len(text) / 800, 0.4)
+    score += min(len(DEMANDING.findall(text)) * 0.2, 0.6)
+    if "```" in text:
+        score += 0.2
+    if text.count("?") > 1:
+        score += 0.1
+    if text.count("\n") >= 3:
+        score += 0.1
+    return min(score, 1.0)
+
+
+@dataclass
+class CascadeStats:
+    calls: int = 0
+    cheap: int = 0           # answered by the cheap model
+    escalated: int = 0       # cheap model said ESCALATE
+    direct: int = 0          # heuristic sent it straight to the expensive model
+    cheap_seconds: float = 0.0
+    expensive_seconds: float = 0.0
+    expensive_calls: int = 0
+    wasted_seconds: float = 0.0  # cheap-model time spent before an escalation
+
+    @property
+    def escalation_rate(self) -> float:
+        return (self.escalated + self.direct) / self.calls if self.calls else 0.0
+
+    @property
+    def latency_saved(self) -> float:
+        """Estimated seconds saved vs. always using the expensive model."""
+        if not self.expensive_calls:
+            return 0.0
+        avg_expensive = self.expensive_seconds / self.expensive_calls
+        return self.cheap * avg_expensive - self.cheap_seconds - self.wasted_seconds
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} calls: {self.cheap} cheap, {self.escalated} escalated, "
+            f"{self.direct} direct — escalation rate {self.escalation_rate:.0%}, "
+            f"~{self.latency_saved:.1f}s saved"
+        )
+
+
+Call = Callable[[str, str, str], Awaitable[str]]  # (model, system, message) -> text
+
+
+class Cascade:
+    """Routes one agent's messages between a cheap and an expensive model."""
+
+    def __init__(self, config: dict, clock: Callable[[], float] = time.perf_counter):
+        self.model = config["model"]
+        self.answer_below = config.get("answer_below", 0.15)
+        self.escalate_above = config.get("escalate_above", 0.6)
+        self.clock = clock
+        self.stats = CascadeStats()
+
+    async def run(self, call: Call, expensive_model: str, system: str, message: str) -> tuple[str, str]:
+        """Answer a message. Returns (text, route) with route cheap|escalated|direct."""
+        self.stats.calls += 1
+        score = complexity_score(message)
+
+        if score >= self.escalate_above:
+            self.stats.direct += 1
+            text = await self._expensive(call, expensive_model, system, message)
+            route = "direct"
+        else:
+            allow_escalation = score >= self.answer_below
+            cheap_system = system + ESCALATION_INSTRUCTIONS if allow_escalation else system
+            start = self.clock()
+            text = await call(self.model, cheap_system, message)
+            elapsed = self.clock() - start
+
+            if allow_escalation and text.strip().upper().startswith(ESCALATE):
+                self.stats.escalated += 1
+                self.stats.wasted_seconds += elapsed
+                text = await self._expensive(call, expensive_model, system, message)
+                route = "escalated"
+            else:
+                self.stats.cheap += 1
+                self.stats.cheap_seconds += elapsed
+                route = "cheap"
+
+        if self.stats.calls % LOG_EVERY == 0:
+            logger.info(f"Cascade {self.model}: {self.stats.summary()}")
+        return text, route
+
+    async def _expensive(self, call: Call, model: str, system: str, message: str) -> str:
+        start = self.clock()
+        text = await call(model, system, message)
+        self.stats.expensive_seconds += self.clock() - start
+        self.stats.expensive_calls += 1
+        return text
+
+
+# --- Offline evaluation ---
+
+
+class FakeClock:
+    """Simulated clock so stub latencies don't need real sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubModels:
+    """Stand-in provider with fixed latencies.
+
+    The cheap stub escalates exactly when the recorded transcript says the
+    message needed a long answer, which is our proxy label for "needed the
+    expensive model".
+    """
+
+    def __init__(self, clock: FakeClock, cheap_latency: float, expensive_latency: float,
+                 cheap_model: str, needs_expensive: dict[str, bool]):
+        self.clock = clock
+        self.cheap_latency = cheap_latency
+        self.expensive_latency = expensive_latency
+        self.cheap_model = cheap_model
+        self.needs_expensive = needs_expensive
+
+    async def __call__(self, model: str, system: str, message: str) -> str:
+        if model == self.cheap_model:
+            self.clock.now += self.cheap_latency
+            if ESCALATE in system and self.needs_expensive.get(message):
+                return ESCALATE
+            return "ok"
+        self.clock.now += self.expensive_latency
+        return "considered answer"
+
+
+def load_transcripts(paths: list[Path]) -> list[tuple[str, str]]:
+    """Extract (message, response) pairs from journals or markdown daily logs."""
+    entry = re.compile(r"^### .*\n\*\*[^*]+:\*\* (.*)\n\*\*[^*]+:\*\* (.*)$", re.MULTILINE)
+    pairs = []
+    for path in paths:
+        if ".jsonl" in path.suffixes:
+            records, _ = Journal(path.parent).tail(path.name.split(".")[0])
+            pairs.extend((r["message"], r["response"]) for r in records)
+        else:
+            pairs.extend(entry.findall(read_text(path.with_suffix("") if path.suffix == ".gz" else path)))
+    return pairs
+
+
+async def evaluate(pairs: list[tuple[str, str]], config: dict, expensive_model: str = "expensive",
+                   cheap_latency: float = 0.8, expensive_latency: float = 6.0,
+                   long_answer: int = 200) -> tuple[CascadeStats, int]:
+    """Replay transcripts through a cascade with stub models.
+
+    Returns the stats and the number of messages the cheap model answered
+    although the transcript suggests they needed the expensive model.
+    """
+    clock = FakeClock()
+    labels = {message: len(response) >= long_answer for message, response in pairs}
+    call = StubModels(clock, cheap_latency, expensive_latency, config["model"], labels)
+    cascade = Cascade(config, clock=clock)
+
+    missed = 0
+    for message, _ in pairs:
+        _, route = await cascade.run(call, expensive_model, "system", message)
+        if route == "cheap" and labels[message]:
+            missed += 1
+    return cascade.stats, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate cascade routing on recorded daily logs")
+    parser.add_argument("files", nargs="+", help="Daily log files")
+    parser.add_argument("--answer-below", type=float, default=0.15)
+    parser.add_argument("--escalate-above", type=float, default=0.6)
+    parser.add_argument("--cheap-latency", type=float, default=0.8)
+    parser.add_argument("--expensive-latency", type=float, default=6.0)
+    args = parser.parse_args()
+
+    pairs = load_transcripts([Path(f) for f in args.files])
+    config = {"model": "cheap", "answer_below": args.answer_below, "escalate_above": args.escalate_above}
+    stats, missed = asyncio.run(evaluate(
+        pairs, config, cheap_latency=args.cheap_latency, expensive_latency=args.expensive_latency
+    ))
+    print(stats.summary())
+    print(f"Answered cheaply but needed the expensive model: {missed}/{len(pairs)}")
+
+
+if __name__ == "__main__":
+    main()
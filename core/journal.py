@@ -0,0 +1,224 @@
+"""
+Structured interaction journal.
+
+The markdown daily files are for humans: free-form, truncated to 200
+characters, and painful to re-parse. Every interaction is also written to
+an append-only JSONL journal with the full text:
+
+    memory/daily/YYYY-MM-DD.jsonl   one record per interaction
+    memory/daily/YYYY-MM-DD.idx     fixed-width offset index
+
+Each index record is (timestamp, byte offset, crc32(agent), crc32(channel)),
+so a reader can binary-search to a time in O(log n) and skip records for
+other agents or channels without decoding them. The markdown daily file
+is a rendered view of the journal (see render_entry / render_day).
+"""
+
+import os
+import json
+import zlib
+import fcntl
+import struct
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from core.archive import open_daily, resolve
+
+logger = logging.getLogger(__name__)
+
+# timestamp (epoch seconds), byte offset into the .jsonl, crc32(agent), crc32(channel)
+INDEX_RECORD = struct.Struct("<dQII")
+
+
+def _crc(value: str) -> int:
+    return zlib.crc32(value.lower().encode())
+
+
+def render_entry(record: dict, limit: int | None = 200) -> str:
+    """Render a journal record in the daily markdown format."""
+    message, response = record["message"], record["response"]
+    if limit is not None:
+        message, response = message[:limit], response[:limit]
+    time = record["ts"][11:16]
+    return (
+        f"\n### {time} — {record['agent']} in #{record['channel']}\n"
+        f"**{record['user']}:** {message}\n"
+        f"**{record['agent']}:** {response}\n"
+    )
+
+
+class Journal:
+    """Append-only JSONL interaction log with a per-day offset index."""
+
+    def __init__(self, daily_dir: Path):
+        self.daily_dir = daily_dir
+
+    def path(self, day: str) -> Path:
+        return self.daily_dir / f"{day}.jsonl"
+
+    def index_path(self, day: str) -> Path:
+        return self.daily_dir / f"{day}.idx"
+
+    def exists(self, day: str) -> bool:
+        return resolve(self.path(day)) is not None
+
+    def append(self, agent: str, channel: str, user: str, message: str, response: str) -> dict:
+        """Write one interaction. Returns the stored record."""
+        now = datetime.now()
+        day = now.strftime("%Y-%m-%d")
+        path = self.path(day)
+
+        with open(path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Timestamp under the lock so the index stays sorted across processes
+                now = datetime.now()
+                record = {
+                    "ts": now.isoformat(timespec="seconds"),
+                    "agent": agent,
+                    "channel": channel,
+                    "user": user,
+                    "message": message,
+                    "response": response,
+                }
+                offset = os.fstat(f.fileno()).st_size
+                f.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+                f.flush()
+                with open(self.index_path(day), "ab") as idx:
+                    idx.write(INDEX_RECORD.pack(now.timestamp(), offset, _crc(agent), _crc(channel)))
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return record
+
+    def read(
+        self,
+        day: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        agent: str | None = None,
+        channel: str | None = None,
+    ) -> list[dict]:
+        """Records for one day, filtered by time range, agent and channel."""
+        path = self.path(day)
+        if not self.exists(day):
+            return []
+        if path.exists():
+            self._repair_index(day)  # archived days are immutable
+        entries = self._index_from(day, since.timestamp() if since is not None else None)
+
+        agent_crc = _crc(agent) if agent else None
+        channel_crc = _crc(channel.lstrip("#")) if channel else None
+        until_ts = until.timestamp() if until is not None else None
+
+        records = []
+        with open_daily(path) as f:
+            for ts, offset, a_crc, c_crc in entries:
+                if until_ts is not None and ts > until_ts:
+                    break
+                if agent_crc is not None and a_crc != agent_crc:
+                    continue
+                if channel_crc is not None and c_crc != channel_crc:
+                    continue
+                f.seek(offset)
+                record = json.loads(f.readline())
+                # crc32 can collide; confirm on the decoded record
+                if agent and record["agent"].lower() != agent.lower():
+                    continue
+                if channel and record["channel"].lower() != channel.lstrip("#").lower():
+                    continue
+                records.append(record)
+        return records
+
+    def tail(self, day: str, offset: int = 0) -> tuple[list[dict], int]:
+        """Records appended after a byte offset, and the offset to resume from."""
+        records = []
+        for offset, record in self.scan(day, offset):
+            records.append(record)
+        return records, offset
+
+    def scan(self, day: str, offset: int = 0) -> Iterator[tuple[int, dict]]:
+        """Yield (offset just past the record, record) for complete records after an offset."""
+        path = self.path(day)
+        if not self.exists(day):
+            return
+        with open_daily(path) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write in progress
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt journal line in {path.name}")
+                    continue
+                yield offset, record
+
+    def render_day(self, day: str, limit: int | None = 200, offset: int = 0) -> str:
+        """Regenerate the markdown daily view from the journal (from a byte offset on)."""
+        records, _ = self.tail(day, offset)
+        return f"# {day}\n" + "".join(render_entry(r, limit) for r in records)
+
+    def _index_from(self, day: str, since_ts: float | None) -> list[tuple[float, int, int, int]]:
+        """Index entries from the first one at or after since_ts, found by binary search."""
+        size = INDEX_RECORD.size
+        if not self.index_path(day).exists():
+            return []
+        with open(self.index_path(day), "rb") as idx:
+            count = os.fstat(idx.fileno()).st_size // size
+            lo, hi = 0, count
+            if since_ts is not None:
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    idx.seek(mid * size)
+                    if INDEX_RECORD.unpack(idx.read(size))[0] < since_ts:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+            idx.seek(lo * size)
+            return list(INDEX_RECORD.iter_unpack(idx.read((count - lo) * size)))
+
+    def _repair_index(self, day: str):
+        """Index journal records that were written without an index entry (e.g. after a crash)."""
+        if self._indexed_end(day) >= self.path(day).stat().st_size:
+            return
+
+        # Re-check under the writers' lock so we don't race an append in progress
+        with open(self.path(day), "ab") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                offset = self._indexed_end(day)
+                with open(self.path(day), "rb") as f, open(self.index_path(day), "ab") as idx:
+                    end = idx.tell()
+                    idx.truncate(end - end % INDEX_RECORD.size)  # drop a torn trailing record
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            record = json.loads(line)
+                            ts = datetime.fromisoformat(record["ts"]).timestamp()
+                            idx.write(INDEX_RECORD.pack(ts, offset, _crc(record["agent"]), _crc(record["channel"])))
+                        except (json.JSONDecodeError, KeyError, ValueError):
+                            pass
+                        offset += len(line)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _indexed_end(self, day: str) -> int:
+        """Byte offset in the journal just past the last indexed record."""
+        index_path = self.index_path(day)
+        size = INDEX_RECORD.size
+        if not index_path.exists():
+            return 0
+        with open(index_path, "rb") as idx:
+            count = os.fstat(idx.fileno()).st_size // size
+            if not count:
+                return 0
+            idx.seek((count - 1) * size)
+            last_offset = INDEX_RECORD.unpack(idx.read(size))[1]
+        with open(self.path(day), "rb") as f:
+            f.seek(last_offset)
+            return last_offset + len(f.readline())
@@ -0,0 +1,186 @@
+"""
+Entity knowledge in agent prompts.
+
+The engram knowledge graph (skills/engram: one markdown page per person,
+project or thing under memory/entities/) only reached an agent when it
+remembered to run `engram recall`. The context builder now adds what a
+message is about on its own:
+
+1. Every prompt is scanned for entity names and their aliases
+   (entities/.aliases.json) with a phrase table built from the engram
+   catalog: lowercased word sequences -> page, grouped by first word and
+   tried longest first. The scan costs one dict lookup per word of the
+   message, plus one per candidate length where a name could start,
+   however many entities there are. The table is rebuilt only when
+   pages are added or removed or the aliases change
+2. The catalog is swept once at startup, in a worker thread so the
+   event loop keeps running; after that engram's writers keep it current
+   (pages created by hand show up once any engram command has run), so
+   a message never pays for a directory scan
+3. Each entity mentioned contributes a compact summary of its page (the
+   title, type, facts and relations, without the timeline). Pages come
+   from RecallEngine.page, which keeps them until their file changes,
+   and a summary is redone only when its page was
+4. Summaries are added in order of first mention while they fit the token
+   budget (~4 characters per token):
+
+    SWARM_KNOWLEDGE_BUDGET=600    # tokens per prompt, 0 disables it
+
+   An agent's YAML can override it with `knowledge_budget`.
+
+skills/engram is optional: without it, or without entity pages, prompts
+are unchanged.
+"""
+
+import re
+import asyncio
+import logging
+
+try:
+    from skills.engram.catalog import Catalog
+    from skills.engram.config import load_config
+    from skills.engram.links import stem_of
+    from skills.engram.recall import RecallEngine
+except ImportError:  # bot deployed without the engram skill
+    RecallEngine = None
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+CHARS_PER_TOKEN = 4
+SUMMARY_LINES = 12   # non-blank lines of a page kept in its summary
+MIN_NAME_CHARS = 3   # shorter names ("X", "Go") match too much ordinary text
+
+
+def summarize(page: str, lines: int = SUMMARY_LINES) -> str:
+    """An entity page without its timeline, cut to `lines` non-blank lines."""
+    kept = []
+    timeline = False
+    for line in page.splitlines():
+        if line.startswith("## "):
+            timeline = line[3:].strip().lower() == "timeline"
+        elif line.startswith("# "):
+            timeline = False
+        if timeline or line.startswith("### [[") or not line.strip():
+            continue
+        kept.append(line)
+        if len(kept) == lines:
+            break
+    return "\n".join(kept)
+
+
+class Phrases:
+    """Multi-word names matched against text at word boundaries, longest first."""
+
+    def __init__(self, names: dict[str, str]):
+        self.phrases: dict[str, str] = {}      # lowercased words joined by spaces -> stem
+        self.lengths: dict[str, list[int]] = {}  # first word -> phrase lengths in words, longest first
+        for name, stem in names.items():
+            words = WORD.findall(name.lower())
+            if not words or sum(map(len, words)) < MIN_NAME_CHARS:
+                continue
+            self.phrases.setdefault(" ".join(words), stem)
+            self.lengths.setdefault(words[0], []).append(len(words))
+        for lengths in self.lengths.values():
+            lengths[:] = sorted(set(lengths), reverse=True)
+
+    def find(self, text: str) -> list[str]:
+        """Stems of the names in the text, in order of first mention."""
+        words = WORD.findall(text.lower())
+        found: dict[str, None] = {}
+        i = 0
+        while i < len(words):
+            step = 1
+            for n in self.lengths.get(words[i], ()):
+                stem = self.phrases.get(" ".join(words[i:i + n]))
+                if stem is not None:
+                    found.setdefault(stem)
+                    step = n
+                    break
+            i += step
+        return list(found)
+
+
+class KnowledgeBase:
+    """Summaries of the engram entities a message mentions, for the system prompt."""
+
+    def __init__(self, budget: int = 600):
+        self.budget = budget
+        self._engine = None
+        self._phrases: Phrases | None = None
+        self._version = None
+        self._aliases = None
+        self._summaries: dict[str, tuple[str, str]] = {}  # stem -> (page, summary)
+
+    @property
+    def engine(self):
+        """engram's RecallEngine, opened on first use (None without engram)."""
+        if self._engine is None and RecallEngine is not None:
+            self._engine = RecallEngine(load_config(), sweep=False)
+        return self._engine
+
+    def phrases(self) -> Phrases:
+        """Entity names and aliases, rebuilt when pages are added or removed or aliases change."""
+        engine = self.engine
+        aliases = engine.aliases()  # a new dict whenever .aliases.json changes
+        version = engine.catalog.names_version()
+        if self._phrases is None or version != self._version or aliases is not self._aliases:
+            stems = set(engine.catalog.stems().values())
+            names = {stem.replace("-", " "): stem for stem in stems}
+            for alias, canonical in aliases.items():
+                stem = stem_of(canonical)
+                if stem in stems:
+                    names.setdefault(alias, stem)
+            self._phrases = Phrases(names)
+            self._version = version
+            self._aliases = aliases
+        return self._phrases
+
+    async def warm(self):
+        """Sync the catalog and build the name table before the first message."""
+        if self.budget <= 0 or RecallEngine is None:
+            return
+        try:
+            # The sweep reads every changed page, so it runs off the event loop
+            await asyncio.to_thread(_reconcile, self.engine.config.entities_dir)
+            self.phrases()
+        except Exception as e:  # a broken engram workspace must not stop the bot
+            logger.warning(f"Entity lookup unavailable: {e}")
+
+    def summary(self, stem: str) -> str | None:
+        """A page's summary, redone only when RecallEngine.page returned a new text."""
+        try:
+            page = self.engine.page(stem)
+        except FileNotFoundError:
+            return None  # removed since the catalog last saw it
+        cached = self._summaries.get(stem)
+        if cached is None or cached[0] is not page:
+            cached = self._summaries[stem] = (page, summarize(page))
+        return cached[1]
+
+    def context(self, text: str, budget: int | None = None) -> str:
+        """Summaries of the entities mentioned in `text`, within `budget` tokens."""
+        budget = self.budget if budget is None else budget
+        if budget <= 0 or RecallEngine is None:
+            return ""
+        try:
+            mentioned = self.phrases().find(text)
+            parts, left = [], budget * CHARS_PER_TOKEN
+            for stem in mentioned:
+                summary = self.summary(stem)
+                if summary and len(summary) <= left:
+                    parts.append(summary)
+                    left -= len(summary) + 2
+        except Exception as e:
+            logger.warning(f"Entity lookup failed: {e}")
+            return ""
+        return "\n\n".join(parts)
+
+
+def _reconcile(entities_dir) -> int:
+    """Sweep the catalog on a connection of its own, so it can run in a worker thread."""
+    catalog = Catalog(entities_dir)
+    try:
+        return catalog.reconcile()
+    finally:
+        catalog.close()
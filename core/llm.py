@@ -2,6 +2,8 @@
 Unified LLM client — supports Anthropic, OpenAI, and Google.
 
 Routes to the right provider based on model name.
+Records token usage per call and enforces per-agent budgets (see core.usage).
+Optionally routes through a cheap-first cascade (see core.cascade).
 """
 
 import os
@@ -9,14 +11,19 @@ import asyncio
 import logging
 from typing import Optional
 
+from core.cascade import Cascade
+from core.usage import Usage, UsageTracker
+
 logger = logging.getLogger(__name__)
 
 
 class LLMClient:
     """Unified interface for multiple LLM providers."""
 
-    def __init__(self):
+    def __init__(self, usage: UsageTracker | None = None):
         self._clients = {}
+        self.usage = usage or UsageTracker()
+        self._cascades: dict[str, Cascade] = {}
         self._init_providers()
 
     def _init_providers(self):
@@ -62,8 +69,36 @@ class LLMClient:
         system: str,
         message: str,
         tools: Optional[list] = None,
+        agent: str = "unknown",
+        channel: str = "",
+        budget: Optional[dict] = None,
+        cascade: Optional[dict] = None,
     ) -> str:
-        """Send a message to the LLM and get a response."""
+        """Send a message to the LLM and get a response.
+
+        Usage is recorded against (agent, model, channel). If the agent is
+        over `budget`, the call is downgraded or refused (BudgetExceeded).
+        With a `cascade` config, a cheap model answers first and escalates
+        to `model` only when needed.
+        """
+        model = self.usage.select_model(agent, model, budget)
+
+        if cascade:
+            router = self._cascades.get(agent)
+            if router is None:
+                router = self._cascades[agent] = Cascade(cascade)
+
+            async def call(m: str, s: str, msg: str) -> str:
+                return await self._complete(m, s, msg, agent, channel)
+
+            text, route = await router.run(call, model, system, message)
+            logger.debug(f"{agent}: cascade route {route}")
+            return text
+
+        return await self._complete(model, system, message, agent, channel)
+
+    async def _complete(self, model: str, system: str, message: str, agent: str, channel: str) -> str:
+        """One provider call, with usage recorded."""
         provider = self._get_provider(model)
 
         if provider not in self._clients:
@@ -73,13 +108,16 @@ class LLMClient:
             )
 
         if provider == "anthropic":
-            return await self._chat_anthropic(model, system, message)
+            text, usage = await self._chat_anthropic(model, system, message)
         elif provider == "openai":
-            return await self._chat_openai(model, system, message)
+            text, usage = await self._chat_openai(model, system, message)
         elif provider == "google":
-            return await self._chat_google(model, system, message)
+            text, usage = await self._chat_google(model, system, message)
+
+        self.usage.record(agent, model, channel, usage)
+        return text
 
-    async def _chat_anthropic(self, model: str, system: str, message: str) -> str:
+    async def _chat_anthropic(self, model: str, system: str, message: str) -> tuple[str, Usage]:
         client = self._clients["anthropic"]
         response = await client.messages.create(
             model=model,
@@ -87,9 +125,15 @@ class LLMClient:
             system=system,
             messages=[{"role": "user", "content": message}],
         )
-        return response.content[0].text
+        u = response.usage
+        usage = Usage(
+            input_tokens=u.input_tokens + (getattr(u, "cache_creation_input_tokens", 0) or 0),
+            output_tokens=u.output_tokens,
+            cached_tokens=getattr(u, "cache_read_input_tokens", 0) or 0,
+        )
+        return response.content[0].text, usage
 
-    async def _chat_openai(self, model: str, system: str, message: str) -> str:
+    async def _chat_openai(self, model: str, system: str, message: str) -> tuple[str, Usage]:
         client = self._clients["openai"]
         response = await client.chat.completions.create(
             model=model,
@@ -98,9 +142,17 @@ class LLMClient:
                 {"role": "user", "content": message},
             ],
         )
-        return response.choices[0].message.content
+        u = response.usage
+        details = getattr(u, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        usage = Usage(
+            input_tokens=u.prompt_tokens - cached,
+            output_tokens=u.completion_tokens,
+            cached_tokens=cached,
+        )
+        return response.choices[0].message.content, usage
 
-    async def _chat_google(self, model: str, system: str, message: str) -> str:
+    async def _chat_google(self, model: str, system: str, message: str) -> tuple[str, Usage]:
         genai = self._clients["google"]
         gen_model = genai.GenerativeModel(
             model_name=model,
@@ -109,4 +161,11 @@ class LLMClient:
         response = await asyncio.to_thread(
             gen_model.generate_content, message
         )
-        return response.text
+        u = response.usage_metadata
+        cached = getattr(u, "cached_content_token_count", 0) or 0
+        usage = Usage(
+            input_tokens=u.prompt_token_count - cached,
+            output_tokens=u.candidates_token_count,
+            cached_tokens=cached,
+        )
+        return response.text, usage
@@ -5,15 +5,27 @@ No vector databases. No embeddings. Just markdown files.
 
 How it works:
 - Each agent reads MEMORY.md (long-term) + today/yesterday daily files on startup
-- Interactions are logged to daily files
+- Interactions are logged to a structured journal (daily/YYYY-MM-DD.jsonl);
+  the markdown daily file is a rendered view of it
 - During quiet periods, agents promote important bits to MEMORY.md
-- Old daily files naturally age out of context
+- Busy days are folded into a rolling summary (core/summary.py), so the
+  context carries the summary plus only the recent raw entries
+- Old daily files naturally age out of context, and are gzipped after
+  a while by the archive job (core/archive.py)
 """
 
+import os
+import fcntl
+import sqlite3
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from core.archive import read_text, resolve
+from core.journal import Journal, render_entry
+from core.search import MemoryIndex
+from core.summary import load_summary, render_summary
+
 logger = logging.getLogger(__name__)
 
 MEMORY_DIR = Path("memory")
@@ -27,6 +39,8 @@ class MemoryManager:
         self.memory_dir = memory_dir
         self.daily_dir = memory_dir / "daily"
         self.daily_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = Journal(self.daily_dir)
+        self._index: MemoryIndex | None = None
 
     def get_context(self, agent: dict) -> str:
         """Build memory context for an agent's session."""
@@ -39,21 +53,16 @@ class MemoryManager:
             if content:
                 parts.append(f"## Long-term Memory\n{content}")
 
-        # Today's daily log
+        # Today's log (summary + recent entries) and yesterday's
         today = datetime.now().strftime("%Y-%m-%d")
-        today_file = self.daily_dir / f"{today}.md"
-        if today_file.exists():
-            content = today_file.read_text().strip()
-            if content:
-                parts.append(f"## Today ({today})\n{content}")
+        content = self.read_recent(today).strip()
+        if content:
+            parts.append(f"## Today ({today})\n{content}")
 
-        # Yesterday's daily log
         yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        yesterday_file = self.daily_dir / f"{yesterday}.md"
-        if yesterday_file.exists():
-            content = yesterday_file.read_text().strip()
-            if content:
-                parts.append(f"## Yesterday ({yesterday})\n{content}")
+        content = self.read_day(yesterday).strip()
+        if content:
+            parts.append(f"## Yesterday ({yesterday})\n{content}")
 
         return "\n\n---\n\n".join(parts) if parts else "No memory context available."
 
@@ -64,29 +73,65 @@ class MemoryManager:
         user: str,
         message: str,
         response: str,
-    ):
-        """Log an interaction to today's daily file."""
-        today = datetime.now().strftime("%Y-%m-%d")
+    ) -> dict:
+        """Log an interaction to the journal and today's markdown view. Returns the record."""
+        record = self.journal.append(agent, channel, user, message, response)
+        today = record["ts"][:10]
         today_file = self.daily_dir / f"{today}.md"
-
-        timestamp = datetime.now().strftime("%H:%M")
-        entry = (
-            f"\n### {timestamp} — {agent} in #{channel}\n"
-            f"**{user}:** {message[:200]}\n"
-            f"**{agent}:** {response[:200]}\n"
-        )
-
-        with open(today_file, "a") as f:
-            if not today_file.exists() or today_file.stat().st_size == 0:
-                f.write(f"# {today}\n")
-            f.write(entry)
+        self._append(today_file, render_entry(record), header=f"# {today}\n")
+
+        try:
+            self.index.update(self.journal.path(today))
+        except sqlite3.Error as e:
+            logger.warning(f"Search index update failed: {e}")
+        return record
+
+    def read_day(self, day: str) -> str:
+        """A day's log, rendered from the journal when there is one."""
+        if self.journal.exists(day):
+            return self.journal.render_day(day)
+        day_file = self.daily_dir / f"{day}.md"
+        return read_text(day_file) if resolve(day_file) else ""
+
+    def read_recent(self, day: str) -> str:
+        """A day's log with its folded part replaced by the rolling summary (see core.summary)."""
+        state = load_summary(self.daily_dir, day)
+        if not state["segments"] or not self.journal.exists(day):
+            return self.read_day(day)
+        raw = self.journal.render_day(day, offset=state["offset"])
+        return raw.replace(f"# {day}\n", f"# {day}\n{render_summary(state)}", 1)
+
+    @property
+    def index(self) -> MemoryIndex:
+        """Full-text index over daily logs, opened on first use."""
+        if self._index is None:
+            self._index = MemoryIndex(self.memory_dir)
+        return self._index
+
+    @staticmethod
+    def _append(path: Path, entry: str, header: str = ""):
+        """Append an entry under an exclusive lock.
+
+        Several bot processes (shards) may log to the same daily file. The
+        lock plus a single write per entry means entries never interleave,
+        and the header is written exactly once.
+        """
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if header and os.fstat(f.fileno()).st_size == 0:
+                    entry = header + entry
+                f.write(entry)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
 
     def read_file(self, path: str) -> str:
-        """Read a memory file."""
+        """Read a memory file. Archived (.gz) daily logs are decompressed transparently."""
         file_path = self.memory_dir / path
-        if not file_path.exists():
+        if not resolve(file_path):
             return f"File not found: {path}"
-        return file_path.read_text()
+        return read_text(file_path)
 
     def write_file(self, path: str, content: str):
         """Write to a memory file."""
@@ -0,0 +1,261 @@
+"""
+Full-text search over daily memory logs.
+
+Reading whole daily files to find one old conversation is slow and burns
+context tokens. MemoryIndex keeps a SQLite FTS5 index of every daily log
+entry in memory/search.db:
+
+- Incremental: each file's indexed byte offset is stored, so an update
+  only parses what was appended since. log_interaction feeds it from the
+  structured journal (full text) after every write; backfill() picks up
+  existing files, falling back to the markdown for days without a journal.
+  Each entry records the file it came from, so a day is indexed from one
+  source only and a rewritten file drops just its own entries.
+  Archived (.gz) days are read through core.archive and keep their offsets.
+- Backfill runs once at startup (or `python -m core.search`), not per query.
+- Ranked: results are ordered by BM25 and returned as short snippets.
+- Filterable by agent, channel and date range.
+"""
+
+import re
+import json
+import sqlite3
+import argparse
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.archive import open_daily, original_size, resolve
+
+logger = logging.getLogger(__name__)
+
+MEMORY_DIR = Path("memory")
+
+ENTRY_HEADER = re.compile(r"^### (\d{2}:\d{2}) — (.+?) in #(\S+)\s*$")
+DAY_FILE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+SCHEMA_VERSION = 2
+
+
+@dataclass
+class SearchResult:
+    day: str
+    time: str
+    agent: str
+    channel: str
+    snippet: str
+    score: float
+
+    def __str__(self) -> str:
+        return f"[{self.day} {self.time}] {self.agent} in #{self.channel}: {self.snippet}"
+
+
+class MemoryIndex:
+    """SQLite FTS5 index over memory/daily/ (journal or markdown)."""
+
+    def __init__(self, memory_dir: Path = MEMORY_DIR, path: Path | None = None):
+        self.daily_dir = memory_dir / "daily"
+        self.path = path or memory_dir / "search.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Older layout: the index is rebuilt from the daily files, so start over
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS entries_fts; DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS files;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                time TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_day ON entries(day);
+            CREATE INDEX IF NOT EXISTS entries_source ON entries(source);
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                body, content='entries', content_rowid='id'
+            );
+            """
+        )
+
+    def update(self, path: Path) -> int:
+        """Index whatever was appended to a daily file since the last update."""
+        if path.suffix == ".gz":
+            path = path.with_suffix("")  # archived files keep their original key and offsets
+        day = path.stem
+        if not DAY_FILE.match(day) or not resolve(path):
+            return 0
+        if path.suffix == ".md" and resolve(path.with_suffix(".jsonl")):
+            return 0  # the journal has the full text of the same entries
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if path.suffix == ".jsonl":
+                # Replace a markdown backfill of this day rather than index it twice
+                self._delete_source(path.with_suffix(".md").name)
+            row = self._conn.execute("SELECT offset FROM files WHERE name = ?", (path.name,)).fetchone()
+            offset = row[0] if row else 0
+            size = original_size(path)
+            if size < offset:
+                # File was rewritten — start over for this file
+                self._delete_source(path.name)
+                offset = 0
+            if size == offset:
+                self._conn.execute("COMMIT")
+                return 0
+
+            with open_daily(path) as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+
+            if path.suffix == ".jsonl":
+                entries, consumed = parse_journal(data)
+                size = offset + consumed
+            else:
+                entries = parse_entries(data.decode("utf-8", errors="replace"))
+
+            count = 0
+            for time, agent, channel, body in entries:
+                cursor = self._conn.execute(
+                    "INSERT INTO entries (source, day, time, agent, channel, body) VALUES (?, ?, ?, ?, ?, ?)",
+                    (path.name, day, time, agent, channel, body),
+                )
+                self._conn.execute(
+                    "INSERT INTO entries_fts (rowid, body) VALUES (?, ?)", (cursor.lastrowid, body)
+                )
+                count += 1
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (name, offset) VALUES (?, ?)", (path.name, size)
+            )
+            self._conn.execute("COMMIT")
+            return count
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def backfill(self) -> int:
+        """Bring every day up to date, preferring the journal over the markdown view."""
+        days = {}
+        for pattern in ("*.md", "*.md.gz", "*.jsonl", "*.jsonl.gz"):
+            for f in sorted(self.daily_dir.glob(pattern)):
+                days[f.name.split(".")[0]] = f
+        return sum(self.update(days[day]) for day in sorted(days))
+
+    def search(
+        self,
+        query: str,
+        agent: str | None = None,
+        channel: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 10,
+    ) -> list[SearchResult]:
+        """BM25-ranked search. Dates are inclusive YYYY-MM-DD bounds."""
+        terms = [t for t in re.findall(r"\w+", query) if t]
+        if not terms:
+            return []
+
+        filters, params = [], []
+        if agent:
+            filters.append("e.agent = ? COLLATE NOCASE")
+            params.append(agent)
+        if channel:
+            filters.append("e.channel = ? COLLATE NOCASE")
+            params.append(channel.lstrip("#"))
+        if since:
+            filters.append("e.day >= ?")
+            params.append(since)
+        if until:
+            filters.append("e.day <= ?")
+            params.append(until)
+        where = "".join(f" AND {f}" for f in filters)
+
+        sql = (
+            "SELECT e.day, e.time, e.agent, e.channel,"
+            " snippet(entries_fts, 0, '**', '**', '…', 16), bm25(entries_fts) AS score"
+            " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+            f" WHERE entries_fts MATCH ?{where}"
+            " ORDER BY score LIMIT ?"
+        )
+        # All terms first; fall back to any term if that finds nothing
+        for joiner in (" AND ", " OR "):
+            match = joiner.join(f'"{t}"' for t in terms)
+            rows = self._conn.execute(sql, (match, *params, limit)).fetchall()
+            if rows or len(terms) == 1:
+                break
+        return [SearchResult(*row) for row in rows]
+
+    def _delete_source(self, name: str):
+        rows = self._conn.execute("SELECT id, body FROM entries WHERE source = ?", (name,)).fetchall()
+        for rowid, body in rows:
+            self._conn.execute(
+                "INSERT INTO entries_fts (entries_fts, rowid, body) VALUES ('delete', ?, ?)", (rowid, body)
+            )
+        self._conn.execute("DELETE FROM entries WHERE source = ?", (name,))
+        self._conn.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def close(self):
+        self._conn.close()
+
+
+def parse_journal(data: bytes) -> tuple[list[tuple[str, str, str, str]], int]:
+    """Parse complete journal lines. Returns entries and the bytes consumed."""
+    entries, consumed = [], 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break  # partial write in progress
+        consumed += len(line)
+        try:
+            r = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        body = f"**{r['user']}:** {r['message']}\n**{r['agent']}:** {r['response']}"
+        entries.append((r["ts"][11:16], r["agent"], r["channel"], body))
+    return entries, consumed
+
+
+def parse_entries(text: str) -> list[tuple[str, str, str, str]]:
+    """Split daily log text into (time, agent, channel, body) entries."""
+    entries = []
+    current = None
+    for line in text.split("\n"):
+        header = ENTRY_HEADER.match(line)
+        if header:
+            if current:
+                entries.append(current)
+            current = (*header.groups(), [])
+        elif current:
+            current[3].append(line)
+    if current:
+        entries.append(current)
+    return [(t, a, c, "\n".join(body).strip()) for t, a, c, body in entries]
+
+
+def backfill(memory_dir: Path = MEMORY_DIR) -> int:
+    """Backfill on a connection of its own, so it can run in a worker thread."""
+    index = MemoryIndex(memory_dir)
+    try:
+        return index.backfill()
+    finally:
+        index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the memory search index up to date")
+    parser.add_argument("--dir", default=str(MEMORY_DIR), help="Memory directory")
+    args = parser.parse_args()
+    print(f"Indexed {backfill(Path(args.dir))} entries")
+
+
+if __name__ == "__main__":
+    main()
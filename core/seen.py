@@ -0,0 +1,47 @@
+"""
+Duplicate delivery guard.
+
+After a gateway resume Discord may replay events, so the same message can
+reach on_message twice. Handling it again costs a second LLM call and a
+duplicate daily-log entry. SeenMessages remembers recent message IDs in a
+bounded, time-windowed LRU so handling is idempotent.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class SeenMessages:
+    """Bounded LRU of recently seen message IDs."""
+
+    def __init__(self, max_size: int = 10_000, window: float = 900.0):
+        self.max_size = max_size
+        self.window = window
+        self.suppressed = 0
+        self._seen: OrderedDict[int, float] = OrderedDict()
+
+    def check(self, message_id: int) -> bool:
+        """Record a message ID. Returns True if it was already seen."""
+        now = time.monotonic()
+        self._expire(now)
+
+        if message_id in self._seen:
+            self.suppressed += 1
+            return True
+
+        self._seen[message_id] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def _expire(self, now: float):
+        """Drop IDs older than the window (oldest are at the front)."""
+        cutoff = now - self.window
+        while self._seen:
+            oldest = next(iter(self._seen.values()))
+            if oldest >= cutoff:
+                break
+            self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -0,0 +1,79 @@
+"""
+Shared state for sharded deployments.
+
+When the swarm runs as several processes (one per Discord shard) they
+share the `memory/` directory but nothing else. This store is the small
+piece of coordination they need: a SQLite database in WAL mode that every
+node can open concurrently.
+
+Right now it holds the dedupe registry — a message or job claimed by one
+node is never handled by another. Daily log appends are serialized with
+file locks in MemoryManager.
+"""
+
+import os
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+STORE_PATH = Path("memory") / "swarm.db"
+
+
+def node_id(shard_id: int | None = None) -> str:
+    """A name for this process that is unique across the deployment."""
+    node = f"{socket.gethostname()}:{os.getpid()}"
+    if shard_id is not None:
+        node += f":shard{shard_id}"
+    return node
+
+
+class SharedStore:
+    """SQLite-backed state shared by all bot processes."""
+
+    def __init__(self, path: Path = STORE_PATH, retention: float = 86400.0, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention
+        self._claims_since_prune = 0
+        self._lock = threading.Lock()  # claims run in worker threads (asyncio.to_thread)
+        self._conn = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS claims ("
+            " key TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " claimed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS claims_age ON claims(claimed_at)")
+
+    def claim(self, key: str, owner: str) -> bool:
+        """Atomically claim a key. Returns False if another node got there first."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO claims (key, owner, claimed_at) VALUES (?, ?, ?)",
+                (key, owner, time.time()),
+            )
+            self._claims_since_prune += 1
+            if self._claims_since_prune >= 1000:
+                self.prune()
+            return cursor.rowcount == 1
+
+    def owner(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT owner FROM claims WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def prune(self):
+        """Forget claims older than the retention window."""
+        self._conn.execute("DELETE FROM claims WHERE claimed_at < ?", (time.time() - self.retention,))
+        self._claims_since_prune = 0
+
+    def close(self):
+        self._conn.close()
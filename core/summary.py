@@ -0,0 +1,159 @@
+"""
+Rolling summary of today's log.
+
+On a busy day the raw log get_context inlines grows to hundreds of KB,
+and every message pays for it. Once the unsummarized part of today's
+journal renders to more than `threshold` characters, DailySummarizer
+folds everything but the most recent `keep` characters into a summary
+segment, in the background:
+
+    memory/daily/YYYY-MM-DD.summary.json
+    {"offset": <journal byte offset folded up to>, "segments": [...]}
+
+Each fold summarizes only the entries since the last offset and appends a
+segment, so nothing is summarized twice. get_context inlines the
+segments followed by the raw entries after the offset; a restarted
+process resumes from the stored offset.
+
+    SWARM_SUMMARY_MODEL=claude-3-5-haiku-latest
+    SWARM_SUMMARY_THRESHOLD=32000   # 0 disables folding
+"""
+
+import os
+import json
+import time
+import fcntl
+import asyncio
+import logging
+from pathlib import Path
+
+from core.journal import Journal, render_entry
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You condense an agent swarm's chat log into working memory. Summarize the "
+    "log entries below in at most 150 words: decisions made, facts learned, open "
+    "tasks and who owns them, and anything someone asked to be remembered. "
+    "Name agents and channels. Skip greetings and small talk. Output only the summary."
+)
+
+DEFAULT_MODEL = "claude-3-5-haiku-latest"
+RETRY_AFTER = 300  # seconds before retrying a failed fold
+
+
+def summary_path(daily_dir: Path, day: str) -> Path:
+    return daily_dir / f"{day}.summary.json"
+
+
+def load_summary(daily_dir: Path, day: str) -> dict:
+    path = summary_path(daily_dir, day)
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupt summary state {path.name}")
+    return {"offset": 0, "segments": []}
+
+
+def save_summary(daily_dir: Path, day: str, state: dict):
+    path = summary_path(daily_dir, day)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=1))
+    os.replace(tmp, path)
+
+
+def render_summary(state: dict) -> str:
+    """Summary segments as markdown ("" if nothing has been folded yet)."""
+    if not state["segments"]:
+        return ""
+    lines = ["### Summary of earlier entries"]
+    for seg in state["segments"]:
+        lines.append(f"**{seg['from']}–{seg['to']}** ({seg['entries']} entries): {seg['text']}")
+    return "\n".join(lines) + "\n"
+
+
+class DailySummarizer:
+    """Folds older parts of a day's journal into summary segments."""
+
+    def __init__(
+        self,
+        journal: Journal,
+        llm,
+        model: str = DEFAULT_MODEL,
+        threshold: int = 32_000,
+        keep: int = 8_000,
+    ):
+        self.journal = journal
+        self.llm = llm
+        self.model = model
+        self.threshold = threshold
+        self.keep = keep
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._failed: dict[str, float] = {}
+
+    def schedule(self, day: str):
+        """Start a background fold for a day unless one is already running."""
+        if not self.threshold or day in self._tasks:
+            return
+        if time.monotonic() - self._failed.get(day, -RETRY_AFTER) < RETRY_AFTER:
+            return
+        task = asyncio.create_task(self._run(day))
+        self._tasks[day] = task
+        task.add_done_callback(lambda _: self._tasks.pop(day, None))
+
+    async def _run(self, day: str):
+        try:
+            await self.fold(day)
+        except Exception as e:
+            self._failed[day] = time.monotonic()
+            logger.warning(f"Summary fold for {day} failed: {e}")
+
+    async def fold(self, day: str) -> bool:
+        """Fold unsummarized entries if they are over the threshold. True if a segment was added."""
+        daily_dir = self.journal.daily_dir
+        with open(daily_dir / f"{day}.summary.lock", "w") as lock:
+            # Another process (shard) is already folding this day
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            state = load_summary(daily_dir, day)
+            entries = list(self.journal.scan(day, state["offset"]))
+            sizes = [len(render_entry(record)) for _, record in entries]
+            if sum(sizes) <= self.threshold:
+                return False
+
+            # Leave the most recent `keep` characters raw
+            kept, tail = 0, 0
+            for size in reversed(sizes):
+                if tail + size > self.keep:
+                    break
+                tail += size
+                kept += 1
+            folded = entries[:len(entries) - kept]
+            if not folded:
+                return False
+
+            log = "".join(render_entry(record, limit=1000) for _, record in folded)
+            start = time.perf_counter()
+            text = await self.llm.chat(
+                model=self.model, system=SUMMARY_PROMPT, message=log, agent="summarizer", channel=""
+            )
+
+            first, last = folded[0][1], folded[-1][1]
+            state["segments"].append({
+                "from": first["ts"][11:16],
+                "to": last["ts"][11:16],
+                "entries": len(folded),
+                "text": " ".join(text.split()),
+            })
+            state["offset"] = folded[-1][0]
+            save_summary(daily_dir, day, state)
+
+        logger.info(
+            f"Folded {len(folded)} entries of {day} ({sum(sizes[:len(folded)])} chars) "
+            f"into {len(text)} chars in {time.perf_counter() - start:.1f}s"
+        )
+        return True
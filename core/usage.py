@@ -0,0 +1,219 @@
+"""
+Token and cost accounting for LLM calls.
+
+Every provider response reports input, output and cached token counts.
+UsageTracker aggregates them per (agent, model, channel) in memory,
+flushes the rollups to memory/usage.jsonl every minute (one compact line
+per key per flush) and enforces the hourly/daily budgets from the agent
+YAML:
+
+    budget:
+      hourly_usd: 2.00
+      daily_usd: 20.00
+      fallback_model: claude-sonnet-4-20250514  # omit to refuse instead
+
+Once a budget is spent the agent is downgraded to `fallback_model`, or
+refused with BudgetExceeded if there is none.
+
+Show the rollups with:
+    python -m core.usage [--day YYYY-MM-DD] [--by agent,model,channel]
+"""
+
+import json
+import time
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+USAGE_FILE = Path("memory") / "usage.jsonl"
+
+# USD per million tokens: (input, output, cached input). Matched by prefix.
+PRICES = {
+    "claude-opus-4": (15.00, 75.00, 1.50),
+    "claude-sonnet-4": (3.00, 15.00, 0.30),
+    "claude-3-5-haiku": (0.80, 4.00, 0.08),
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gemini-2.0-flash": (0.10, 0.40, 0.025),
+    "gemini-2.5-pro": (1.25, 10.00, 0.31),
+}
+
+
+class BudgetExceeded(RuntimeError):
+    """An agent has spent its budget and has no fallback model."""
+
+
+@dataclass
+class Usage:
+    """Token counts from one provider response. input_tokens excludes cached ones."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+
+    def cost(self, model: str) -> float:
+        prices = _prices_for(model)
+        if not prices:
+            return 0.0
+        input_price, output_price, cached_price = prices
+        return (
+            self.input_tokens * input_price
+            + self.output_tokens * output_price
+            + self.cached_tokens * cached_price
+        ) / 1_000_000
+
+
+def _prices_for(model: str) -> tuple[float, float, float] | None:
+    matches = [prefix for prefix in PRICES if model.startswith(prefix)]
+    return PRICES[max(matches, key=len)] if matches else None
+
+
+class UsageTracker:
+    """In-memory usage rollups with periodic append-only flushes."""
+
+    def __init__(self, path: Path = USAGE_FILE, flush_interval: float = 60.0):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[str, str, str], dict] = {}
+        self._last_flush = time.monotonic()
+        # agent -> {"hour": (key, usd), "day": (key, usd)}
+        self._spend: dict[str, dict[str, tuple[str, float]]] = {}
+        self._load_spend()
+
+    def record(self, agent: str, model: str, channel: str, usage: Usage):
+        """Add one response's usage to the rollups."""
+        cost = usage.cost(model)
+        totals = self._pending.setdefault(
+            (agent, model, channel),
+            {"calls": 0, "in": 0, "out": 0, "cached": 0, "usd": 0.0},
+        )
+        totals["calls"] += 1
+        totals["in"] += usage.input_tokens
+        totals["out"] += usage.output_tokens
+        totals["cached"] += usage.cached_tokens
+        totals["usd"] += cost
+        self._add_spend(agent, cost, datetime.now())
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def select_model(self, agent: str, model: str, budget: dict | None) -> str:
+        """Pick the model an agent may use right now, given its budget."""
+        if not budget:
+            return model
+
+        now = datetime.now()
+        spend = self._spend.get(agent, {})
+        over = []
+        for window, limit_key in (("hour", "hourly_usd"), ("day", "daily_usd")):
+            limit = budget.get(limit_key)
+            key, usd = spend.get(window, ("", 0.0))
+            if key != _window_key(window, now):
+                usd = 0.0
+            if limit is not None and usd >= limit:
+                over.append(f"{limit_key}={limit}")
+
+        if not over:
+            return model
+        fallback = budget.get("fallback_model")
+        if fallback:
+            logger.warning(f"{agent} over budget ({', '.join(over)}), downgrading {model} → {fallback}")
+            return fallback
+        raise BudgetExceeded(f"{agent} is over budget ({', '.join(over)})")
+
+    def flush(self):
+        """Append pending rollups to the usage file."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        ts = datetime.now().isoformat(timespec="seconds")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            for (agent, model, channel), totals in self._pending.items():
+                record = {"ts": ts, "agent": agent, "model": model, "channel": channel, **totals}
+                record["usd"] = round(record["usd"], 6)
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._pending.clear()
+
+    def _add_spend(self, agent: str, cost: float, when: datetime):
+        spend = self._spend.setdefault(agent, {})
+        for window in ("hour", "day"):
+            key = _window_key(window, when)
+            current_key, usd = spend.get(window, (key, 0.0))
+            spend[window] = (key, (usd if current_key == key else 0.0) + cost)
+
+    def _load_spend(self):
+        """Seed today's budget windows from the usage file so restarts don't reset them."""
+        if not self.path.exists():
+            return
+        today = datetime.now().strftime("%Y-%m-%d")
+        with open(self.path) as f:
+            for line in f:
+                if today not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    when = datetime.fromisoformat(record["ts"])
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    continue
+                if when.strftime("%Y-%m-%d") == today:
+                    self._add_spend(record["agent"], record.get("usd", 0.0), when)
+
+
+def _window_key(window: str, when: datetime) -> str:
+    return when.strftime("%Y-%m-%dT%H" if window == "hour" else "%Y-%m-%d")
+
+
+def rollup(path: Path = USAGE_FILE, day: str | None = None,
+           by: tuple[str, ...] = ("agent", "model")) -> list[dict]:
+    """Aggregate the usage file, optionally for one day, grouped by the given keys."""
+    groups: dict[tuple, dict] = {}
+    if not path.exists():
+        return []
+    with open(path) as f:
+        for line in f:
+            if day and day not in line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if day and not record.get("ts", "").startswith(day):
+                continue
+            key = tuple(record.get(k, "") for k in by)
+            totals = groups.setdefault(key, {"calls": 0, "in": 0, "out": 0, "cached": 0, "usd": 0.0})
+            for field in totals:
+                totals[field] += record.get(field, 0)
+    rows = [{**dict(zip(by, key)), **totals} for key, totals in groups.items()]
+    return sorted(rows, key=lambda r: -r["usd"])
+
+
+def format_rollup(rows: list[dict], by: tuple[str, ...] = ("agent", "model")) -> str:
+    """Render rollup rows as a plain-text table."""
+    if not rows:
+        return "No usage recorded."
+    lines = [" | ".join(by) + " | calls | input | output | cached | usd"]
+    for r in rows:
+        keys = " | ".join(str(r[k]) for k in by)
+        lines.append(f"{keys} | {r['calls']} | {r['in']} | {r['out']} | {r['cached']} | ${r['usd']:.4f}")
+    total = sum(r["usd"] for r in rows)
+    lines.append(f"Total: ${total:.4f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show LLM usage rollups")
+    parser.add_argument("--day", help="Only this day (YYYY-MM-DD)")
+    parser.add_argument("--by", default="agent,model", help="Group by keys: agent,model,channel")
+    parser.add_argument("--file", default=str(USAGE_FILE), help="Usage file")
+    args = parser.parse_args()
+
+    by = tuple(k.strip() for k in args.by.split(",") if k.strip())
+    print(format_rollup(rollup(Path(args.file), args.day, by), by))
+
+
+if __name__ == "__main__":
+    main()
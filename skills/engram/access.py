@@ -0,0 +1,100 @@
+"""
+Access — buffered recall counts for reinforcement and decay.
+
+Problem: decay.increment_access read a page, rewrote its **Accessed:**
+line and wrote the whole page back for every access. Wired into recall,
+every query would rewrite pages (and bump their mtime, so the catalog
+re-indexed them) and agents recalling at once would race on the same
+files.
+
+Solution:
+1. Accesses are counted in memory (AccessCounter) and appended to
+   <entities_dir>/.access.log as "date<TAB>stem<TAB>count" lines, one
+   write per flush under an exclusive lock: every FLUSH_INTERVAL seconds
+   (ENGRAM_ACCESS_FLUSH, default 30) while recording, and at exit
+2. The catalog folds the log into its access table by byte offset
+   (Catalog.fold_access), like graph.db follows graph.jsonl, so any
+   number of processes can append and a rebuilt catalog re-reads it
+3. Counts and the last access date feed recall ranking (a bounded boost
+   for often-recalled pages) and decay (a recent recall keeps an entity
+   active). Pages are never touched on the read path
+"""
+
+from __future__ import annotations
+
+import atexit
+import fcntl
+import os
+import time
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+ACCESS_LOG = ".access.log"
+FLUSH_INTERVAL = float(os.environ.get("ENGRAM_ACCESS_FLUSH", "30"))
+
+
+def parse_log(data: bytes) -> tuple[Counter, dict[str, str]]:
+    """Complete log lines -> (stem -> count, stem -> last access date)."""
+    counts: Counter = Counter()
+    last: dict[str, str] = {}
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        try:
+            day, stem, count = line.split("\t")
+            counts[stem] += int(count)
+        except ValueError:
+            continue  # malformed line
+        if day > last.get(stem, ""):
+            last[stem] = day
+    return counts, last
+
+
+class AccessCounter:
+    """Accesses to entity pages, buffered in memory and appended to the access log."""
+
+    def __init__(self, entities_dir: Path):
+        self.path = entities_dir / ACCESS_LOG
+        self.pending: Counter = Counter()
+        self.flushed = time.monotonic()
+
+    def record(self, stem: str, count: int = 1):
+        self.pending[stem] += count
+        if time.monotonic() - self.flushed >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered counts to the log (one locked write)."""
+        self.flushed = time.monotonic()
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, Counter()
+        day = date.today().isoformat()
+        lines = "".join(f"{day}\t{stem}\t{count}\n" for stem, count in pending.items())
+        with open(self.path, "a") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                log.write(lines)
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+
+
+_counters: dict[Path, AccessCounter] = {}
+
+
+def access_counter(entities_dir: Path) -> AccessCounter:
+    """Shared counter per entities directory (flushed at exit)."""
+    counter = _counters.get(entities_dir)
+    if counter is None:
+        counter = _counters[entities_dir] = AccessCounter(entities_dir)
+    return counter
+
+
+def flush_all():
+    for counter in _counters.values():
+        try:
+            counter.flush()
+        except OSError:
+            pass  # directory gone; nothing to keep
+
+
+atexit.register(flush_all)
@@ -0,0 +1,127 @@
+"""
+Archive — gzip tier for old daily logs.
+
+Problem: Daily files accumulate forever as plain text, and `extract --all`
+and `stats` walk every one of them.
+
+Solution:
+1. `engram compress --days N` gzips daily files (.md and .jsonl) older
+   than N days in place: 2026-01-05.md → 2026-01-05.md.gz
+2. Sizes are recorded in an archive.json next to the archived files,
+   keyed by file name — the layout of the swarm's rotation job
+   (core/archive.py), so either tool reads the other's archives. The
+   helpers live here so the skill keeps working outside the swarm repo
+3. Readers open files through open_text(), which falls back to the .gz
+   copy and decompresses it as a stream — callers never see the difference
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import IO
+
+ARCHIVE_INDEX = "archive.json"
+ARCHIVABLE = re.compile(r'^(\d{4}-\d{2}-\d{2})\.(md|jsonl)$')
+READ_BLOCK = 1 << 20
+
+
+@dataclass
+class ArchiveReport:
+    files: int = 0
+    original_bytes: int = 0
+    compressed_bytes: int = 0
+    read_bytes: int = 0
+    read_seconds: float = 0.0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.compressed_bytes
+
+    @property
+    def read_throughput(self) -> float:
+        """Streaming decompression throughput in MB/s."""
+        return self.read_bytes / self.read_seconds / 1e6 if self.read_seconds else 0.0
+
+
+def resolve(path: Path) -> Path | None:
+    """The file backing a daily log path: the plain file or its .gz archive."""
+    if path.exists():
+        return path
+    archived = path.with_name(path.name + ".gz")
+    return archived if archived.exists() else None
+
+
+def open_text(path: Path) -> IO[str]:
+    """Open a daily log as text, streaming through gzip if it was archived."""
+    resolved = resolve(path)
+    if resolved is None:
+        raise FileNotFoundError(path)
+    if resolved.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(resolved, "rb"), encoding="utf-8", errors="replace")
+    return open(resolved, encoding="utf-8", errors="replace")
+
+
+def read_text(path: Path) -> str:
+    with open_text(path) as f:
+        return f.read()
+
+
+def compress_daily(memory_dir: Path, days: int = 30, dry_run: bool = False,
+                   today: date | None = None) -> ArchiveReport:
+    """Gzip daily files older than `days` days and time a read-back of the archives."""
+    cutoff = ((today or date.today()) - timedelta(days=days)).isoformat()
+    report = ArchiveReport()
+    archived = []
+
+    for directory in (memory_dir, memory_dir / "daily"):
+        if not directory.is_dir():
+            continue
+        index_file = directory / ARCHIVE_INDEX
+        index = json.loads(index_file.read_text()) if index_file.exists() else {}
+        added = False
+        for path in sorted(directory.iterdir()):
+            m = ARCHIVABLE.match(path.name)
+            if not m or m.group(1) >= cutoff:
+                continue
+
+            original = path.stat().st_size
+            report.files += 1
+            report.original_bytes += original
+            if dry_run:
+                continue
+
+            target = path.with_name(path.name + ".gz")
+            tmp = target.with_name(target.name + ".tmp")
+            with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=9) as dst:
+                shutil.copyfileobj(src, dst, READ_BLOCK)
+            tmp.rename(target)
+            path.unlink()
+
+            compressed = target.stat().st_size
+            report.compressed_bytes += compressed
+            index[path.name] = {
+                "archive": target.name,
+                "original": original,
+                "compressed": compressed,
+                "archived_at": date.today().isoformat(),
+            }
+            archived.append(target)
+            added = True
+        if added:
+            index_file.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n")
+
+    start = time.perf_counter()
+    for target in archived:
+        with gzip.open(target, "rb") as f:
+            for block in iter(lambda: f.read(READ_BLOCK), b""):
+                report.read_bytes += len(block)
+    report.read_seconds = time.perf_counter() - start
+    return report
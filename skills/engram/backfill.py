@@ -0,0 +1,197 @@
+"""
+Backfill — resumable, concurrent `extract --all`.
+
+Problem: `extract --all` processed dates one after another, and a crash
+halfway through started over from the first date.
+
+Solution:
+1. A job ledger (<memory_dir>/.backfill-ledger.json) records each date's
+   status (done / failed), chunk count and time taken. Re-running skips
+   dates already done unless their log changed since (size and mtime of
+   the file, recorded with the status); a re-queued day only extracts
+   what was appended, through its checkpoint. `--restart` clears the
+   ledger
+2. Up to ENGRAM_BACKFILL_JOBS dates (default 2) are extracted at once;
+   each date still fans out over its chunks (ENGRAM_CONCURRENCY)
+3. Entity and graph writes go through a single writer (the calling
+   thread), applied in date order so pages come out the same as a
+   sequential run
+4. Entity pages are merged in memory and flushed every
+   ENGRAM_BACKFILL_FLUSH dates (default 20), so a page touched by many
+   dates is rewritten once per flush instead of once per date. Dates are
+   checkpointed and marked done only after their flush
+5. Progress lines show an ETA and throughput in chunks per minute
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from .core import ENTITIES_DIR, apply_extraction, commit_extractions, extract_date
+from .entity import EntityBatch
+from .journal import daily_source
+
+LEDGER_FILE = ".backfill-ledger.json"
+DEFAULT_JOBS = int(os.environ.get("ENGRAM_BACKFILL_JOBS", "2"))
+FLUSH_EVERY = int(os.environ.get("ENGRAM_BACKFILL_FLUSH", "20"))
+
+
+class Ledger:
+    """Per-date job status, saved atomically after every change."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.jobs: dict[str, dict] = {}
+        if path.exists():
+            try:
+                self.jobs = json.loads(path.read_text())
+            except json.JSONDecodeError:
+                print(f"  Ignoring corrupt ledger {path.name}")
+
+    def done(self, date_str: str, source: list[int] | None = None) -> bool:
+        """Whether the date is done and its log is still as it was then."""
+        job = self.jobs.get(date_str, {})
+        return job.get("status") == "done" and job.get("source") == source
+
+    def record(self, date_str: str, status: str, **details):
+        self.jobs[date_str] = {"status": status, "updated": datetime.now().isoformat(), **details}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.jobs, indent=2, sort_keys=True))
+        tmp.rename(self.path)
+
+    def clear(self):
+        self.jobs = {}
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class BackfillReport:
+    total: int = 0
+    skipped: int = 0
+    done: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_minute(self) -> float:
+        return self.chunks / self.seconds * 60 if self.seconds else 0.0
+
+
+def _source(memory_dir: Path, date_str: str) -> list[int] | None:
+    """[size, mtime_ns] of the file behind a day's log, to notice appends."""
+    path = daily_source(memory_dir, date_str)
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None  # removed meanwhile
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def run_backfill(dates: list[str], memory_dir: Path, jobs: int = DEFAULT_JOBS,
+                 full: bool = False, restart: bool = False) -> BackfillReport:
+    """Extract every date not yet done, `jobs` at a time, writing results in date order."""
+    ledger = Ledger(memory_dir / LEDGER_FILE)
+    if restart:
+        ledger.clear()
+
+    sources = {d: _source(memory_dir, d) for d in dates}
+    pending = [d for d in sorted(dates) if not ledger.done(d, sources[d])]
+    report = BackfillReport(total=len(dates), skipped=len(dates) - len(pending))
+    if report.skipped:
+        print(f"Resuming backfill: {report.skipped}/{len(dates)} dates already done")
+    changed = [d for d in pending if ledger.jobs.get(d, {}).get("status") == "done"]
+    if changed:
+        print(f"  {len(changed)} done dates changed since, re-queued for their new content")
+    if not pending:
+        return report
+
+    start = time.perf_counter()
+    started: dict[str, float] = {}
+    batch = EntityBatch(ENTITIES_DIR)
+    applied = []  # (extraction, seconds) merged into `batch`, not yet flushed
+
+    def commit():
+        nonlocal batch
+        if not applied:
+            return
+        commit_extractions(batch, [ex for ex, _ in applied])
+        for ex, took in applied:
+            ledger.record(ex.date, "done", chunks=ex.chunks, seconds=took, source=sources[ex.date])
+        applied.clear()
+        batch = EntityBatch(ENTITIES_DIR)  # re-read pages others may have edited meanwhile
+
+    def extract(date_str: str):
+        started[date_str] = time.perf_counter()
+        return extract_date(date_str, full)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(extract, d): d for d in pending}
+        results = {}
+        next_index = 0
+        not_done = set(futures)
+
+        while not_done:
+            finished, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+            for future in finished:
+                date_str = futures[future]
+                try:
+                    results[date_str] = future.result()
+                except Exception as e:
+                    results[date_str] = e
+
+            # Single writer: apply finished dates in order, as soon as their turn comes
+            while next_index < len(pending) and pending[next_index] in results:
+                date_str = pending[next_index]
+                outcome = results.pop(date_str)
+                next_index += 1
+                took = round(time.perf_counter() - started[date_str], 2)
+                failures = report.failed
+
+                if isinstance(outcome, Exception):
+                    report.failed += 1
+                    ledger.record(date_str, "failed", error=str(outcome), seconds=took)
+                elif outcome.status == "failed":
+                    report.failed += 1
+                    ledger.record(date_str, "failed", chunks=outcome.chunks, seconds=took)
+                else:
+                    try:
+                        apply_extraction(outcome, batch)
+                    except Exception as e:
+                        report.failed += 1
+                        ledger.record(date_str, "failed", error=str(e), seconds=took)
+                    else:
+                        report.done += 1
+                        report.chunks += outcome.chunks
+                        applied.append((outcome, took))
+                        if len(applied) >= FLUSH_EVERY:
+                            commit()
+
+                processed = report.done + report.failed
+                report.seconds = time.perf_counter() - start
+                eta = report.seconds / processed * (len(pending) - processed)
+                print(f"[{processed}/{len(pending)}] {date_str} "
+                      f"{'✗' if report.failed > failures else '✓'} — "
+                      f"{report.chunks_per_minute:.1f} chunks/min, ETA {_eta(eta)}")
+
+        commit()
+
+    report.seconds = time.perf_counter() - start
+    print(f"\nBackfill finished: {report.done} done, {report.failed} failed, "
+          f"{report.skipped} skipped — {report.chunks} chunks in {_eta(report.seconds)} "
+          f"({report.chunks_per_minute:.1f} chunks/min)")
+    return report
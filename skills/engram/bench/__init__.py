@@ -0,0 +1,10 @@
+"""
+Benchmarks for engram's hot paths, on synthetic data in temporary
+directories (a workspace is never touched):
+
+    python -m skills.engram.bench.extract     # parallel chunk extraction, stub LLM
+    python -m skills.engram.bench.graph       # triplet store inserts and lookups
+    python -m skills.engram.bench.recall      # recall over 1k-100k entity pages
+
+Each prints one line per size or setting; sizes can be given as arguments.
+"""
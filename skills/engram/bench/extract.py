@@ -0,0 +1,89 @@
+"""
+Parallel chunk extraction against a stub LLM with a fixed latency.
+
+A synthetic day is pre-filtered and chunked like extract_date does, then
+extracted at several concurrency levels. The stub fails the first attempt
+for a third of the chunks, so retries are part of the timing, and the
+merged result must be identical at every level.
+
+    python -m skills.engram.bench.extract [--latency 0.5] [--sections 25] [1 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+
+
+class StubProvider:
+    """Answers extraction prompts after `latency` seconds; the first call for some chunks fails."""
+
+    def __init__(self, latency: float, fail_every: int = 3):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls: dict[int, int] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> dict | None:
+        time.sleep(self.latency)
+        body = prompt.split("DAILY LOG", 1)[1]
+        key = zlib.crc32(body.encode())
+        with self.lock:
+            attempt = self.calls.get(key, 0)
+            self.calls[key] = attempt + 1
+        if attempt == 0 and key % self.fail_every == 0:
+            return None
+        names = sorted({w for w in body.split() if w.startswith("Entity")})[:5]
+        return {
+            "entities": [{"name": n, "type": "concept", "facts": [f"fact {n} {len(body)}"]} for n in names],
+            "triplets": [{"subject": names[0], "predicate": "relates", "object": names[-1], "detail": str(len(body))}],
+            "events": [{"description": f"chunk {len(body)}", "entities": names}],
+        }
+
+
+def synthetic_day(sections: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(
+        f"## Section {i}\n" + " ".join(f"Entity{rng.randint(0, 30)} did thing{j}" for j in range(120))
+        for i in range(sections)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("concurrency", nargs="*", type=int, default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stub call")
+    parser.add_argument("--sections", type=int, default=25, help="Sections in the synthetic day")
+    args = parser.parse_args()
+
+    # core sets up its workspace on import: keep it away from a real one
+    os.environ["GARDENER_WORKSPACE"] = tempfile.mkdtemp(prefix="engram-bench-")
+    from .. import core
+
+    text = synthetic_day(args.sections)
+    chunks = core.chunk_content(core.pre_filter(text))
+    print(f"{len(text)} characters, {len(chunks)} chunks, {args.latency}s per call")
+
+    outputs = set()
+    for concurrency in args.concurrency:
+        stub = StubProvider(args.latency)
+        start = time.perf_counter()
+        results = core.extract_chunks(chunks, "2026-01-01", call=stub, concurrency=concurrency, backoff=0.1)
+        elapsed = time.perf_counter() - start
+        merged = core.merge_extraction_results([r for r in results if r])
+        merged["entities"] = [{**e, "facts": sorted(e["facts"])} for e in merged["entities"]]
+        outputs.add(json.dumps(merged, sort_keys=True))
+        ok = sum(r is not None for r in results)
+        print(f"  concurrency {concurrency:>2}: {elapsed:6.2f}s, {ok}/{len(results)} chunks, "
+              f"{sum(stub.calls.values())} calls")
+    print("merged output identical" if len(outputs) == 1 else "⚠️  merged output differs between runs")
+
+
+if __name__ == "__main__":
+    main()
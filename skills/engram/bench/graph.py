@@ -0,0 +1,112 @@
+"""
+Triplet store inserts and lookups against a full scan of graph.jsonl.
+
+For each size, a graph.jsonl of random triplets is written and indexed
+(the one-time import), then timed: a 50-triplet add with dedup, a
+substring search (all matches and the GRAPH_LIMIT most recent, as recall
+asks), an exact entity lookup and reopening the store. The scan columns
+are what every graph operation cost before the store: parse the whole
+log. Search results are checked against the scan.
+
+    python -m skills.engram.bench.graph [10000 100000 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from ..graph import TripletStore, format_triplet
+from ..recall import GRAPH_LIMIT
+
+PREDICATES = ["works_at", "knows", "merged", "contacted", "uses", "built"]
+
+
+def random_triplets(rng: random.Random, count: int, entities: int = 2000) -> list[dict]:
+    return [{
+        "subject": f"Entity{rng.randrange(entities)}",
+        "predicate": rng.choice(PREDICATES),
+        "object": f"Entity{rng.randrange(entities)}",
+        "detail": f"detail {rng.randrange(100000)}",
+        "date": f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}",
+    } for _ in range(count)]
+
+
+def scan_new(path: Path, triplets: list[dict], date_str: str) -> list[dict]:
+    """Dedup by reading the whole log."""
+    existing = set()
+    with open(path) as f:
+        for line in f:
+            t = json.loads(line)
+            existing.add((t.get("date"), t.get("subject"), t.get("predicate"), t.get("object")))
+    return [t for t in triplets if (date_str, t["subject"], t["predicate"], t["object"]) not in existing]
+
+
+def scan_search(path: Path, text: str) -> list[str]:
+    """Substring search by reading the whole log."""
+    needle = text.lower()
+    found = []
+    with open(path) as f:
+        for line in f:
+            t = json.loads(line)
+            if (needle in t.get("subject", "").lower() or needle in t.get("object", "").lower()
+                    or needle in t.get("detail", "").lower()):
+                found.append(format_triplet(t))
+    return found
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    workdir = Path(tempfile.mkdtemp(prefix="engram-bench-"))
+    try:
+        log = workdir / "graph.jsonl"
+        with open(log, "w") as f:
+            for t in random_triplets(rng, size):
+                f.write(json.dumps(t) + "\n")
+
+        store, import_ms = timed(TripletStore, log)
+        batch = random_triplets(rng, 50)
+        _, scan_add_ms = timed(scan_new, log, batch, "2026-10-01")
+        _, add_ms = timed(store.add, [dict(t) for t in batch], "2026-10-01")
+
+        query = f"Entity{rng.randrange(2000)}"
+        expected, scan_search_ms = timed(scan_search, log, query)
+        found, search_ms = timed(store.search, query)
+        recent, recent_ms = timed(store.search, query, GRAPH_LIMIT)
+        assert [format_triplet(t) for t in found] == expected
+        assert [format_triplet(t) for t in recent] == expected[-GRAPH_LIMIT:]
+        edges, find_ms = timed(store.find, entity=query)
+        store.close()
+        reopened, reopen_ms = timed(TripletStore, log)
+        reopened.close()
+
+        print(f"{size:>9,}  import {import_ms / 1000:6.2f}s  "
+              f"add 50: scan {scan_add_ms:8.1f}ms / store {add_ms:6.1f}ms  "
+              f"search: scan {scan_search_ms:8.1f}ms / store {search_ms:6.1f}ms, "
+              f"{GRAPH_LIMIT} newest {recent_ms:5.1f}ms ({len(found)} hits)  "
+              f"find {find_ms:5.2f}ms ({len(edges)})  reopen {reopen_ms:4.1f}ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Recall over synthetic entity pages, against a scan of every page.
+
+For each size, a workspace of random entity pages (facts, a timeline,
+wikilinks) is written and indexed, then timed: the first recall (which
+builds the name index) and warm recalls for an exact name, a typo'd
+name, a content word, a phrase and a miss. The scan column is what the
+content stage cost before the inverted index: read and lowercase every
+page looking for the query.
+
+    python -m skills.engram.bench.recall [1000 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from ..config import EngramConfig
+from ..entity import render_new
+from ..recall import RecallEngine
+
+FIRST = ["Anna", "Marcus", "Peter", "Lena", "Omar", "Yuki", "Sara", "Ivan", "Chen", "Maya"]
+LAST = ["Tanaka", "Widing", "Steinberger", "Okafor", "Novak", "Silva", "Berg", "Kowalski"]
+TOPICS = ["kafka migration", "pricing page", "hiring plan", "security review", "launch party",
+          "billing outage", "design system", "quarterly report", "mobile beta", "data warehouse"]
+
+
+def write_pages(entities_dir: Path, count: int, rng: random.Random) -> list[str]:
+    names = [f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}" for i in range(count)]
+    for name in names:
+        timeline = [f"- worked on the {rng.choice(TOPICS)} with [[{rng.choice(names)}]]"
+                    for _ in range(rng.randint(1, 6))]
+        facts = [f"Leads the {rng.choice(TOPICS)}"]
+        page = render_new(name, "person", facts, f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}",
+                          timeline, set())
+        (entities_dir / f"{name.replace(' ', '-')}.md").write_text(page)
+    return names
+
+
+def scan(entities_dir: Path, query: str) -> int:
+    """The old content stage: every page read and searched for the query."""
+    needle = query.lower()
+    return sum(needle in path.read_text().lower() for path in entities_dir.glob("*.md"))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    workspace = Path(tempfile.mkdtemp(prefix="engram-bench-"))
+    try:
+        config = EngramConfig(workspace=workspace)
+        config.resolve()
+        start = time.perf_counter()
+        names = write_pages(config.entities_dir, size, rng)
+        written = time.perf_counter() - start
+
+        engine = RecallEngine(config, sweep=False)
+        _, index_ms = timed(engine.catalog.reconcile)
+        name = rng.choice(names)
+        _, first_ms = timed(engine.recall, name)
+        queries = {
+            "name": rng.choice(names),
+            "typo": rng.choice(names).replace("a", "e", 1),
+            "word": "warehouse",
+            "phrase": "security review",
+            "miss": "zzyzx",
+        }
+        parts = []
+        for kind, query in queries.items():
+            _, recall_ms = timed(engine.recall, query)
+            _, scan_ms = timed(scan, config.entities_dir, query)
+            parts.append(f"{kind} {recall_ms:7.1f}ms (scan {scan_ms:7.1f}ms)")
+        engine.catalog.close()
+        print(f"{size:>7,} pages (written in {written:.1f}s)  index {index_ms / 1000:6.2f}s  "
+              f"first recall {first_ms:7.1f}ms  " + "  ".join(parts))
+    finally:
+        shutil.rmtree(workspace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Cache — content-addressed store for LLM extraction results.
+
+Problem: Re-running extraction after a crash, a config change or `--all`
+re-sends identical chunks and pays for the same JSON again.
+
+Solution:
+1. Key = sha256(cache version, model, full prompt). The prompt embeds the
+   template, the date and the chunk, so editing a template or a chunk
+   changes the key; CACHE_VERSION is bumped when the result format changes
+2. Parsed JSON results are stored zlib-compressed in SQLite
+   (<memory_dir>/.cache/extract.db)
+3. When the cache grows past ENGRAM_CACHE_MB (default 64), the least
+   recently used entries are evicted
+4. `--no-cache` (or ENGRAM_NO_CACHE=1) bypasses it
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = int(os.environ.get("ENGRAM_CACHE_MB", "64")) * 1024 * 1024
+
+
+def cache_disabled() -> bool:
+    return os.environ.get("ENGRAM_NO_CACHE", "") not in ("", "0")
+
+
+def cache_key(model: str, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (str(CACHE_VERSION), model, prompt):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of parsed LLM results. Safe to share between threads."""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries(used)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, value: dict):
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode(), 6)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._size += len(blob) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of the size limit."""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            doomed.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def close(self):
+        self._conn.close()
+
+
+def open_cache(memory_dir: Path) -> Optional[ExtractionCache]:
+    """The workspace's extraction cache, or None when caching is disabled."""
+    if cache_disabled():
+        return None
+    return ExtractionCache(memory_dir / ".cache" / "extract.db")
+
@@ -0,0 +1,329 @@
+"""
+Catalog — metadata sidecar for entity pages.
+
+Problem: `entities`, `stats`, decay's health scan and prediction error
+each opened and regex-scanned every entity page, only to pull out the
+same few fields (type, last timeline date, timeline count, access count).
+With tens of thousands of pages that took seconds.
+
+Solution:
+1. A SQLite catalog (<memory_dir>/.cache/entities-catalog.db) keeps one
+   row per page: type, last date, timeline count, access count, length,
+   plus the file's mtime and size when the row was taken
+2. Engram writes (EntityBatch.flush) update rows incrementally
+3. reconcile() stats every page and re-reads only those whose mtime or
+   size changed (manual edits, other tools); removed pages are dropped
+4. The same database holds the recall index (textindex.TextIndex) and
+   each page's outgoing wikilinks (links.page_links), kept in step with
+   the rows
+5. open_catalog() skips that sweep while the directory's mtime is
+   unchanged (no page created, deleted or renamed into place) and the
+   last sweep is less than ENGRAM_CATALOG_SWEEP seconds (default 60)
+   old, so in-place edits are picked up within that window
+6. Recall counts are not kept in the pages: the access log
+   (access.AccessCounter) is folded into the access table by byte
+   offset, and EntityMeta.accessed adds them to a page's own
+   **Accessed:** count
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .access import ACCESS_LOG, parse_log
+from .links import page_links
+from .textindex import TextIndex
+
+SWEEP_INTERVAL = float(os.environ.get("ENGRAM_CATALOG_SWEEP", "60"))
+SCHEMA_VERSION = 5
+COMMIT_EVERY = 500  # pages per transaction while sweeping, so other writers are not locked out
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    stem TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    last_date TEXT,
+    timeline INTEGER NOT NULL,
+    accessed INTEGER NOT NULL,
+    chars INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    doc INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (doc, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_target ON links(target);
+CREATE TABLE IF NOT EXISTS access (
+    stem TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    last TEXT NOT NULL
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO meta (key, value) VALUES ('names', 0);
+CREATE TRIGGER IF NOT EXISTS entities_added AFTER INSERT ON entities BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'names';
+END;
+CREATE TRIGGER IF NOT EXISTS entities_removed AFTER DELETE ON entities BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'names';
+END;
+"""
+COLUMNS = "stem, type, last_date, timeline, accessed, chars, mtime, size"
+UPSERT = (
+    f"INSERT INTO entities ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (stem) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS.split(", ")[1:])
+    + " RETURNING id"
+)
+# Rows as read: a page's own **Accessed:** count plus the logged ones
+SELECT = (
+    "SELECT e.stem, e.type, e.last_date, e.timeline, e.accessed + COALESCE(a.count, 0),"
+    " e.chars, e.mtime, e.size, a.last FROM entities e LEFT JOIN access a ON a.stem = e.stem"
+)
+
+TYPE_RE = re.compile(r'\*\*Type:\*\*\s*(\w+)')
+ACCESSED_RE = re.compile(r'\*\*Accessed:\*\*\s*(\d+)')
+DATE_RE = re.compile(r'### \[\[(\d{4}-\d{2}-\d{2})\]\]')
+
+
+class EntityMeta(NamedTuple):
+    stem: str
+    type: str
+    last_date: Optional[str]  # most recent ### [[YYYY-MM-DD]] on the page
+    timeline: int             # number of timeline sections
+    accessed: int
+    chars: int
+    mtime: int
+    size: int
+    last_accessed: Optional[str] = None  # date of the latest logged access
+
+    @property
+    def name(self) -> str:
+        return self.stem.replace("-", " ")
+
+
+def describe(stem: str, content: str, st: os.stat_result) -> tuple:
+    """A catalog row for a page's content and its stat."""
+    type_match = TYPE_RE.search(content)
+    accessed = ACCESSED_RE.search(content)
+    dates = DATE_RE.findall(content)
+    return (
+        stem,
+        type_match.group(1) if type_match else "unknown",
+        max(dates) if dates else None,
+        content.count("### [["),
+        int(accessed.group(1)) if accessed else 0,
+        len(content),
+        st.st_mtime_ns,
+        st.st_size,
+    )
+
+
+class Catalog:
+    """Entity metadata rows keyed by file stem."""
+
+    def __init__(self, entities_dir: Path):
+        self.entities_dir = entities_dir
+        # Kept outside the entities directory so its own files never touch the directory's mtime
+        self.path = entities_dir.parent / ".cache" / f"{entities_dir.name}-catalog.db"
+        entities_dir.mkdir(parents=True, exist_ok=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Older layout: it is only a cache of the pages, so start over
+            self._conn.executescript("".join(f"DROP TABLE IF EXISTS {table};"
+                                             for table in ("entities", "meta", "links", "access", *TextIndex.TABLES)))
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+        self.text = TextIndex(self._conn)
+
+    def reconcile(self) -> int:
+        """Re-read pages changed on disk since their row was taken. Returns how many rows changed."""
+        dir_mtime = os.stat(self.entities_dir).st_mtime_ns  # before the scan: changes during it trigger the next one
+        swept = time.time()
+        mtimes = dict(self._conn.execute("SELECT stem, mtime FROM entities"))
+        sizes = dict(self._conn.execute("SELECT stem, size FROM entities"))
+        changed, seen = [], set()
+        with os.scandir(self.entities_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith(".md") or not entry.is_file():
+                    continue
+                stem = name[:-3]
+                seen.add(stem)
+                st = entry.stat()
+                if mtimes.get(stem) != st.st_mtime_ns or sizes.get(stem) != st.st_size:
+                    changed.append((stem, entry.path, st))
+        removed = mtimes.keys() - seen
+
+        for i in range(0, len(changed), COMMIT_EVERY):
+            with self._conn:
+                self._conn.execute("BEGIN")
+                for stem, path, st in changed[i:i + COMMIT_EVERY]:
+                    try:
+                        self._store(stem, Path(path).read_text(), st)
+                    except FileNotFoundError:
+                        self._drop(stem)  # deleted since the scan
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for stem in removed:
+                self._drop(stem)
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                   [("dir_mtime", dir_mtime), ("swept", swept)])
+        return len(changed) + len(removed)
+
+    def fresh(self, max_age: float = SWEEP_INTERVAL) -> bool:
+        """True if no page was created, deleted or renamed since a sweep less than `max_age` seconds ago."""
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if "swept" not in meta or time.time() - meta["swept"] >= max_age:
+            return False
+        return meta["dir_mtime"] == os.stat(self.entities_dir).st_mtime_ns
+
+    def fold_access(self) -> int:
+        """Add the accesses logged since the last fold to the access table. Returns how many pages they touched."""
+        log = self.entities_dir / ACCESS_LOG
+        try:
+            size = log.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == self._access_offset():
+            return 0
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            offset = self._access_offset()  # another process may have folded meanwhile
+            if size < offset:
+                # Log was rewritten: count it again from the start
+                self._conn.execute("DELETE FROM access")
+                offset = 0
+            data = b""
+            if size:
+                with open(log, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(size - offset)
+            data = data[:data.rfind(b"\n") + 1]  # a flush may be in progress
+            counts, last = parse_log(data)
+            self._conn.executemany(
+                "INSERT INTO access (stem, count, last) VALUES (?, ?, ?) ON CONFLICT (stem) DO UPDATE"
+                " SET count = count + excluded.count, last = MAX(last, excluded.last)",
+                ((stem, count, last[stem]) for stem, count in counts.items()),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('access', ?)",
+                               (offset + len(data),))
+        return len(counts)
+
+    def _access_offset(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'access'").fetchone()
+        return row[0] if row else 0
+
+    def access_counts(self) -> dict[int, int]:
+        """Page id -> access count, for pages accessed at least once."""
+        return dict(self._conn.execute(
+            "SELECT e.id, e.accessed + COALESCE(a.count, 0) AS n FROM entities e"
+            " LEFT JOIN access a ON a.stem = e.stem WHERE n > 0"
+        ))
+
+    def update(self, pages: dict[str, str]):
+        """Record pages just written: {stem: content}."""
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for stem, content in pages.items():
+                self._store(stem, content, (self.entities_dir / f"{stem}.md").stat())
+
+    def drop(self, stem: str):
+        """Forget a page found missing (deleted since the last sweep)."""
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._drop(stem)
+
+    def _store(self, stem: str, content: str, st: os.stat_result):
+        (doc,) = self._conn.execute(UPSERT, describe(stem, content, st)).fetchone()
+        self.text.index(doc, content)
+        self._conn.execute("DELETE FROM links WHERE doc = ?", (doc,))
+        self._conn.executemany("INSERT INTO links (doc, target, date) VALUES (?, ?, ?)",
+                               ((doc, target, day) for target, day in page_links(content).items()))
+
+    def _drop(self, stem: str):
+        row = self._conn.execute("SELECT id FROM entities WHERE stem = ?", (stem,)).fetchone()
+        if row:
+            self.text.remove(row[0])
+            self._conn.execute("DELETE FROM links WHERE doc = ?", row)
+            self._conn.execute("DELETE FROM entities WHERE id = ?", row)
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the catalog."""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def version(self) -> tuple[int, int]:
+        """Changes whenever the catalog does, through this connection or another."""
+        return self.data_version(), self._conn.total_changes
+
+    def names_version(self) -> int:
+        """Bumped whenever a page is added or removed (not when one changes)."""
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'names'").fetchone()[0]
+
+    def stems(self) -> dict[int, str]:
+        """Page id -> file stem."""
+        return dict(self._conn.execute("SELECT id, stem FROM entities"))
+
+    def existing(self, stems: Iterable[str]) -> set[str]:
+        """The given stems that have a page."""
+        stems = list(stems)
+        found = set()
+        for i in range(0, len(stems), 500):
+            chunk = stems[i:i + 500]
+            found.update(s for (s,) in self._conn.execute(
+                f"SELECT stem FROM entities WHERE stem IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def linked(self, stem: str) -> dict[str, Optional[str]]:
+        """Pages this page links to or is linked from -> latest date of those links."""
+        return dict(self._conn.execute(
+            "SELECT stem, MAX(date) FROM ("
+            " SELECT t.stem AS stem, l.date AS date FROM entities e JOIN links l ON l.doc = e.id"
+            " JOIN entities t ON t.stem = l.target WHERE e.stem = ?1"
+            " UNION ALL"
+            " SELECT e.stem, l.date FROM links l JOIN entities e ON e.id = l.doc WHERE l.target = ?1"
+            ") WHERE stem != ?1 GROUP BY stem",
+            (stem,),
+        ))
+
+    def get(self, stem: str) -> Optional[EntityMeta]:
+        row = self._conn.execute(f"{SELECT} WHERE e.stem = ?", (stem,)).fetchone()
+        return EntityMeta._make(row) if row else None
+
+    def entries(self) -> list[EntityMeta]:
+        """Every page's metadata, sorted by file name."""
+        return list(self)
+
+    def __iter__(self) -> Iterator[EntityMeta]:
+        return map(EntityMeta._make, self._conn.execute(f"{SELECT} ORDER BY e.stem"))
+
+    def type_counts(self) -> dict[str, int]:
+        return dict(self._conn.execute("SELECT type, COUNT(*) FROM entities GROUP BY type"))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def open_catalog(entities_dir: Path) -> Catalog:
+    """The entities directory's catalog, swept unless that happened recently, with logged accesses folded in."""
+    catalog = Catalog(entities_dir)
+    if not catalog.fresh():
+        catalog.reconcile()
+    catalog.fold_access()
+    return catalog
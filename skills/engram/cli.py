@@ -3,6 +3,7 @@
 
 import argparse
 import json
+import os
 import sys
 from datetime import date
 from pathlib import Path
@@ -18,16 +19,14 @@ def cmd_extract(args):
     cfg = load_config(args.config)
     
     if args.all:
-        import glob
-        files = sorted(cfg.memory_dir.glob("2*-*-*.md"))
-        import re
-        for f in files:
-            if re.match(r'^\d{4}-\d{2}-\d{2}$', f.stem):
-                process_date(f.stem)
+        from .backfill import run_backfill
+        from .journal import list_dates
+        run_backfill(list_dates(cfg.memory_dir), cfg.memory_dir, jobs=args.jobs,
+                     full=args.full, restart=args.restart)
     elif args.date:
-        process_date(args.date)
+        process_date(args.date, full=args.full)
     else:
-        process_date(date.today().isoformat())
+        process_date(date.today().isoformat(), full=args.full)
 
 
 def cmd_surprise(args):
@@ -88,17 +87,49 @@ def cmd_consolidate(args):
         print(result)
 
 
+def _read_queries(source: str) -> list[str]:
+    """Queries from a file or stdin ("-"): a JSON list, or one per line."""
+    text = (sys.stdin.read() if source == "-" else Path(source).read_text()).strip()
+    if text.startswith("["):
+        return [str(q) for q in json.loads(text)]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
 def cmd_recall(args):
     """Query the knowledge graph."""
+    from .daemon import request
     cfg = load_config(args.config)
-    result = recall(args.query, cfg, hops=args.hops)
+    
+    if args.batch:
+        queries = _read_queries(args.batch)
+        results = request(cfg, "recall_many", queries=queries, hops=args.hops)
+        if results is None:
+            from .recall import recall_many
+            results = recall_many(queries, cfg, hops=args.hops)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            for query, result in results.items():
+                print(f"## {query}\n\n{result}\n")
+        return
+    if not args.query:
+        print("Usage: engram recall <query>")
+        print("       engram recall --batch <file | ->")
+        return
+    
+    result = request(cfg, "recall", query=args.query, hops=args.hops)
+    if result is None:
+        result = recall(args.query, cfg, hops=args.hops)
     print(result)
 
 
 def cmd_entities(args):
     """List all known entities."""
+    from .daemon import request
     cfg = load_config(args.config)
-    entities = list_entities(cfg)
+    entities = request(cfg, "entities")
+    if entities is None:
+        entities = list_entities(cfg)
     
     if args.json:
         print(json.dumps(entities, indent=2))
@@ -170,61 +201,99 @@ def cmd_viz(args):
         print("No graph data yet. Run 'engram extract' first.")
         return
     
+    from .graph import open_store
     seen = set()
     print("graph LR")
-    for line in cfg.graph_file.read_text().strip().split("\n"):
-        if not line:
-            continue
-        try:
-            t = json.loads(line)
-            s = t["subject"].replace(" ", "_").replace("#", "Nr").replace(".", "")
-            o = t["object"].replace(" ", "_").replace("#", "Nr").replace(".", "")
-            p = t["predicate"]
-            key = f"{s}-{p}-{o}"
-            if key not in seen:
-                seen.add(key)
-                print(f"    {s} -->|{p}| {o}")
-        except:
-            continue
+    for subject, p, obj in open_store(cfg.graph_file).edges():
+        s = subject.replace(" ", "_").replace("#", "Nr").replace(".", "")
+        o = obj.replace(" ", "_").replace("#", "Nr").replace(".", "")
+        key = f"{s}-{p}-{o}"
+        if key not in seen:
+            seen.add(key)
+            print(f"    {s} -->|{p}| {o}")
 
 
 def cmd_stats(args):
     """Show engram statistics."""
     cfg = load_config(args.config)
     
-    entities = list_entities(cfg)
+    from .catalog import open_catalog
+    catalog = open_catalog(cfg.entities_dir)
+    entity_count = len(catalog)
+    types = catalog.type_counts()
     
     # Count triplets
     triplet_count = 0
     if cfg.graph_file.exists():
-        triplet_count = sum(1 for line in cfg.graph_file.read_text().strip().split("\n") if line)
+        from .graph import open_store
+        triplet_count = len(open_store(cfg.graph_file))
     
     # Count surprises
     surprise_count = 0
     if cfg.surprise_file.exists():
-        surprise_count = sum(1 for line in cfg.surprise_file.read_text().strip().split("\n") if line)
+        with open(cfg.surprise_file, "rb") as f:
+            surprise_count = sum(1 for line in f if line.strip())
     
-    # Count daily files
-    import re
-    daily_count = sum(1 for f in cfg.memory_dir.glob("*.md") 
-                      if re.match(r'^\d{4}-\d{2}-\d{2}$', f.stem))
+    # Count daily files (plain and archived)
+    from .journal import list_dates
+    daily_count = len(list_dates(cfg.memory_dir))
     
     print(f"🧠 Engram Stats")
-    print(f"  Entities:      {len(entities)}")
+    print(f"  Entities:      {entity_count}")
     print(f"  Triplets:      {triplet_count}")
     print(f"  Surprises:     {surprise_count}")
     print(f"  Daily files:   {daily_count}")
     print(f"  Workspace:     {cfg.workspace}")
     
-    if entities:
-        types = {}
-        for e in entities:
-            types[e["type"]] = types.get(e["type"], 0) + 1
+    if types:
         print(f"\n  Entity types:")
         for t, c in sorted(types.items(), key=lambda x: -x[1]):
             print(f"    {t}: {c}")
 
 
+def cmd_graph(args):
+    """Import or export triplets as JSONL."""
+    from .graph import open_store
+    cfg = load_config(args.config)
+    store = open_store(cfg.graph_file)
+    
+    if args.action in ("import", "export") and not args.path:
+        print(f"Usage: engram graph {args.action} <file.jsonl>")
+    elif args.action == "import":
+        added = store.import_jsonl(Path(args.path))
+        print(f"Imported {added} new triplets ({len(store)} total)")
+    elif args.action == "export":
+        count = store.export_jsonl(Path(args.path))
+        print(f"Exported {count} triplets to {args.path}")
+    else:
+        stale = sum(1 for t in store if t.get("stale"))
+        print(f"{len(store)} triplets ({stale} stale) in {store.db_path}")
+
+
+def cmd_serve(args):
+    """Serve recall from warm indexes over a Unix socket."""
+    from .daemon import serve
+    serve(load_config(args.config))
+
+
+def cmd_compress(args):
+    """Gzip daily logs older than N days."""
+    from .archive import compress_daily
+    cfg = load_config(args.config)
+    report = compress_daily(cfg.memory_dir, days=args.days, dry_run=args.dry_run)
+
+    if not report.files:
+        print("Nothing to compress.")
+        return
+    if args.dry_run:
+        print(f"Would compress {report.files} files ({report.original_bytes / 1e6:.2f} MB)")
+        return
+    print(f"🗜️  Compressed {report.files} daily files")
+    print(f"   {report.original_bytes / 1e6:.2f} MB → {report.compressed_bytes / 1e6:.2f} MB "
+          f"(saved {report.saved_bytes / 1e6:.2f} MB)")
+    print(f"   Read-back: {report.read_throughput:.1f} MB/s")
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="engram",
@@ -232,6 +301,8 @@ def main():
     )
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     parser.add_argument("--config", "-c", help="Path to engram.yaml config file")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM extraction cache")
+    parser.add_argument("--no-daemon", action="store_true", help="Answer in-process even if `engram serve` is running")
     
     sub = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -239,6 +310,10 @@ def main():
     p_extract = sub.add_parser("extract", help="Extract entities from daily logs")
     p_extract.add_argument("--date", "-d", help="Specific date (YYYY-MM-DD)")
     p_extract.add_argument("--all", action="store_true", help="Process all daily files")
+    p_extract.add_argument("--full", action="store_true", help="Ignore checkpoints and re-extract whole days")
+    p_extract.add_argument("--jobs", "-j", type=int, default=int(os.environ.get("ENGRAM_BACKFILL_JOBS", "2")),
+                           help="Dates extracted concurrently with --all")
+    p_extract.add_argument("--restart", action="store_true", help="With --all: ignore the backfill ledger")
     p_extract.set_defaults(func=cmd_extract)
     
     # surprise
@@ -255,8 +330,11 @@ def main():
     
     # recall
     p_recall = sub.add_parser("recall", help="Query the knowledge graph")
-    p_recall.add_argument("query", help="What to look up")
+    p_recall.add_argument("query", nargs="?", help="What to look up")
     p_recall.add_argument("--hops", type=int, default=1, help="Graph traversal depth")
+    p_recall.add_argument("--batch", metavar="FILE",
+                          help="Recall every query in FILE ('-' for stdin): one per line or a JSON list")
+    p_recall.add_argument("--json", action="store_true", help="With --batch: print {query: result} as JSON")
     p_recall.set_defaults(func=cmd_recall)
     
     # entities
@@ -277,6 +355,22 @@ def main():
     p_merge.add_argument("--detect", action="store_true", help="Auto-detect potential duplicates")
     p_merge.set_defaults(func=cmd_merge)
     
+    # graph
+    p_graph = sub.add_parser("graph", help="Triplet store: info, import or export JSONL")
+    p_graph.add_argument("action", nargs="?", choices=["info", "import", "export"], default="info")
+    p_graph.add_argument("path", nargs="?", help="JSONL file to import from / export to")
+    p_graph.set_defaults(func=cmd_graph)
+    
+    # compress
+    p_compress = sub.add_parser("compress", help="Gzip daily logs older than N days")
+    p_compress.add_argument("--days", type=int, default=30, help="Keep the last N days uncompressed")
+    p_compress.add_argument("--dry-run", action="store_true", help="Show what would be compressed")
+    p_compress.set_defaults(func=cmd_compress)
+    
+    # serve
+    p_serve = sub.add_parser("serve", help="Keep indexes warm and answer recall over a Unix socket")
+    p_serve.set_defaults(func=cmd_serve)
+    
     # viz
     p_viz = sub.add_parser("viz", help="Visualize knowledge graph (Mermaid)")
     p_viz.set_defaults(func=cmd_viz)
@@ -286,6 +380,10 @@ def main():
     p_stats.set_defaults(func=cmd_stats)
     
     args = parser.parse_args()
+    if args.no_cache:
+        os.environ["ENGRAM_NO_CACHE"] = "1"
+    if args.no_daemon:
+        os.environ["ENGRAM_NO_DAEMON"] = "1"
     
     if not args.command:
         parser.print_help()
@@ -12,18 +12,24 @@ Improvements over v1:
 
 Usage:
     python3 gardener-improved.py                    # Process today
-    python3 gardener-improved.py --all              # Process all daily files
+    python3 gardener-improved.py --all              # Process all daily files (resumable backfill)
     python3 gardener-improved.py --date 2026-02-16  # Specific date
+    python3 gardener-improved.py --full             # Ignore checkpoints, re-extract whole days
+    python3 gardener-improved.py --no-cache         # Bypass the extraction cache
     python3 gardener-improved.py --surprise         # Surprise scoring
     python3 gardener-improved.py --consolidate      # Update MEMORY.md from entities
 """
 
+import hashlib
 import json
 import os
 import sys
-import glob
 import re
+import threading
+import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, date
 from pathlib import Path
 
@@ -34,6 +40,7 @@ ENTITIES_DIR = MEMORY_DIR / "entities"
 GRAPH_FILE = MEMORY_DIR / "graph.jsonl"
 MEMORY_FILE = WORKSPACE / "MEMORY.md"
 SURPRISE_FILE = MEMORY_DIR / "surprise-scores.jsonl"
+CHECKPOINT_FILE = MEMORY_DIR / "extract-checkpoints.json"
 
 ENTITIES_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -106,8 +113,43 @@ ENTITY FILES:
 """
 
 
-def call_gemini(prompt: str) -> dict | None:
-    """Call Gemini Flash API and parse JSON response."""
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The extraction cache for this workspace (None if disabled with --no-cache)."""
+    global _cache
+    from .cache import cache_disabled, open_cache
+    if cache_disabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = open_cache(MEMORY_DIR)
+    return _cache
+
+
+def call_gemini(prompt: str, cache: bool = True) -> dict | None:
+    """Call Gemini Flash API and parse JSON response, through the extraction cache.
+    
+    Pass cache=False for prompts whose answer should reflect the current
+    state (surprise scoring, consolidation) rather than be replayed.
+    """
+    from .cache import cache_key
+    cache = get_cache() if cache else None
+    key = cache_key(API_URL, prompt)
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+    
+    result = _call_gemini_api(prompt)
+    if cache is not None and result:
+        cache.put(key, result)
+    return result
+
+
+def _call_gemini_api(prompt: str) -> dict | None:
     if not API_KEY:
         print("No GEMINI_API_KEY set", file=sys.stderr)
         return None
@@ -156,16 +198,15 @@ def extract_json_from_text(text: str) -> dict | None:
 
 
 def read_daily_file(date_str: str) -> str:
-    """Read a daily memory file."""
-    path = MEMORY_DIR / f"{date_str}.md"
-    if path.exists():
-        return path.read_text()
-    return ""
+    """Read a daily memory file (the JSONL journal if there is one)."""
+    from .journal import read_daily
+    return read_daily(MEMORY_DIR, date_str)
 
 
 def sanitize_filename(name: str) -> str:
     """Convert entity name to safe filename."""
-    return re.sub(r'[^\w\s-]', '', name).strip().replace(' ', '-')
+    from .links import stem_of
+    return stem_of(name)
 
 
 def read_entity_file(name: str) -> str:
@@ -176,114 +217,68 @@ def read_entity_file(name: str) -> str:
     return ""
 
 
+def _timeline_lines(name: str, events: list, triplets: list) -> list[str]:
+    """Timeline bullets for one entity from a day's extraction."""
+    lines = []
+    for event in events:
+        if any(name.lower() in e.lower() for e in event.get("entities", [])):
+            lines.append(f"- {event['description']}")
+    for triplet in triplets:
+        if triplet["subject"] == name:
+            lines.append(f"- {triplet['predicate']} → [[{triplet['object']}]]: {triplet['detail']}")
+        elif triplet["object"] == name:
+            lines.append(f"- [[{triplet['subject']}]] {triplet['predicate']} → this: {triplet['detail']}")
+    return lines
+
+
+def _related(name: str, triplets: list) -> set[str]:
+    related = set()
+    for triplet in triplets:
+        if triplet["subject"] == name:
+            related.add(triplet["object"])
+        elif triplet["object"] == name:
+            related.add(triplet["subject"])
+    return related
+
+
+def merge_entity(batch, name: str, entity_type: str, facts: list,
+                 date_str: str, events: list, triplets: list):
+    """Merge one entity's extraction for a date into a batch of loaded pages.
+    
+    Facts and relations not yet on the page are added; timeline lines go
+    into the date's section (merged if an earlier run over the same day
+    already wrote one).
+    """
+    batch.merge(sanitize_filename(name), name, entity_type, facts, date_str,
+                _timeline_lines(name, events, triplets), _related(name, triplets))
+
+
+def flush_entities(batch):
+    """Write every page the batch changed, once each."""
+    for filename in batch.flush():
+        print(f"  {'Created' if filename in batch.created else 'Updated'}: {filename}.md")
+
+
 def update_entity_file(name: str, entity_type: str, facts: list, 
                        date_str: str, events: list, triplets: list):
-    """Create or update an entity wiki page with deduplication."""
-    filename = sanitize_filename(name)
-    filepath = ENTITIES_DIR / f"{filename}.md"
-    existing = filepath.read_text() if filepath.exists() else ""
-    
-    # Check if this date already processed (dedup)
-    if f"### [[{date_str}]]" in existing:
-        return  # Already processed this date
-    
-    if existing:
-        # Append new timeline entry
-        lines = existing.rstrip().split('\n')
-        
-        # Add new facts if not already present
-        for fact in facts:
-            if fact not in existing:
-                # Find Facts section and append
-                for i, line in enumerate(lines):
-                    if line.startswith('## Facts'):
-                        # Find next section or end
-                        insert_at = i + 1
-                        while insert_at < len(lines) and not lines[insert_at].startswith('## '):
-                            insert_at += 1
-                        lines.insert(insert_at, f"- {fact}")
-                        break
-        
-        # Add timeline entry
-        timeline_entry = f"\n### [[{date_str}]]"
-        for event in events:
-            if any(name.lower() in e.lower() for e in event.get("entities", [])):
-                timeline_entry += f"\n- {event['description']}"
-        
-        for triplet in triplets:
-            if triplet["subject"] == name:
-                timeline_entry += f"\n- {triplet['predicate']} → [[{triplet['object']}]]: {triplet['detail']}"
-            elif triplet["object"] == name:
-                timeline_entry += f"\n- [[{triplet['subject']}]] {triplet['predicate']} → this: {triplet['detail']}"
-        
-        if timeline_entry.count('\n') > 1:  # Has content beyond header
-            content = '\n'.join(lines) + timeline_entry + '\n'
-            filepath.write_text(content)
-            print(f"  Updated: {filename}.md")
-    else:
-        # Create new entity file
-        content = f"# {name}\n**Type:** {entity_type}\n\n"
-        
-        if facts:
-            content += "## Facts\n"
-            for fact in facts:
-                content += f"- {fact}\n"
-            content += "\n"
-        
-        content += "## Timeline\n"
-        content += f"\n### [[{date_str}]]\n"
-        
-        for event in events:
-            if any(name.lower() in e.lower() for e in event.get("entities", [])):
-                content += f"- {event['description']}\n"
-        
-        for triplet in triplets:
-            if triplet["subject"] == name:
-                content += f"- {triplet['predicate']} → [[{triplet['object']}]]: {triplet['detail']}\n"
-            elif triplet["object"] == name:
-                content += f"- [[{triplet['subject']}]] {triplet['predicate']} → this: {triplet['detail']}\n"
-        
-        content += "\n## Relations\n"
-        related = set()
-        for triplet in triplets:
-            if triplet["subject"] == name:
-                related.add(triplet["object"])
-            elif triplet["object"] == name:
-                related.add(triplet["subject"])
-        for r in sorted(related):
-            content += f"- [[{r}]]\n"
-        
-        filepath.write_text(content)
-        print(f"  Created: {filename}.md")
+    """Create or update a single entity wiki page with deduplication."""
+    from .entity import EntityBatch
+    batch = EntityBatch(ENTITIES_DIR)
+    merge_entity(batch, name, entity_type, facts, date_str, events, triplets)
+    flush_entities(batch)
 
 
 def append_to_graph(triplets: list, date_str: str):
-    """Append triplets to graph.jsonl with dedup."""
-    existing = set()
-    if GRAPH_FILE.exists():
-        for line in GRAPH_FILE.read_text().strip().split('\n'):
-            if line:
-                try:
-                    t = json.loads(line)
-                    existing.add((t.get("date"), t.get("subject"), t.get("predicate"), t.get("object")))
-                except:
-                    pass
-    
-    new_count = 0
-    with open(GRAPH_FILE, "a") as f:
-        for t in triplets:
-            key = (date_str, t["subject"], t["predicate"], t["object"])
-            if key not in existing:
-                t["date"] = date_str
-                t["timestamp"] = datetime.now().isoformat()
-                f.write(json.dumps(t) + "\n")
-                new_count += 1
-    
+    """Append triplets to graph.jsonl with dedup (via the indexed triplet store)."""
+    from .graph import open_store
+    new_count = open_store(GRAPH_FILE).add(triplets, date_str)
     if new_count:
         print(f"  Added {new_count} new triplets to graph.jsonl")
 
 
 MAX_CHUNK_SIZE = int(os.environ.get("ENGRAM_MAX_CHUNK", "6000"))
+CONCURRENCY = int(os.environ.get("ENGRAM_CONCURRENCY", "4"))
+RETRIES = int(os.environ.get("ENGRAM_RETRIES", "2"))
 
 
 def chunk_content(content: str, max_size: int = MAX_CHUNK_SIZE) -> list[str]:
@@ -388,16 +383,122 @@ def merge_extraction_results(results: list[dict]) -> dict:
     }
 
 
-def process_date(date_str: str):
-    """Process a daily file: extract entities, triplets, events.
+SECTION_HEADER = re.compile(r'^#{1,3} ', re.MULTILINE)
+
+
+def load_checkpoints() -> dict:
+    """Per-date extraction checkpoints: {date: {offset, hash, boundary}}."""
+    if CHECKPOINT_FILE.exists():
+        try:
+            return json.loads(CHECKPOINT_FILE.read_text())
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def save_checkpoint(date_str: str, content: str):
+    """Record that `content` (a day's log as read) has been extracted.
+    
+    offset is a byte offset into the UTF-8 text, hash covers everything
+    before it, and boundary is where the last section starts.
+    """
+    from .filelock import file_lock
+    data = content.encode()
+    headers = [m.start() for m in SECTION_HEADER.finditer(content)]
+    boundary = len(content[:headers[-1]].encode()) if headers else 0
+    with file_lock(CHECKPOINT_FILE):
+        checkpoints = load_checkpoints()
+        checkpoints[date_str] = {
+            "offset": len(data),
+            "hash": hashlib.sha256(data).hexdigest(),
+            "boundary": boundary,
+        }
+        tmp = CHECKPOINT_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(checkpoints, indent=2, sort_keys=True))
+        tmp.rename(CHECKPOINT_FILE)
+
+
+def new_content(date_str: str, content: str) -> str:
+    """The part of a day's log not yet extracted ("" if nothing is new).
+    
+    Falls back to the whole log when there is no checkpoint or the
+    already-extracted prefix changed (file rewritten). If the delta
+    continues the last extracted section, that section's header line is
+    prepended so the LLM keeps its context.
+    """
+    checkpoint = load_checkpoints().get(date_str)
+    data = content.encode()
+    if not checkpoint:
+        return content
+    offset = checkpoint["offset"]
+    if len(data) < offset or hashlib.sha256(data[:offset]).hexdigest() != checkpoint["hash"]:
+        print(f"  {date_str} changed since last extraction, reprocessing in full")
+        return content
     
-    Handles large files by chunking and merging results.
+    delta = data[offset:].decode()
+    if not delta.strip():
+        return ""
+    if not SECTION_HEADER.match(delta.lstrip('\n')):
+        header = data[checkpoint["boundary"]:offset].split(b'\n', 1)[0].decode()
+        delta = f"{header}\n{delta}"
+    return delta
+
+
+def extract_chunks(chunks: list[str], date_str: str, call=call_gemini,
+                   concurrency: int = CONCURRENCY, retries: int = RETRIES,
+                   backoff: float = 2.0) -> list[dict | None]:
+    """Run extraction on every chunk with bounded concurrency.
+
+    Each chunk is retried up to `retries` times with exponential backoff.
+    Results come back in chunk order (None for chunks that kept failing),
+    so merging them gives the same output as a sequential run.
+    """
+    def extract(i: int, chunk: str) -> dict | None:
+        prompt = EXTRACT_PROMPT.replace("{date}", date_str).replace("{content}", chunk)
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+                print(f"  Retrying chunk {i+1}/{len(chunks)} (attempt {attempt + 1})")
+            result = call(prompt)
+            if result:
+                return result
+        return None
+
+    workers = max(1, min(concurrency, len(chunks)))
+    if workers == 1:
+        return [extract(i, chunk) for i, chunk in enumerate(chunks)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract, range(len(chunks)), chunks))
+
+
+@dataclass
+class Extraction:
+    """One day's extraction, ready to be written by apply_extraction."""
+    date: str
+    status: str  # extracted | unchanged | missing | failed
+    log: str = ""  # the day's log as read, for the checkpoint
+    chunks: int = 0
+    merged: dict = field(default_factory=dict)
+
+
+def extract_date(date_str: str, full: bool = False) -> Extraction:
+    """Run the LLM part of processing a day. Touches no entity or graph files.
+    
+    Handles large files by chunking and merging results. Only content
+    appended since the last run is extracted unless `full` is set.
     """
     print(f"\nProcessing {date_str}...")
-    content = read_daily_file(date_str)
-    if not content:
+    log = read_daily_file(date_str)
+    if not log:
         print(f"  No daily file for {date_str}")
-        return
+        return Extraction(date_str, "missing")
+    
+    content = log if full else new_content(date_str, log)
+    if not content.strip():
+        print(f"  Nothing new since last extraction")
+        return Extraction(date_str, "unchanged", log)
+    if len(content) < len(log):
+        print(f"  Extracting {len(content)} new characters of {len(log)}")
     
     # Pre-filter to remove noise
     content = pre_filter(content)
@@ -405,33 +506,47 @@ def process_date(date_str: str):
     # Chunk if needed
     chunks = chunk_content(content)
     if len(chunks) > 1:
-        print(f"  Large file: splitting into {len(chunks)} chunks")
+        print(f"  Large file: splitting into {len(chunks)} chunks "
+              f"({min(CONCURRENCY, len(chunks))} at a time)")
     
-    # Extract from each chunk
-    results = []
-    for i, chunk in enumerate(chunks):
-        if len(chunks) > 1:
-            print(f"  Processing chunk {i+1}/{len(chunks)}...")
-        prompt = EXTRACT_PROMPT.replace("{date}", date_str).replace("{content}", chunk)
-        result = call_gemini(prompt)
-        if result:
-            results.append(result)
+    # Extract from each chunk (in parallel, results in chunk order)
+    results = extract_chunks(chunks, date_str)
     
-    if not results:
-        print(f"  Failed to get LLM response")
-        return
+    # A failed chunk fails the day: checkpointing past it would lose its
+    # events. Chunks that did succeed come from the cache on the next run.
+    failed = sum(r is None for r in results)
+    if failed:
+        print(f"  Failed to get LLM response for {failed}/{len(chunks)} chunks")
+        return Extraction(date_str, "failed", log, len(chunks))
     
     # Merge results from all chunks
     merged = merge_extraction_results(results) if len(results) > 1 else results[0]
+    return Extraction(date_str, "extracted", log, len(chunks), merged)
+
+
+def apply_extraction(extraction: Extraction, batch=None):
+    """Write an extraction to entity files and the graph, then checkpoint the day.
+    
+    With a shared `batch`, entity pages stay in memory for the caller to
+    flush and checkpoint (commit_extractions) after several dates.
+    """
+    if extraction.status != "extracted":
+        return
+    date_str, merged = extraction.date, extraction.merged
     
     entities = merged.get("entities", [])
     triplets = merged.get("triplets", [])
     events = merged.get("events", [])
     
-    print(f"  Extracted: {len(entities)} entities, {len(triplets)} triplets, {len(events)} events")
+    print(f"  {date_str}: {len(entities)} entities, {len(triplets)} triplets, {len(events)} events")
     
+    from .entity import EntityBatch
+    own_batch = batch is None
+    if own_batch:
+        batch = EntityBatch(ENTITIES_DIR)
     for entity in entities:
-        update_entity_file(
+        merge_entity(
+            batch,
             entity["name"],
             entity.get("type", "unknown"),
             entity.get("facts", []),
@@ -440,6 +555,24 @@ def process_date(date_str: str):
     
     if triplets:
         append_to_graph(triplets, date_str)
+    
+    if own_batch:
+        commit_extractions(batch, [extraction])
+
+
+def commit_extractions(batch, extractions: list[Extraction]):
+    """Flush a batch of entity pages, then checkpoint the dates merged into it."""
+    flush_entities(batch)
+    for extraction in extractions:
+        if extraction.status == "extracted":
+            save_checkpoint(extraction.date, extraction.log)
+
+
+def process_date(date_str: str, full: bool = False) -> Extraction:
+    """Process a daily file: extract entities, triplets, events, and write them."""
+    extraction = extract_date(date_str, full)
+    apply_extraction(extraction)
+    return extraction
 
 
 def run_surprise(date_str: str):
@@ -451,7 +584,7 @@ def run_surprise(date_str: str):
         return
     
     prompt = SURPRISE_PROMPT.replace("{memory}", memory).replace("{today}", today)
-    result = call_gemini(prompt)
+    result = call_gemini(prompt, cache=False)
     
     if result and result.get("surprises"):
         print(f"\n🎯 Surprise scoring for {date_str}:")
@@ -482,7 +615,7 @@ def run_consolidate():
     
     today = date.today().isoformat()
     prompt = CONSOLIDATE_PROMPT.replace("{date}", today).replace("{entities}", entity_content[:8000])
-    result = call_gemini(prompt)
+    result = call_gemini(prompt, cache=False)
     
     if result:
         # Result might be raw text, not JSON
@@ -494,6 +627,8 @@ def run_consolidate():
 
 def main():
     args = sys.argv[1:]
+    if "--no-cache" in args:
+        os.environ["ENGRAM_NO_CACHE"] = "1"
     
     if "--surprise" in args:
         date_str = date.today().isoformat()
@@ -504,16 +639,15 @@ def main():
     elif "--consolidate" in args:
         run_consolidate()
     elif "--all" in args:
-        files = sorted(glob.glob(str(MEMORY_DIR / "2026-*.md")))
-        for f in files:
-            date_str = Path(f).stem
-            if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                process_date(date_str)
+        from .backfill import run_backfill
+        from .journal import list_dates
+        run_backfill(list_dates(MEMORY_DIR), MEMORY_DIR, full="--full" in args,
+                     restart="--restart" in args)
     elif "--date" in args:
         idx = args.index("--date")
-        process_date(args[idx + 1])
+        process_date(args[idx + 1], full="--full" in args)
     else:
-        process_date(date.today().isoformat())
+        process_date(date.today().isoformat(), full="--full" in args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+"""
+Daemon — `engram serve`, a long-running recall server with warm indexes.
+
+Problem: agents run `engram recall` as a subprocess, so every call paid
+for imports, config and alias loading, opening the catalog, checking the
+entities directory and building the name index before answering.
+
+Solution:
+1. `engram serve` keeps one RecallEngine (catalog connection, name index,
+   graph store, aliases) in memory and answers newline-delimited JSON
+   requests on a Unix socket (<memory_dir>/.cache/engram.sock):
+   {"op": "recall" | "recall_many" | "search" | "entities" | "ping", ...}
+2. A watcher thread keeps the catalog in step with the entities
+   directory (the open_catalog sweep and the access log fold, checked
+   every WATCH_INTERVAL seconds on its own connection), so requests
+   never touch the pages beyond the ones they return
+3. Answers are cached until the catalog, the graph log or the aliases
+   change; a cached recall still counts as an access to its page
+4. The engine's SQLite connections stay on the main thread: connection
+   threads hand requests over through a queue
+5. The CLI asks the socket first and answers in-process when no daemon
+   is listening (or with --no-daemon)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .access import FLUSH_INTERVAL
+from .config import EngramConfig
+
+WATCH_INTERVAL = float(os.environ.get("ENGRAM_WATCH_INTERVAL", "1"))
+CLIENT_TIMEOUT = float(os.environ.get("ENGRAM_DAEMON_TIMEOUT", "30"))
+CACHE_SIZE = 256
+
+
+def socket_path(config: EngramConfig) -> Path:
+    return config.memory_dir / ".cache" / "engram.sock"
+
+
+def request(config: EngramConfig, op: str, **params) -> Optional[Any]:
+    """Ask a running daemon. None if there is none (or it failed): answer in-process then."""
+    path = socket_path(config)
+    if os.environ.get("ENGRAM_NO_DAEMON") or not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(str(path))
+            sock.sendall(json.dumps({"op": op, **params}).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    return None
+                data += chunk
+    except OSError:
+        return None  # not listening (stale socket) or too slow
+    response = json.loads(data)
+    if not response["ok"]:
+        print(f"⚠️  engram daemon: {response['error']} — answering locally", file=sys.stderr)
+        return None
+    return response["result"]
+
+
+def error_line(message: str) -> bytes:
+    return json.dumps({"ok": False, "error": message}).encode() + b"\n"
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """One client connection: any number of request lines, answered in order."""
+
+    timeout = 300  # drop idle clients
+
+    def handle(self):
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                reply: queue.SimpleQueue = queue.SimpleQueue()
+                self.server.requests.put((line, reply))
+                self.wfile.write(reply.get())
+                self.wfile.flush()
+        except OSError:
+            pass  # client went away or idled out
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, requests: queue.Queue):
+        self.requests = requests
+        super().__init__(str(path), Handler)
+
+
+class Daemon:
+    """Warm RecallEngine plus an answer cache, driven from the main thread."""
+
+    def __init__(self, config: EngramConfig):
+        from .recall import RecallEngine
+        self.config = config
+        self.engine = RecallEngine(config, sweep=False)
+        self.cache: dict[bytes, tuple[bytes, list[str]]] = {}  # request line -> response line, pages recalled
+        self.state = None
+        self.stopped = threading.Event()
+
+    def warm(self):
+        """Reconcile the catalog and build the name index before taking requests."""
+        self.engine.catalog.reconcile()
+        self.engine.names
+
+    def watch(self):
+        """Watcher thread: sweep the entities directory into the catalog when it changed."""
+        from .catalog import Catalog
+        catalog = Catalog(self.config.entities_dir)
+        while not self.stopped.wait(WATCH_INTERVAL):
+            try:
+                if not catalog.fresh():
+                    catalog.reconcile()
+                catalog.fold_access()
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️  watcher: {e}", file=sys.stderr)
+        catalog.close()
+
+    def _state(self) -> tuple:
+        """Changes whenever an answer could: pages, graph log, aliases."""
+        def stamp(path: Path):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                return None
+            return st.st_mtime_ns, st.st_size
+        return (self.engine.catalog.data_version(), stamp(self.config.graph_file),
+                stamp(self.config.entities_dir / ".aliases.json"))
+
+    def answer(self, line: bytes) -> bytes:
+        """One response line for one request line."""
+        state = self._state()
+        if state != self.state or len(self.cache) >= CACHE_SIZE:
+            self.cache.clear()
+            self.state = state
+        cached = self.cache.get(line)
+        if cached is not None:
+            encoded, recalled = cached
+            for stem in recalled:
+                self.engine.access.record(stem)
+            return encoded
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return error_line(f"malformed request: {e}")
+        if not isinstance(request, dict):
+            return error_line("malformed request: expected a JSON object")
+        self.engine.recalled = []
+        try:
+            result = self.run(request)
+        except Exception as e:
+            return error_line(f"{type(e).__name__}: {e}")
+        finally:
+            recalled, self.engine.recalled = self.engine.recalled, None
+        encoded = json.dumps({"ok": True, "result": result}).encode() + b"\n"
+        if request.get("op") != "ping":
+            self.cache[line] = (encoded, recalled)
+        return encoded
+
+    def run(self, request: dict) -> Any:
+        from . import __version__
+        from .recall import list_entities
+        engine = self.engine
+        op = request.get("op")
+        if op == "recall":
+            return engine.recall(request["query"], int(request.get("hops", 1)))
+        if op == "recall_many":
+            return engine.recall_many(request["queries"], int(request.get("hops", 1)))
+        if op == "search":
+            matches = engine.match(request["query"], int(request.get("limit", 10)))
+            return [{"name": name, "stem": stem, "score": score} for score, name, stem in matches]
+        if op == "entities":
+            return list_entities(self.config, engine.catalog)
+        if op == "ping":
+            return {"version": __version__, "pid": os.getpid(), "entities": len(engine.catalog)}
+        raise ValueError(f"unknown op {op!r}")
+
+    def serve(self):
+        path = socket_path(self.config)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if request(self.config, "ping") is not None:
+            print(f"An engram daemon is already serving {path}")
+            return
+        path.unlink(missing_ok=True)  # left behind by a daemon that died
+
+        self.warm()
+        requests: queue.Queue = queue.Queue()
+        server = Server(path, requests)
+        os.chmod(path, 0o600)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        watcher = threading.Thread(target=self.watch, daemon=True)
+        watcher.start()
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # clean up the socket on kill too
+        print(f"🧠 engram serving {len(self.engine.catalog)} entities on {path}", flush=True)
+        try:
+            while True:
+                try:
+                    line, reply = requests.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    self.engine.access.flush()  # idle: write out the counts recorded so far
+                    continue
+                try:
+                    reply.put(self.answer(line))
+                except Exception as e:  # never leave a client waiting
+                    reply.put(error_line(f"{type(e).__name__}: {e}"))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopped.set()
+            server.shutdown()
+            server.server_close()
+            path.unlink(missing_ok=True)
+            watcher.join()
+
+
+def serve(config: EngramConfig):
+    """Run the daemon in the foreground until interrupted."""
+    Daemon(config).serve()
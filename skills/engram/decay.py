@@ -6,20 +6,20 @@ frequently accessed get strengthened. This is Hebbian learning applied to
 the knowledge graph.
 
 Mechanism:
-1. Track last_accessed and access_count per entity (in frontmatter)
-2. Entities not referenced in N days → moved to archive/
+1. Track last_accessed and access_count per entity (access log, folded
+   into the catalog — pages are not rewritten)
+2. Entities neither referenced nor recalled in N days → moved to archive/
 3. Entities accessed frequently → boosted in recall ranking
 4. Graph triplets involving archived entities → marked stale
 """
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import shutil
 from dataclasses import dataclass
-from datetime import datetime, date, timedelta
+from datetime import date
 from pathlib import Path
 
 
@@ -43,9 +43,10 @@ class EntityHealth:
     entity_type: str
     last_referenced: date | None  # Most recent date in timeline
     timeline_entries: int
-    days_stale: int              # Days since last reference
+    days_stale: int              # Days since last reference or recall
     status: str                  # "active" | "stale" | "archive_candidate"
     access_count: int = 0
+    last_accessed: date | None = None  # Most recent recall
 
 
 def parse_last_date(content: str) -> date | None:
@@ -69,44 +70,32 @@ def get_access_count(content: str) -> int:
 
 
 def increment_access(entity_path: Path):
-    """Increment access counter on an entity file."""
-    if not entity_path.exists():
-        return
-    
-    content = entity_path.read_text()
-    count = get_access_count(content)
-    
-    if "**Accessed:**" in content:
-        content = re.sub(r'\*\*Accessed:\*\*\s*\d+', f'**Accessed:** {count + 1}', content)
-    else:
-        # Add after Type line
-        content = re.sub(
-            r'(\*\*Type:\*\*.*)',
-            rf'\1\n**Accessed:** {count + 1}',
-            content,
-            count=1
-        )
-    
-    entity_path.write_text(content)
+    """Count an access to an entity (buffered in the access log; the page is not rewritten)."""
+    from .access import access_counter
+    access_counter(entity_path.parent).record(entity_path.stem)
 
 
 def scan_health(entities_dir: Path, config: DecayConfig | None = None) -> list[EntityHealth]:
-    """Scan all entities and assess their health."""
+    """Scan all entities and assess their health (from the catalog)."""
     if config is None:
         config = DecayConfig()
     
+    from .catalog import open_catalog
+    
     today = date.today()
     results = []
     
-    for f in sorted(entities_dir.glob("*.md")):
-        content = f.read_text()
-        entity_type = parse_entity_type(content)
-        last_ref = parse_last_date(content)
-        timeline_entries = len(re.findall(r'### \[\[', content))
-        access_count = get_access_count(content)
+    for meta in open_catalog(entities_dir).entries():
+        entity_type = meta.type
+        last_ref = date.fromisoformat(meta.last_date) if meta.last_date else None
+        timeline_entries = meta.timeline
+        access_count = meta.accessed
+        last_accessed = date.fromisoformat(meta.last_accessed) if meta.last_accessed else None
         
-        if last_ref:
-            days_stale = (today - last_ref).days
+        # Recalling an entity keeps it as active as a new timeline entry would
+        last_seen = max(filter(None, (last_ref, last_accessed)), default=None)
+        if last_seen:
+            days_stale = (today - last_seen).days
         else:
             days_stale = 999  # No dates = very stale
         
@@ -121,14 +110,15 @@ def scan_health(entities_dir: Path, config: DecayConfig | None = None) -> list[E
             status = "active"
         
         results.append(EntityHealth(
-            name=f.stem.replace('-', ' '),
-            file=f,
+            name=meta.name,
+            file=entities_dir / f"{meta.stem}.md",
             entity_type=entity_type,
             last_referenced=last_ref,
             timeline_entries=timeline_entries,
             days_stale=days_stale,
             status=status,
             access_count=access_count,
+            last_accessed=last_accessed,
         ))
     
     return results
@@ -194,24 +184,8 @@ def run_decay(entities_dir: Path, graph_file: Path | None = None,
 
 def _mark_graph_stale(graph_file: Path, entity_name: str):
     """Mark graph triplets involving an archived entity."""
-    lines = graph_file.read_text().strip().split('\n')
-    updated = []
-    
-    for line in lines:
-        if not line:
-            continue
-        try:
-            t = json.loads(line)
-            name_lower = entity_name.lower()
-            if (t.get("subject", "").lower() == name_lower or 
-                t.get("object", "").lower() == name_lower):
-                t["stale"] = True
-                t["archived_at"] = datetime.now().isoformat()
-            updated.append(json.dumps(t))
-        except:
-            updated.append(line)
-    
-    graph_file.write_text('\n'.join(updated) + '\n')
+    from .graph import open_store
+    open_store(graph_file).mark_stale(entity_name)
 
 
 def restore_entity(entities_dir: Path, entity_name: str) -> str:
@@ -12,7 +12,6 @@ Approach:
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import shutil
@@ -76,17 +75,8 @@ def find_duplicates(entities_dir: Path, graph_file: Path | None = None,
             
     # 3. Graph-based: shared triplet neighbors
     if graph_file and graph_file.exists():
-        neighbors: dict[str, set] = {}
-        for line in graph_file.read_text().strip().split('\n'):
-            if not line:
-                continue
-            try:
-                t = json.loads(line)
-                s, o = t.get("subject", "").lower(), t.get("object", "").lower()
-                neighbors.setdefault(s, set()).add(o)
-                neighbors.setdefault(o, set()).add(s)
-            except:
-                pass
+        from .graph import open_store
+        neighbors = open_store(graph_file).neighbors()
         
         # Find entities with high neighbor overlap
         entity_names = list(names.keys())
@@ -0,0 +1,331 @@
+"""
+Entity — parsed, in-memory model of an entity wiki page.
+
+Problem: update_entity_file patched pages as strings: every fact and
+timeline merge re-scanned the whole page and shifted a flat line list, so
+pages with long timelines got slower to update with every day they grew.
+
+Solution:
+1. Entity.parse() splits a page into blocks at header lines ("# ", "## ",
+   "### ..."). Blocks keep their raw lines, so render() returns the page
+   byte for byte — hand edits and unknown sections survive untouched
+2. On top of the blocks: a facts set (## Facts), timeline sections keyed
+   by date (### [[YYYY-MM-DD]], wherever they sit) and a relations set
+   (## Relations), so merges are O(1) membership checks plus an append
+3. EntityBatch loads each page once per extraction run, applies every
+   merge in memory and flushes each changed page once, atomically (and
+   updates its row in the catalog). A page edited on disk in between is
+   re-read at flush and the batch's merges are replayed onto it
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+TYPE_LINE = re.compile(r'\*\*Type:\*\*\s*(\w+)')
+RELATION_LINE = re.compile(r'- \[\[(.+?)\]\]')
+HEADER_SPLIT = re.compile(r'\n(?=#)')
+
+
+def render_new(name: str, entity_type: str, facts: list[str], date_str: str,
+               timeline: list[str], related: Iterable[str]) -> str:
+    """A fresh entity page."""
+    content = f"# {name}\n**Type:** {entity_type}\n\n"
+    if facts:
+        content += "## Facts\n"
+        for fact in facts:
+            content += f"- {fact}\n"
+        content += "\n"
+    content += "## Timeline\n"
+    content += f"\n### [[{date_str}]]\n"
+    for line in timeline:
+        content += f"{line}\n"
+    content += "\n## Relations\n"
+    for r in sorted(related):
+        content += f"- [[{r}]]\n"
+    return content
+
+
+class Block:
+    """A header line (None for text before the first header) and the raw lines under it."""
+
+    __slots__ = ("header", "lines", "_members")
+
+    def __init__(self, header: Optional[str], lines: list[str]):
+        self.header = header
+        self.lines = lines
+        self._members: Optional[set[str]] = None
+
+    @classmethod
+    def parse(cls, chunk: str) -> "Block":
+        lines = chunk.split("\n")
+        if lines[0].startswith("#"):
+            return cls(lines[0], lines[1:])
+        return cls(None, lines)
+
+    def render(self) -> str:
+        return "\n".join(self.lines if self.header is None else [self.header, *self.lines])
+
+    @property
+    def members(self) -> set[str]:
+        """The block's lines as a set (built on first use, kept in sync by append)."""
+        if self._members is None:
+            self._members = set(self.lines)
+        return self._members
+
+    def append(self, new_lines: list[str]):
+        """Insert lines after the last non-blank line, keeping trailing blank separators."""
+        end = len(self.lines)
+        while end and not self.lines[end - 1].strip():
+            end -= 1
+        self.lines[end:end] = new_lines
+        if self._members is not None:
+            self._members.update(new_lines)
+
+    def end_with_blank(self):
+        """Leave exactly one blank line before whatever follows."""
+        while self.lines and not self.lines[-1].strip():
+            self.lines.pop()
+        if self.header is not None or self.lines:
+            self.lines.append("")
+
+
+class Entity:
+    """An entity page as header-delimited blocks, with indexes over facts, timeline and relations.
+
+    Blocks stay raw strings until a merge touches them, so loading a page
+    with thousands of timeline sections costs one regex split.
+    """
+
+    def __init__(self, chunks: list[str], trailing_newline: bool = True):
+        self.blocks: list[str | Block] = chunks
+        # Every chunk but the first starts with a header line
+        self.headers: list[Optional[str]] = [c.partition("\n")[0] for c in chunks]
+        if chunks and not chunks[0].startswith("#"):
+            self.headers[0] = None
+        self.trailing_newline = trailing_newline
+        self.changed = False
+        # Index headers (the first section of a name or date wins, as before):
+        # "## Facts" -> {"Facts": i}, "### [[2026-01-05]]" -> {"2026-01-05": i}
+        last = len(chunks) - 1
+        self.sections: dict[str, int] = {
+            h[3:].strip(): last - i for i, h in enumerate(reversed(self.headers))
+            if h and h[:3] == "## "
+        }
+        self.timeline: dict[str, int] = {
+            h[6:16]: last - i for i, h in enumerate(reversed(self.headers))
+            if h and h[:6] == "### [[" and h[16:] == "]]" and h[6:10].isdigit()
+        }
+        self.facts: set[str] = set()
+        self.relations: set[str] = set()
+        facts, relations = self.sections.get("Facts"), self.sections.get("Relations")
+        if facts is not None:
+            self.facts.update(l[2:] for l in self.block(facts).lines if l.startswith("- "))
+        if relations is not None:
+            self.relations.update(m.group(1) for m in map(RELATION_LINE.match, self.block(relations).lines) if m)
+
+    @classmethod
+    def parse(cls, text: str) -> "Entity":
+        trailing_newline = text.endswith("\n")
+        if trailing_newline:
+            text = text[:-1]
+        return cls(HEADER_SPLIT.split(text), trailing_newline)
+
+    def render(self) -> str:
+        body = "\n".join(b if isinstance(b, str) else b.render() for b in self.blocks)
+        return body + ("\n" if self.trailing_newline else "")
+
+    def block(self, index: int) -> Block:
+        """The block at an index, parsed into lines on first access."""
+        block = self.blocks[index]
+        if isinstance(block, str):
+            block = self.blocks[index] = Block.parse(block)
+        return block
+
+    def section(self, date_str: str) -> Optional[Block]:
+        """The timeline section for a date."""
+        index = self.timeline.get(date_str)
+        return None if index is None else self.block(index)
+
+    def _insert(self, index: int, block: Block):
+        """Insert a block, making sure the one before it ends with a blank line."""
+        if index > 0:
+            self.block(index - 1).end_with_blank()
+        self.blocks.insert(index, block)
+        self.headers.insert(index, block.header)
+        if index < len(self.blocks) - 1:
+            self.sections = {s: i + (i >= index) for s, i in self.sections.items()}
+            self.timeline = {d: i + (i >= index) for d, i in self.timeline.items()}
+        if block.header.startswith("## "):
+            self.sections.setdefault(block.header[3:].strip(), index)
+        self.trailing_newline = True
+        self.changed = True
+
+    # --- Header ---
+
+    @property
+    def name(self) -> str:
+        header = self.headers[0] or ""
+        return header[2:].strip() if header.startswith("# ") else ""
+
+    @property
+    def type(self) -> str:
+        for line in self.block(0).lines:
+            m = TYPE_LINE.match(line)
+            if m:
+                return m.group(1)
+        return "unknown"
+
+    # --- Merges ---
+
+    def add_facts(self, facts: Iterable[str]) -> int:
+        """Add facts not already on the page. Returns how many were added."""
+        new = [f for f in dict.fromkeys(facts) if f not in self.facts]
+        if not new:
+            return 0
+        lines = [f"- {f}" for f in new]
+        index = self.sections.get("Facts")
+        if index is None:
+            # No Facts section yet: add one before the timeline
+            timeline = self.sections.get("Timeline")
+            self._insert(timeline if timeline is not None else len(self.blocks),
+                         Block("## Facts", lines + [""]))
+        else:
+            self.block(index).append(lines)
+            self.changed = True
+        self.facts.update(new)
+        return len(new)
+
+    def add_timeline(self, date_str: str, lines: list[str]) -> int:
+        """Merge timeline lines into the section for a date, creating it if needed."""
+        block = self.section(date_str)
+        if block is None:
+            if not lines:
+                return 0
+            # New dates go after the last date section (or at the top of ## Timeline)
+            anchor = max(self.timeline.values(), default=None)
+            if anchor is None:
+                anchor = self.sections.get("Timeline")
+            index = len(self.blocks) if anchor is None else anchor + 1
+            trailer = [""] if index < len(self.blocks) else []
+            self._insert(index, Block(f"### [[{date_str}]]", lines + trailer))
+            self.timeline[date_str] = index
+            return len(lines)
+        new = [l for l in dict.fromkeys(lines) if l not in block.members]
+        if new:
+            block.append(new)
+            self.trailing_newline = True
+            self.changed = True
+        return len(new)
+
+    def add_relations(self, names: Iterable[str]) -> int:
+        """Link related entities not yet listed under ## Relations."""
+        new = sorted(set(names) - self.relations)
+        if not new:
+            return 0
+        lines = [f"- [[{r}]]" for r in new]
+        index = self.sections.get("Relations")
+        if index is None:
+            self._insert(len(self.blocks), Block("## Relations", lines))
+        else:
+            self.block(index).append(lines)
+            self.trailing_newline = True
+            self.changed = True
+        self.relations.update(new)
+        return len(new)
+
+
+class EntityBatch:
+    """Entity pages touched by one extraction run: loaded once, flushed once.
+
+    Each page's merges are recorded as well as applied. If the page changed
+    on disk between load and flush (another agent, a hand edit), flush
+    replays them onto a fresh read under the page lock instead of
+    overwriting the change.
+    """
+
+    def __init__(self, entities_dir: Path):
+        self.entities_dir = entities_dir
+        self.pages: dict[str, Entity] = {}
+        self.created: set[str] = set()
+        self.loaded: dict[str, Optional[tuple[int, int]]] = {}  # filename -> (mtime_ns, size) as read
+        self.merges: dict[str, list[tuple]] = {}
+
+    def _stat(self, filename: str) -> Optional[tuple[int, int]]:
+        try:
+            stat = (self.entities_dir / f"{filename}.md").stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, filename: str) -> Optional[Entity]:
+        """The parsed page for a filename stem, or None if it doesn't exist yet."""
+        if filename not in self.pages:
+            path = self.entities_dir / f"{filename}.md"
+            stat = self._stat(filename)
+            if stat is None:
+                return None
+            self.pages[filename] = Entity.parse(path.read_text())
+            self.loaded[filename] = stat
+        return self.pages[filename]
+
+    @staticmethod
+    def _apply(entity: Optional[Entity], name: str, entity_type: str, facts: list[str],
+               date_str: str, timeline: list[str], related: Iterable[str]) -> Entity:
+        if entity is None:
+            entity = Entity.parse(render_new(name, entity_type, facts, date_str, timeline, related))
+            entity.changed = True
+            return entity
+        entity.add_facts(facts)
+        entity.add_timeline(date_str, timeline)
+        entity.add_relations(related)
+        return entity
+
+    def merge(self, filename: str, name: str, entity_type: str, facts: list[str],
+              date_str: str, timeline: list[str], related: Iterable[str]):
+        """Apply one entity's extraction for a date, creating the page if needed."""
+        merge = (name, entity_type, facts, date_str, timeline, list(related))
+        entity = self.get(filename)
+        if entity is None:
+            self.loaded[filename] = None
+            self.created.add(filename)
+        self.pages[filename] = self._apply(entity, *merge)
+        self.merges.setdefault(filename, []).append(merge)
+
+    def _reload(self, filename: str) -> Entity:
+        """The page as it is on disk now, with this batch's merges replayed on top."""
+        path = self.entities_dir / f"{filename}.md"
+        entity = Entity.parse(path.read_text()) if path.exists() else None
+        if entity is not None:
+            self.created.discard(filename)
+        for merge in self.merges[filename]:
+            entity = self._apply(entity, *merge)
+        return entity
+
+    def flush(self) -> list[str]:
+        """Write every changed page atomically. Returns the filenames written."""
+        from .catalog import Catalog
+        from .filelock import file_lock
+
+        self.entities_dir.mkdir(parents=True, exist_ok=True)
+        written = {}
+        for filename, entity in list(self.pages.items()):
+            if not entity.changed:
+                continue
+            path = self.entities_dir / f"{filename}.md"
+            with file_lock(path):
+                if self._stat(filename) != self.loaded.get(filename):
+                    entity = self.pages[filename] = self._reload(filename)
+                content = written[filename] = entity.render()
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(content)
+                tmp.rename(path)
+                self.loaded[filename] = self._stat(filename)
+            entity.changed = False
+        if written:
+            catalog = Catalog(self.entities_dir)
+            catalog.update(written)
+            catalog.close()
+        return list(written)
@@ -0,0 +1,340 @@
+"""
+Graph — indexed triplet store over graph.jsonl.
+
+Problem: Every graph operation (dedup on append, recall, decay, viz,
+stats, duplicate detection) re-read and re-parsed all of graph.jsonl.
+
+Solution:
+1. graph.jsonl stays the canonical append-only log (and the import /
+   export format). Lines are triplets, plus {"op": "stale", ...} markers
+   appended when decay archives an entity
+2. graph.db (SQLite, next to it) indexes the log: UNIQUE(date, subject,
+   predicate, object), indexes on lowercased subject / predicate / object,
+   and a trigram FTS table for substring search
+3. The index is synced incrementally by byte offset, so appends from any
+   process are picked up and a deleted graph.db is simply rebuilt
+4. Every module goes through TripletStore
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS triplets (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    predicate TEXT NOT NULL,
+    object TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    subject_lc TEXT NOT NULL,
+    predicate_lc TEXT NOT NULL,
+    object_lc TEXT NOT NULL,
+    stale INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    UNIQUE (date, subject, predicate, object)
+);
+CREATE INDEX IF NOT EXISTS triplets_subject ON triplets(subject_lc);
+CREATE INDEX IF NOT EXISTS triplets_predicate ON triplets(predicate_lc);
+CREATE INDEX IF NOT EXISTS triplets_object ON triplets(object_lc);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS triplets_fts USING fts5(
+    subject, object, detail, content='triplets', content_rowid='id', tokenize='trigram'
+);
+"""
+
+
+def format_triplet(t: dict) -> str:
+    """One triplet as a recall line."""
+    return (
+        f"- [{t.get('date', '?')}] {t['subject']} → {t['predicate']} → {t['object']}"
+        + (f" ({t['detail']})" if t.get("detail") else "")
+    )
+
+
+def _decode(data: str, stale: int) -> dict:
+    t = json.loads(data)
+    if stale:
+        t["stale"] = True
+    return t
+
+
+class TripletStore:
+    """Append-only triplet log with a SQLite index."""
+
+    def __init__(self, graph_file: Path, db_path: Path | None = None):
+        self.graph_file = graph_file
+        self.db_path = db_path or graph_file.with_suffix(".db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB: keeps index pages hot during imports
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite without trigram support: substring search scans
+        self._bulk = False
+        self.sync()
+
+    # --- Sync ---
+
+    def sync(self) -> int:
+        """Index whatever was appended to graph.jsonl since the last sync."""
+        if not self.graph_file.exists():
+            return 0
+        size = self.graph_file.stat().st_size
+        offset = self._offset()
+        if size == offset:
+            return 0
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            offset = self._offset()  # another process may have synced meanwhile
+            if size < offset:
+                # Log was rewritten — rebuild the index from scratch
+                self._conn.execute("DELETE FROM triplets")
+                if self.fts:
+                    self._conn.execute("INSERT INTO triplets_fts (triplets_fts) VALUES ('delete-all')")
+                offset = 0
+            # Fresh index: fill the FTS table in one pass at the end instead of per row
+            self._bulk = offset == 0 and self.fts
+            count = 0
+            with open(self.graph_file, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partial write in progress
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict):
+                        count += self._apply(record, line.decode().rstrip("\n"))
+            if self._bulk:
+                self._conn.execute("INSERT INTO triplets_fts (triplets_fts) VALUES ('rebuild')")
+                self._bulk = False
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (offset,))
+            self._conn.execute("COMMIT")
+            return count
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _offset(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'offset'").fetchone()
+        return row[0] if row else 0
+
+    def _apply(self, record: dict, data: str) -> int:
+        if record.get("op") == "stale":
+            name = record.get("entity", "").lower()
+            self._conn.execute(
+                "UPDATE triplets SET stale = 1 WHERE subject_lc = ? OR object_lc = ?", (name, name)
+            )
+            return 0
+        try:
+            s, p, o = record["subject"], record["predicate"], record["object"]
+        except KeyError:
+            return 0
+        detail = record.get("detail") or ""
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO triplets (date, subject, predicate, object, detail,"
+            " subject_lc, predicate_lc, object_lc, stale, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.get("date") or "", s, p, o, detail, s.lower(), p.lower(), o.lower(),
+             int(bool(record.get("stale"))), data),
+        )
+        if not cursor.rowcount:
+            return 0
+        if self.fts and not self._bulk:
+            self._conn.execute(
+                "INSERT INTO triplets_fts (rowid, subject, object, detail) VALUES (?, ?, ?, ?)",
+                (cursor.lastrowid, s, o, detail),
+            )
+        return 1
+
+    # --- Writes (append to the log, then sync) ---
+
+    def add(self, triplets: Iterable[dict], date_str: str) -> int:
+        """Append triplets for a date, skipping (date, s, p, o) already stored. Returns the count added."""
+        self.graph_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.graph_file, "a") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                self.sync()
+                seen = set()
+                lines = []
+                now = datetime.now().isoformat()
+                for t in triplets:
+                    key = (date_str, t["subject"], t["predicate"], t["object"])
+                    if key in seen or self._exists(key):
+                        continue
+                    seen.add(key)
+                    t["date"] = date_str
+                    t["timestamp"] = now
+                    lines.append(json.dumps(t) + "\n")
+                if lines:
+                    log.write("".join(lines))
+                    log.flush()
+                    self.sync()
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+        return len(lines)
+
+    def mark_stale(self, entity_name: str) -> int:
+        """Mark every triplet involving an entity as stale. Returns how many were affected."""
+        name = entity_name.lower()
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM triplets WHERE (subject_lc = ? OR object_lc = ?) AND stale = 0",
+            (name, name),
+        ).fetchone()[0]
+        if count:
+            marker = {"op": "stale", "entity": entity_name, "archived_at": datetime.now().isoformat()}
+            with open(self.graph_file, "a") as log:
+                fcntl.flock(log, fcntl.LOCK_EX)
+                try:
+                    log.write(json.dumps(marker) + "\n")
+                finally:
+                    fcntl.flock(log, fcntl.LOCK_UN)
+            self.sync()
+        return count
+
+    def _exists(self, key: tuple) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM triplets WHERE date = ? AND subject = ? AND predicate = ? AND object = ?", key
+        ).fetchone() is not None
+
+    # --- Reads ---
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM triplets").fetchone()[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        for data, stale in self._conn.execute("SELECT data, stale FROM triplets ORDER BY id"):
+            yield _decode(data, stale)
+
+    def find(self, subject: str | None = None, predicate: str | None = None,
+             object: str | None = None, entity: str | None = None,
+             include_stale: bool = True) -> list[dict]:
+        """Exact (case-insensitive) lookup. `entity` matches subject or object."""
+        filters, params = [], []
+        for column, value in (("subject_lc", subject), ("predicate_lc", predicate), ("object_lc", object)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value.lower())
+        if entity is not None:
+            filters.append("(subject_lc = ? OR object_lc = ?)")
+            params += [entity.lower()] * 2
+        if not include_stale:
+            filters.append("stale = 0")
+        where = " WHERE " + " AND ".join(filters) if filters else ""
+        rows = self._conn.execute(f"SELECT data, stale FROM triplets{where} ORDER BY id", params)
+        return [_decode(data, stale) for data, stale in rows]
+
+    def search(self, text: str, limit: int | None = None) -> list[dict]:
+        """Triplets whose subject, object or detail contains `text` (case-insensitive), in log order.
+
+        With a limit, only the `limit` most recent matches are read and decoded.
+        """
+        needle = text.lower()
+        # Newest first, streamed: FTS5 walks its rowids backwards without sorting the matches
+        if self.fts and len(needle) >= 3:
+            phrase = '"' + text.replace('"', '""') + '"'
+            rows = self._conn.execute(
+                "SELECT t.data, t.stale, t.subject_lc, t.object_lc, t.detail FROM triplets_fts f"
+                " JOIN triplets t ON t.id = f.rowid WHERE triplets_fts MATCH ? ORDER BY f.rowid DESC",
+                (phrase,),
+            )
+        else:
+            rows = self._conn.execute(
+                "SELECT data, stale, subject_lc, object_lc, detail FROM triplets ORDER BY id DESC"
+            )
+        found = []
+        for data, stale, s, o, detail in rows:
+            if needle in s or needle in o or needle in detail.lower():
+                found.append((data, stale))
+                if len(found) == limit:
+                    break
+        return [_decode(data, stale) for data, stale in reversed(found)]
+
+    def edges(self) -> Iterator[tuple[str, str, str]]:
+        """Distinct (subject, predicate, object) edges in first-seen order."""
+        rows = self._conn.execute(
+            "SELECT subject, predicate, object FROM triplets GROUP BY subject, predicate, object ORDER BY MIN(id)"
+        )
+        yield from rows
+
+    def edges_of(self, entity: str) -> dict[str, str]:
+        """Entities sharing a live triplet with `entity` (case-insensitive) -> latest triplet date."""
+        name = entity.lower()
+        rows = self._conn.execute(
+            "SELECT CASE WHEN subject_lc = ?1 THEN object ELSE subject END, MAX(date) FROM triplets"
+            " WHERE (subject_lc = ?1 OR object_lc = ?1) AND stale = 0 GROUP BY 1",
+            (name,),
+        )
+        return dict(rows)
+
+    def neighbors(self) -> dict[str, set[str]]:
+        """Undirected adjacency by lowercased name."""
+        adjacency: dict[str, set[str]] = {}
+        for s, o in self._conn.execute("SELECT DISTINCT subject_lc, object_lc FROM triplets"):
+            adjacency.setdefault(s, set()).add(o)
+            adjacency.setdefault(o, set()).add(s)
+        return adjacency
+
+    # --- Import / export ---
+
+    def import_jsonl(self, path: Path) -> int:
+        """Append the triplets from another JSONL file (dedup applies). Returns the count added."""
+        by_date: dict[str, list[dict]] = {}
+        with open(path) as f:
+            for line in f:
+                try:
+                    t = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(t, dict) and "subject" in t:
+                    by_date.setdefault(t.get("date") or "", []).append(t)
+        return sum(self.add(ts, d) for d, ts in by_date.items())
+
+    def export_jsonl(self, path: Path) -> int:
+        """Write every triplet (with its stale flag) as compacted JSONL."""
+        count = 0
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as out:
+            for t in self:
+                out.write(json.dumps(t) + "\n")
+                count += 1
+        os.replace(tmp, path)
+        return count
+
+    def close(self):
+        self._conn.close()
+
+
+_stores: dict[Path, TripletStore] = {}
+
+
+def open_store(graph_file: Path) -> TripletStore:
+    """Shared store per graph file (synced on every call)."""
+    store = _stores.get(graph_file)
+    if store is None:
+        store = _stores[graph_file] = TripletStore(graph_file)
+    else:
+        store.sync()
+    return store
@@ -0,0 +1,82 @@
+"""
+Structured daily logs.
+
+The swarm writes every interaction to an append-only JSONL journal
+(YYYY-MM-DD.jsonl) next to the markdown daily file, with full message
+text instead of the markdown's 200-character excerpts. Extraction prefers
+the journal when one exists. Archived (.gz) logs are read transparently.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+from .archive import open_text, read_text
+
+DAILY_NAME = re.compile(r'^(\d{4}-\d{2}-\d{2})\.(md|jsonl)(\.gz)?$')
+
+
+def render_journal(path: Path) -> str:
+    """Render a JSONL journal as daily-log markdown with full text."""
+    date_str = path.name.split(".")[0]
+    parts = [f"# {date_str}"]
+    with open_text(path) as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # partial write in progress
+            try:
+                r = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            parts.append(
+                f"\n### {r['ts'][11:16]} — {r['agent']} in #{r['channel']}\n"
+                f"**{r['user']}:** {r['message']}\n"
+                f"**{r['agent']}:** {r['response']}"
+            )
+    return "\n".join(parts) + "\n"
+
+
+def find_daily(memory_dir: Path, date_str: str) -> Path | None:
+    """Locate a day's log, preferring the journal over markdown.
+
+    Looks in memory_dir itself and in memory_dir/daily/ (the swarm layout).
+    Returns the uncompressed name even when only the .gz archive exists.
+    """
+    for directory in (memory_dir, memory_dir / "daily"):
+        for suffix in (".jsonl", ".md"):
+            path = directory / f"{date_str}{suffix}"
+            if path.exists() or path.with_name(path.name + ".gz").exists():
+                return path
+    return None
+
+
+def daily_source(memory_dir: Path, date_str: str) -> Path | None:
+    """The file backing a day's log: the plain file or its .gz archive."""
+    path = find_daily(memory_dir, date_str)
+    if path is None:
+        return None
+    return path if path.exists() else path.with_name(path.name + ".gz")
+
+
+def list_dates(memory_dir: Path) -> list[str]:
+    """Every date with a daily log, plain or archived, in order."""
+    dates = set()
+    for directory in (memory_dir, memory_dir / "daily"):
+        if directory.is_dir():
+            for f in directory.iterdir():
+                m = DAILY_NAME.match(f.name)
+                if m:
+                    dates.add(m.group(1))
+    return sorted(dates)
+
+
+def read_daily(memory_dir: Path, date_str: str) -> str:
+    """Read a day's log as markdown text ("" if there is none)."""
+    path = find_daily(memory_dir, date_str)
+    if path is None:
+        return ""
+    if path.suffix == ".jsonl":
+        return render_journal(path)
+    return read_text(path)
@@ -0,0 +1,121 @@
+"""
+Links — adjacency over entity pages for multi-hop recall.
+
+Problem: recall(hops=N) only followed the top page's own wikilinks one
+level deep, checking each link's file on disk, and never looked at the
+triplet graph, so hops > 1 did nothing and graph-only connections were
+invisible.
+
+Solution:
+1. Every page's outgoing [[wikilinks]] are kept in the catalog (links
+   table), each with the latest timeline date it appears under, and are
+   rewritten whenever the catalog records the page
+2. Adjacency joins wikilinks in both directions with the live triplets
+   in graph.db, keeping only neighbours that have a page
+3. walk() is a best-first search from a page: an edge's weight decays
+   with the age of its latest mention (RECENCY_HALF_LIFE), a path's
+   weight is the product of its edges, each hop keeps only the
+   strongest FANOUT neighbours of a page, and the walk stops after
+   BUDGET pages. It reads no page files; each page is visited once
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from datetime import date
+from typing import Optional
+
+FANOUT = (5, 3, 2)          # neighbours followed per page at hop 1, 2, 3+
+BUDGET = 10                 # pages returned by one walk
+RECENCY_HALF_LIFE = 90      # days for an edge's recency bonus to halve
+RECENCY_FLOOR = 0.5         # weight of an undated or very old edge
+
+WIKILINK = re.compile(r'\[\[([^\]]+)\]\]')
+DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+HEADER_SPLIT = re.compile(r'\n(?=#)')
+UNSAFE = re.compile(r'[^\w\s-]')
+
+
+def stem_of(name: str) -> str:
+    """Page stem for an entity name (core.sanitize_filename and core/knowledge.py use it too)."""
+    return UNSAFE.sub('', name).strip().replace(' ', '-')
+
+
+def later(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """The later of two ISO dates, either of which may be missing."""
+    if a is None or (b is not None and b > a):
+        return b
+    return a
+
+
+def page_links(content: str) -> dict[str, Optional[str]]:
+    """Stems a page links to -> latest timeline date the link appears under (None if undated)."""
+    links: dict[str, Optional[str]] = {}
+    for chunk in HEADER_SPLIT.split(content):
+        header, _, _ = chunk.partition("\n")
+        day = header[6:16] if header.startswith("### [[") and DATE.fullmatch(header[6:16]) else None
+        for link in WIKILINK.findall(chunk):
+            if DATE.fullmatch(link):
+                continue
+            target = stem_of(link)
+            links[target] = later(links.get(target), day)
+    return links
+
+
+def edge_weight(day: Optional[str], today: date) -> float:
+    """RECENCY_FLOOR for undated edges, rising to 1.0 for edges mentioned today."""
+    if not day:
+        return RECENCY_FLOOR
+    try:
+        age = (today - date.fromisoformat(day)).days
+    except ValueError:
+        return RECENCY_FLOOR
+    return RECENCY_FLOOR + (1.0 - RECENCY_FLOOR) * 0.5 ** (max(age, 0) / RECENCY_HALF_LIFE)
+
+
+class Adjacency:
+    """Neighbours of entity pages: wikilinks both ways (catalog) plus live triplets (graph store)."""
+
+    def __init__(self, catalog, store=None):
+        self.catalog = catalog
+        self.store = store
+
+    def neighbors(self, stem: str) -> dict[str, Optional[str]]:
+        """Neighbouring page stems -> latest date they were connected."""
+        edges = self.catalog.linked(stem)
+        if self.store is None:
+            return edges
+        related: dict[str, Optional[str]] = {}
+        for other, day in self.store.edges_of(stem.replace("-", " ")).items():
+            target = stem_of(other)
+            if target != stem:
+                related[target] = later(related.get(target), day or None)
+        for target in self.catalog.existing(related):
+            edges[target] = later(edges.get(target), related[target])
+        return edges
+
+    def walk(self, start: str, hops: int, fanout: tuple[int, ...] = FANOUT,
+             budget: int = BUDGET, today: Optional[date] = None) -> list[tuple[float, int, str]]:
+        """(weight, hop, stem) of the pages reached from `start` within `hops`, strongest first."""
+        today = today or date.today()
+        heap = [(-1.0, 0, start)]
+        done = set()
+        reached = []
+        while heap and len(reached) < budget:
+            negative, hop, stem = heapq.heappop(heap)
+            if stem in done:
+                continue  # already reached along a stronger path
+            done.add(stem)
+            if stem != start:
+                reached.append((-negative, hop, stem))
+            if hop >= hops:
+                continue
+            limit = fanout[min(hop, len(fanout) - 1)]
+            candidates = [
+                (edge_weight(day, today), neighbor)
+                for neighbor, day in self.neighbors(stem).items() if neighbor not in done
+            ]
+            for weight, neighbor in heapq.nlargest(limit, candidates):
+                heapq.heappush(heap, (negative * weight, hop + 1, neighbor))
+        return reached
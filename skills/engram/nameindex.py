@@ -0,0 +1,173 @@
+"""
+Name index — candidate pruning for fuzzy entity-name matching.
+
+Problem: recall scored the query against every entity name with
+fuzzy_score, whose fallbacks run a pure-Python Levenshtein over the whole
+name and then over every word pair, so a typo'd query cost
+O(entities x len^2) interpreted steps.
+
+Solution:
+1. Every way fuzzy_score can give a name a non-zero score has a lookup:
+   initials, exact text, substrings both ways (a NUL-joined blob searched
+   with str.find; the query's own substrings looked up by text), shared
+   words and word prefixes (word index, sorted vocabulary)
+2. The two edit-distance fallbacks go through padded-bigram postings
+   (over whole names and over name words). Strings within edit distance
+   k share at least max_len + 1 - 2k padded bigrams, so only those
+   reaching that count (and within k in length) are kept
+3. Only the surviving names are scored, with fuzzy_score itself (whose
+   Levenshtein is banded and stops at the threshold's distance), so
+   scores are exactly what a full pass would give
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterable
+
+from .recall import edit_limit, fuzzy_score
+
+PAD = "\x00"
+
+
+def bigrams(text: str) -> list[str]:
+    """Bigrams of the text padded with one PAD on each side (with repeats)."""
+    padded = f"{PAD}{text}{PAD}"
+    return [padded[i:i + 2] for i in range(len(padded) - 1)]
+
+
+class Grams:
+    """Padded-bigram postings over a list of strings, for edit-distance searches."""
+
+    def __init__(self, strings: list[str]):
+        self.strings = strings
+        self.lengths = array("I", map(len, strings))
+        postings: dict[str, array] = {}
+        for i, text in enumerate(strings):
+            for gram in bigrams(text):
+                entry = postings.get(gram)
+                if entry is None:
+                    entry = postings[gram] = array("I")
+                entry.append(i)
+        self.postings = postings
+        self.by_length: dict[int, list[int]] = {}
+        for i, length in enumerate(self.lengths):
+            self.by_length.setdefault(length, []).append(i)
+
+    def similar(self, text: str, threshold: float) -> list[str]:
+        """Strings that may be `threshold` similar to the text (a superset; scoring decides)."""
+        size = len(text)
+        need: dict[int, int] = {}
+        for length in self.by_length:
+            longest = max(size, length)
+            limit = edit_limit(longest, threshold)
+            if limit >= 0 and abs(size - length) <= limit:
+                need[length] = longest + 1 - 2 * limit
+        found = set()
+        counts: Counter = Counter()
+        for gram in set(bigrams(text)):
+            # Counts every repeat in the string: an upper bound on shared bigrams
+            counts.update(self.postings.get(gram, ()))
+        lengths = self.lengths
+        for i, count in counts.items():
+            n = need.get(lengths[i])
+            if n is not None and count >= n:
+                found.add(i)
+        for length, n in need.items():
+            if n <= 0:  # low thresholds: no bigram needs to be shared
+                found.update(self.by_length[length])
+        strings = self.strings
+        return [strings[i] for i in found]
+
+
+class NameIndex:
+    """Entity names indexed for fuzzy_score lookups."""
+
+    def __init__(self, names: Iterable[str]):
+        self.texts: dict[str, list[str]] = {}  # lowercased name -> names
+        self.initials: dict[str, list[str]] = {}
+        for name in names:
+            self.texts.setdefault(name.lower().strip(), []).append(name)
+            self.initials.setdefault("".join(w[0].upper() for w in name.split() if w), []).append(name)
+        texts = list(self.texts)
+        self.blob = PAD.join(texts)
+        self.starts = array("I")
+        offset = 0
+        for text in texts:
+            self.starts.append(offset)
+            offset += len(text) + 1
+        self.order = texts
+        self.lengths = {len(t) for t in texts}
+        self.words: dict[str, list[str]] = {}  # word -> lowercased names
+        for text in texts:
+            for word in set(text.split()):
+                self.words.setdefault(word, []).append(text)
+        self.vocabulary = sorted(self.words)
+        self.name_grams = Grams(texts)
+        self.word_grams = Grams([w for w in self.vocabulary if len(w) >= 3])
+
+    def __len__(self) -> int:
+        return sum(map(len, self.texts.values()))
+
+    def candidates(self, query: str, threshold: float = 0.6) -> set[str]:
+        """Lowercased names that fuzzy_score could give a non-zero score."""
+        q = query.strip().lower()
+        texts = self.texts
+        found = set()
+
+        # Exact, and names inside the query
+        for length in self.lengths:
+            for i in range(len(q) - length + 1):
+                if q[i:i + length] in texts:
+                    found.add(q[i:i + length])
+        # Query inside names
+        if not q:
+            found.update(texts)
+        elif PAD not in q:
+            blob, starts, order = self.blob, self.starts, self.order
+            pos = blob.find(q)
+            while pos >= 0:
+                index = bisect_right(starts, pos) - 1
+                found.add(order[index])
+                if index + 1 == len(order):
+                    break
+                pos = blob.find(q, starts[index + 1])
+
+        # Words, and word prefixes either way (3+ characters)
+        words = self.words
+        vocabulary = self.vocabulary
+        for qw in set(q.split()):
+            found.update(words.get(qw, ()))
+            if len(qw) < 3:
+                continue
+            for i in range(bisect_left(vocabulary, qw), len(vocabulary)):
+                if not vocabulary[i].startswith(qw):
+                    break
+                found.update(words[vocabulary[i]])
+            for end in range(3, len(qw)):
+                found.update(words.get(qw[:end], ()))
+            # Per-word Levenshtein
+            for word in self.word_grams.similar(qw, threshold):
+                found.update(words[word])
+
+        # Whole-name Levenshtein
+        if q:
+            found.update(self.name_grams.similar(q, threshold))
+        return found
+
+    def search(self, query: str, threshold: float = 0.6) -> dict[str, float]:
+        """Name -> fuzzy_score for every name scoring above zero."""
+        names = set()
+        q_orig = query.strip()
+        if len(q_orig) <= 5 and q_orig == q_orig.upper() and q_orig.isalpha():
+            names.update(self.initials.get(q_orig.upper(), ()))
+        for text in self.candidates(query, threshold):
+            names.update(self.texts[text])
+        scores = {}
+        for name in names:
+            score = fuzzy_score(query, name, threshold)
+            if score:
+                scores[name] = score
+        return scores
@@ -177,22 +177,26 @@ class PredictionErrorEngine:
         if not self.entities_dir.exists():
             return "(no entities)"
         
+        from .catalog import open_catalog
+        
         entity_text = ""
-        for f in sorted(self.entities_dir.glob("*.md")):
-            content = f.read_text()
-            if len(entity_text) + len(content) > max_chars:
+        for meta in open_catalog(self.entities_dir):
+            if len(entity_text) + meta.chars > max_chars:
                 break
-            entity_text += f"### {f.stem}\n{content[:500]}\n\n"
+            try:
+                with open(self.entities_dir / f"{meta.stem}.md") as f:
+                    entity_text += f"### {meta.stem}\n{f.read(500)}\n\n"
+            except FileNotFoundError:
+                continue  # removed since the catalog last saw it
         return entity_text or "(no entities)"
 
     def _read_daily_log(self, date_str: str, max_chars: int = 6000) -> str:
         """Read the daily log for a given date, with pre-filtering for large files."""
-        path = self.memory_dir / f"{date_str}.md"
-        if not path.exists():
+        from .journal import read_daily
+        content = read_daily(self.memory_dir, date_str)
+        if not content:
             return ""
         
-        content = path.read_text()
-        
         # For large files, pre-filter to remove noise
         if len(content) > max_chars:
             try:
@@ -289,12 +293,13 @@ class PredictionErrorEngine:
             return []
         
         events = []
-        for line in self.scores_file.read_text().strip().split('\n'):
-            if line:
-                try:
-                    events.append(PredictionErrorEvent.from_dict(json.loads(line)))
-                except:
-                    pass
+        with open(self.scores_file) as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        events.append(PredictionErrorEvent.from_dict(json.loads(line)))
+                    except:
+                        pass
         return events
 
     def learning_rate(self, days: int = 7) -> float:
@@ -1,12 +1,21 @@
 """Graph-aware recall — query the knowledge graph."""
 
-import json
+import heapq
+import math
+import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from .config import EngramConfig
 
+TOP_K = 10             # matches kept by RecallEngine.match
+CONTENT_WEIGHT = 0.6   # content score of the most relevant page
+PHRASE_BOOST = 1.5     # relevance factor for pages containing the query as a phrase
+GRAPH_LIMIT = 20       # most recent matching triplets shown by recall
+ACCESS_WEIGHT = 0.1    # most a match's score can gain from being recalled often
+ACCESS_SATURATION = 50  # recalls that earn the whole boost
+
 
 def levenshtein(s1: str, s2: str) -> int:
     """Compute Levenshtein edit distance between two strings."""
@@ -29,6 +38,54 @@ def levenshtein(s1: str, s2: str) -> int:
     return prev_row[-1]
 
 
+def edit_limit(length: int, threshold: float) -> int:
+    """Largest edit distance between strings (the longer `length` long) that is still `threshold` similar."""
+    limit = min(length, int((1.0 - threshold) * length) + 1)
+    while limit >= 0 and 1.0 - (limit / length if length else 0.0) < threshold:
+        limit -= 1
+    return limit
+
+
+def bounded_levenshtein(s1: str, s2: str, limit: int) -> int:
+    """Levenshtein distance if it is at most `limit`, otherwise limit + 1.
+    
+    Only cells within `limit` of the diagonal are computed, and it stops
+    as soon as a whole row is over the limit.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    n2 = len(s2)
+    over = limit + 1
+    if len(s1) - n2 > limit:
+        return over
+    if s1 == s2:
+        return 0
+    if n2 == 0:
+        return len(s1)
+    prev = [j if j <= limit else over for j in range(n2 + 1)]
+    for i, c1 in enumerate(s1, 1):
+        curr = [over] * (n2 + 1)
+        if i <= limit:
+            curr[0] = best = i
+            lo = 1
+        else:
+            best = over
+            lo = i - limit
+        for j in range(lo, min(n2, i + limit) + 1):
+            cost = prev[j - 1] if c1 == s2[j - 1] else prev[j - 1] + 1
+            if prev[j] < cost:
+                cost = prev[j] + 1
+            if curr[j - 1] < cost:
+                cost = curr[j - 1] + 1
+            curr[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        prev = curr
+    return min(prev[n2], over)
+
+
 def fuzzy_score(query: str, target: str, threshold: float = 0.6) -> float:
     """Score how well query matches target. Returns 0.0-1.0.
     
@@ -81,7 +138,7 @@ def fuzzy_score(query: str, target: str, threshold: float = 0.6) -> float:
     # Levenshtein distance (normalized)
     max_len = max(len(q), len(t))
     if max_len > 0:
-        dist = levenshtein(q, t)
+        dist = bounded_levenshtein(q, t, edit_limit(max_len, threshold))
         similarity = 1.0 - (dist / max_len)
         if similarity >= threshold:
             return similarity * 0.6  # Scale down so fuzzy never beats exact
@@ -92,8 +149,9 @@ def fuzzy_score(query: str, target: str, threshold: float = 0.6) -> float:
         for qw in q_words:
             for tw in t_words:
                 if len(qw) >= 3 and len(tw) >= 3:
-                    wdist = levenshtein(qw, tw)
-                    wsim = 1.0 - (wdist / max(len(qw), len(tw)))
+                    longest = max(len(qw), len(tw))
+                    wdist = bounded_levenshtein(qw, tw, edit_limit(longest, threshold))
+                    wsim = 1.0 - (wdist / longest)
                     best_word_score = max(best_word_score, wsim)
         if best_word_score >= threshold:
             return best_word_score * 0.5
@@ -101,118 +159,233 @@ def fuzzy_score(query: str, target: str, threshold: float = 0.6) -> float:
     return 0.0
 
 
-def recall(query: str, config: EngramConfig, hops: int = 1) -> str:
-    """
-    Query the engram knowledge graph with fuzzy matching.
-    
-    1. Fuzzy-match entity files by name
-    2. Search entity content for query terms
-    3. Load matching entity pages
-    4. Follow wikilinks for N hops
-    5. Search graph.jsonl for related triplets
-    6. Return formatted context
-    """
-    results = []
-    
-    # Normalize query
-    query_lower = query.lower()
-    query_words = set(query_lower.split())
-    
-    # Load aliases
-    try:
-        from .aliases import load_aliases, resolve_name
-        aliases = load_aliases(config.entities_dir)
-        # Check if query matches an alias
-        resolved = resolve_name(query, aliases)
-        if resolved != query:
-            query = resolved
-            query_lower = query.lower()
-            query_words = set(query_lower.split())
-    except ImportError:
-        pass
-    
-    # Search entity files with fuzzy matching
-    matching_entities = []
-    for entity_file in sorted(config.entities_dir.glob("*.md")):
-        name = entity_file.stem.replace("-", " ")
-        content = entity_file.read_text()
+class RecallEngine:
+    """Recall over the catalog's inverted index: pages are only read once they are returned."""
+
+    def __init__(self, config: EngramConfig, sweep: bool = True):
+        from .access import access_counter
+        from .catalog import Catalog
+        self.config = config
+        self.catalog = Catalog(config.entities_dir)
+        self.access = access_counter(config.entities_dir)
+        self.recalled: Optional[list[str]] = None  # pages recalled, while a caller collects them
+        self._access: Optional[tuple] = None
+        self.sweep = sweep  # off when something else keeps the catalog current (engram serve)
+        self._aliases: Optional[tuple] = None
+        self._pages: Optional[dict[str, str]] = None  # page cache while recall_many runs
+        self._cached: dict[str, tuple[int, str]] = {}  # stem -> (mtime, page), see page()
+        self.stems: dict[int, str] = {}         # page id -> stem, as of the name index
+        self._docs: dict[str, list[int]] = {}   # name -> page ids
+        self._names = None
+        self._names_version = None
+
+    def refresh(self):
+        """Pick up page changes and logged accesses (see catalog.open_catalog)."""
+        if self.sweep:
+            if not self.catalog.fresh():
+                self.catalog.reconcile()
+            self.catalog.fold_access()
+
+    def access_counts(self) -> dict[int, int]:
+        """Page id -> access count, reloaded when the catalog changes."""
+        version = self.catalog.version()
+        if self._access is None or self._access[0] != version:
+            self._access = (version, self.catalog.access_counts())
+        return self._access[1]
+
+    def aliases(self) -> dict[str, str]:
+        """Alias map, reloaded when .aliases.json changes."""
+        from .aliases import load_aliases
+        try:
+            mtime = (self.config.entities_dir / ".aliases.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._aliases is None or self._aliases[0] != mtime:
+            self._aliases = (mtime, load_aliases(self.config.entities_dir))
+        return self._aliases[1]
+
+    @property
+    def names(self):
+        """NameIndex over entity names, rebuilt when pages are added or removed."""
+        from .nameindex import NameIndex
+        version = self.catalog.names_version()
+        if self._names is None or version != self._names_version:
+            self.stems = self.catalog.stems()
+            self._docs = {}
+            for doc, stem in self.stems.items():
+                self._docs.setdefault(stem.replace("-", " "), []).append(doc)
+            self._names = NameIndex(self._docs)
+            self._names_version = version
+        return self._names
+
+    def match(self, query: str, limit: int = TOP_K) -> list[tuple[float, str, str]]:
+        """The `limit` best (score, name, stem) matches scoring above 0.1, best first.
         
-        # Fuzzy name match
-        name_score = fuzzy_score(query, name)
+        Name: fuzzy_score against the entity name (via the name index).
+        Content: BM25F relevance of the page to the query's words (times
+        PHRASE_BOOST if it contains them as a phrase), scaled so the most
+        relevant page gets CONTENT_WEIGHT. Blended as
+        name + (1 - name) * content, so an exact name match stays on top.
+        Pages recalled before gain up to ACCESS_WEIGHT of what is left,
+        growing with the log of their access count.
+        """
+        from .textindex import tokenize
+        self.refresh()
+        scores = self.names.search(query)
+        text = self.catalog.text
+        tokens = tokenize(query)
+        relevance = text.bm25(tokens)
+        if len(tokens) > 1:
+            for doc in text.phrase_docs(tokens):
+                relevance[doc] *= PHRASE_BOOST
+        best = max(relevance.values(), default=0.0)
+        accessed = self.access_counts()
         
-        # Content match (lower priority)
-        content_score = 0.0
-        if query_lower in content.lower():
-            content_score = 0.5
-        elif any(w in content.lower() for w in query_words if len(w) >= 3):
-            content_score = 0.1
+        docs = set(relevance)
+        for name in scores:
+            docs.update(self._docs[name])
+        matches = []
+        for doc in docs:
+            stem = self.stems.get(doc)
+            if stem is None:
+                continue  # added since the name index was built
+            name = stem.replace("-", " ")
+            score = scores.get(name, 0.0)
+            if doc in relevance:
+                score += (1.0 - score) * CONTENT_WEIGHT * relevance[doc] / best
+            if score > 0.1:  # Minimum threshold
+                uses = accessed.get(doc)
+                if uses:
+                    reinforced = min(1.0, math.log1p(uses) / math.log1p(ACCESS_SATURATION))
+                    score += (1.0 - score) * ACCESS_WEIGHT * reinforced
+                matches.append((score, name, stem))
+        return heapq.nlargest(limit, matches)
+
+    def adjacency(self):
+        """Wikilink and triplet neighbours of pages (see links.Adjacency)."""
+        from .graph import open_store
+        from .links import Adjacency
+        graph_file = self.config.graph_file
+        return Adjacency(self.catalog, open_store(graph_file) if graph_file.exists() else None)
+
+    def read(self, stem: str) -> str:
+        if self._pages is None:
+            return (self.config.entities_dir / f"{stem}.md").read_text()
+        page = self._pages.get(stem)
+        if page is None:
+            page = self._pages[stem] = (self.config.entities_dir / f"{stem}.md").read_text()
+        return page
+
+    def page(self, stem: str) -> str:
+        """A page's text for long-lived callers, read again only when the file changed."""
+        path = self.config.entities_dir / f"{stem}.md"
+        mtime = path.stat().st_mtime_ns
+        cached = self._cached.get(stem)
+        if cached is None or cached[0] != mtime:
+            cached = self._cached[stem] = (mtime, path.read_text())
+        return cached[1]
+
+    def recall_many(self, queries: Iterable[str], hops: int = 1) -> dict[str, str]:
+        """recall() for several queries: one freshness check and name index, each page read once."""
+        self.refresh()
+        sweep, self.sweep = self.sweep, False
+        self._pages = {}
+        try:
+            return {query: self.recall(query, hops) for query in dict.fromkeys(queries)}
+        finally:
+            self.sweep = sweep
+            self._pages = None
+
+    def recall(self, query: str, hops: int = 1) -> str:
+        """
+        Query the engram knowledge graph with fuzzy matching.
         
-        score = max(name_score, content_score)
+        1. Rank entities by name match and BM25F content relevance
+        2. Load the best matching entity page
+        3. Walk wikilinks and triplet edges for N hops (best-first, recent
+           edges first, at most links.BUDGET pages), reading each page once
+        4. Search graph.jsonl for related triplets (the GRAPH_LIMIT most recent)
+        5. Return formatted context
+        """
+        config = self.config
+        results = []
         
-        if score > 0.1:  # Minimum threshold
-            matching_entities.append((score, name, content, entity_file))
-    
-    matching_entities.sort(reverse=True)
-    
-    if not matching_entities:
-        results.append(f"No entities found matching '{query}'")
-        # Fall back to graph search
+        # Load aliases
+        try:
+            from .aliases import resolve_name
+            # Check if query matches an alias
+            query = resolve_name(query, self.aliases())
+        except ImportError:
+            pass
+        
+        # Top match: the best one whose page is still there
+        top = None
+        for _, _, stem in self.match(query):
+            try:
+                top = stem, self.read(stem)
+                break
+            except FileNotFoundError:
+                self.catalog.drop(stem)  # removed since the catalog last saw it
+        
+        if top is None:
+            results.append(f"No entities found matching '{query}'")
+            # Fall back to graph search
+            graph_results = search_graph(query, config)
+            if graph_results:
+                results.append("\n**Graph matches:**")
+                results.extend(graph_results)
+            return "\n".join(results)
+        
+        top_stem, top_content = top
+        results.append(top_content)
+        self.access.record(top_stem)
+        if self.recalled is not None:
+            self.recalled.append(top_stem)
+        
+        # Pages around the top match, up to `hops` links or triplets away
+        if hops >= 1:
+            for weight, hop, stem in self.adjacency().walk(top_stem, hops):
+                try:
+                    link_content = self.read(stem)
+                except FileNotFoundError:
+                    continue  # removed since the catalog last saw it
+                # Only include summary (first few lines)
+                summary_lines = link_content.split("\n")[:8]
+                via = "" if hop == 1 else f" ({hop} hops)"
+                results.append(f"\n---\n**Linked{via}: [[{stem.replace('-', ' ')}]]**")
+                results.append("\n".join(summary_lines))
+        
+        # Add relevant triplets
         graph_results = search_graph(query, config)
         if graph_results:
-            results.append("\n**Graph matches:**")
+            results.append("\n---\n**Graph connections:**")
             results.extend(graph_results)
+        
         return "\n".join(results)
-    
-    # Top match
-    top_score, top_name, top_content, _ = matching_entities[0]
-    results.append(top_content)
-    
-    # Follow wikilinks for hop 1
-    if hops >= 1:
-        linked = extract_wikilinks(top_content)
-        for link in linked[:5]:  # Max 5 linked entities
-            link_file = config.entities_dir / f"{link.replace(' ', '-')}.md"
-            if link_file.exists():
-                link_content = link_file.read_text()
-                # Only include summary (first few lines)
-                summary_lines = link_content.split("\n")[:8]
-                results.append(f"\n---\n**Linked: [[{link}]]**")
-                results.append("\n".join(summary_lines))
-    
-    # Add relevant triplets
-    graph_results = search_graph(query, config)
-    if graph_results:
-        results.append("\n---\n**Graph connections:**")
-        results.extend(graph_results)
-    
-    return "\n".join(results)
 
 
-def search_graph(query: str, config: EngramConfig) -> list[str]:
-    """Search graph.jsonl for matching triplets."""
+def recall(query: str, config: EngramConfig, hops: int = 1) -> str:
+    """Query the engram knowledge graph (see RecallEngine.recall)."""
+    return RecallEngine(config).recall(query, hops)
+
+
+def recall_many(queries: Iterable[str], config: EngramConfig, hops: int = 1) -> dict[str, str]:
+    """Recall several queries in one pass: query -> result (see RecallEngine.recall_many)."""
+    return RecallEngine(config).recall_many(queries, hops)
+
+
+def search_graph(query: str, config: EngramConfig, limit: int = GRAPH_LIMIT) -> list[str]:
+    """Search graph.jsonl for matching triplets (the `limit` most recent)."""
     if not config.graph_file.exists():
         return []
-    
-    query_lower = query.lower()
-    matches = []
-    
-    for line in config.graph_file.read_text().strip().split("\n"):
-        if not line:
-            continue
-        try:
-            t = json.loads(line)
-            # Check if query matches subject, object, or detail
-            if (query_lower in t.get("subject", "").lower() or
-                query_lower in t.get("object", "").lower() or
-                query_lower in t.get("detail", "").lower()):
-                matches.append(
-                    f"- [{t.get('date', '?')}] {t['subject']} → {t['predicate']} → {t['object']}"
-                    + (f" ({t['detail']})" if t.get("detail") else "")
-                )
-        except json.JSONDecodeError:
-            continue
-    
-    return matches
+
+    from .graph import format_triplet, open_store
+    # Matches query against subject, object, or detail
+    triplets = open_store(config.graph_file).search(query, limit + 1)
+    lines = [format_triplet(t) for t in triplets[-limit:]]
+    if len(triplets) > limit:
+        lines.insert(0, "- … (older matches omitted)")
+    return lines
 
 
 def extract_wikilinks(text: str) -> list[str]:
@@ -228,23 +401,18 @@ def extract_wikilinks(text: str) -> list[str]:
     return unique
 
 
-def list_entities(config: EngramConfig) -> list[dict]:
-    """List all entities with their types."""
-    entities = []
-    for f in sorted(config.entities_dir.glob("*.md")):
-        content = f.read_text()
-        entity_type = "unknown"
-        type_match = re.search(r'\*\*Type:\*\*\s*(\w+)', content)
-        if type_match:
-            entity_type = type_match.group(1)
-        
-        # Count timeline entries
-        timeline_count = len(re.findall(r'### \[\[', content))
-        
-        entities.append({
-            "name": f.stem.replace("-", " "),
-            "type": entity_type,
-            "file": str(f),
-            "timeline_entries": timeline_count,
-        })
-    return entities
+def list_entities(config: EngramConfig, catalog=None) -> list[dict]:
+    """List all entities with their types (from the catalog, not the pages)."""
+    from .catalog import open_catalog
+    if catalog is None:
+        catalog = open_catalog(config.entities_dir)
+    base = str(config.entities_dir)
+    return [
+        {
+            "name": meta.name,
+            "type": meta.type,
+            "file": os.path.join(base, f"{meta.stem}.md"),
+            "timeline_entries": meta.timeline,
+        }
+        for meta in catalog.entries()
+    ]
@@ -0,0 +1,235 @@
+"""
+Text index — inverted index and BM25F scoring over entity pages.
+
+Problem: recall() read and lowercased every entity page for every query
+to look for the query text, so latency grew with the knowledge base and
+was dominated by disk. Pages that did match all got the same flat score
+(0.5 for the phrase, 0.1 for a shared word), so which of them came first
+was close to arbitrary.
+
+Solution:
+1. Pages are tokenized into lowercased word tokens; each (token, page)
+   posting stores the token's positions in the page and how often it
+   occurs in each field: ## Facts, the timeline (## Timeline and the
+   ### [[date]] sections), ## Relations, and everything else
+2. Postings live in the catalog database and are rewritten whenever the
+   catalog records a page change (engram writes and the mtime reconciler).
+   Triggers keep the term statistics BM25 needs next to them: document
+   frequency per token, field lengths per page and their totals
+3. A phrase is found by chaining positions. Relevance is BM25F: field
+   weights (FIELD_WEIGHTS) and per-field length normalization, computed
+   per term inside SQLite from those statistics. Query words of 3+
+   characters also match longer tokens they prefix, at a discount
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+from array import array
+from typing import Iterable
+
+TOKEN_RE = re.compile(r"\w+")
+HEADER_SPLIT = re.compile(r"\n(?=#)")
+
+FIELDS = ("facts", "timeline", "relations", "body")
+FACTS, TIMELINE, RELATIONS, BODY = range(len(FIELDS))
+SECTION_FIELDS = {"facts": FACTS, "timeline": TIMELINE, "relations": RELATIONS}
+# Facts are curated statements about the entity, relations name what it is
+# linked to; timeline lines are day-by-day mentions that pile up over time
+FIELD_WEIGHTS = {"facts": 2.0, "timeline": 1.0, "relations": 1.5, "body": 1.0}
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.5   # a query word matching the start of a longer token
+MAX_EXPANSIONS = 32   # longer tokens per query word (most frequent first)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    facts INTEGER NOT NULL,
+    timeline INTEGER NOT NULL,
+    relations INTEGER NOT NULL,
+    body INTEGER NOT NULL,
+    PRIMARY KEY (token, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc);
+CREATE TABLE IF NOT EXISTS terms (
+    token TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS doclens (
+    doc INTEGER PRIMARY KEY,
+    facts INTEGER NOT NULL,
+    timeline INTEGER NOT NULL,
+    relations INTEGER NOT NULL,
+    body INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fieldstats (
+    docs INTEGER NOT NULL,
+    facts INTEGER NOT NULL,
+    timeline INTEGER NOT NULL,
+    relations INTEGER NOT NULL,
+    body INTEGER NOT NULL
+);
+INSERT INTO fieldstats SELECT 0, 0, 0, 0, 0 WHERE NOT EXISTS (SELECT 1 FROM fieldstats);
+CREATE TRIGGER IF NOT EXISTS postings_added AFTER INSERT ON postings BEGIN
+    INSERT INTO terms (token, df) VALUES (NEW.token, 1) ON CONFLICT (token) DO UPDATE SET df = df + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS postings_removed AFTER DELETE ON postings BEGIN
+    UPDATE terms SET df = df - 1 WHERE token = OLD.token;
+    DELETE FROM terms WHERE token = OLD.token AND df <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS doclens_added AFTER INSERT ON doclens BEGIN
+    UPDATE fieldstats SET docs = docs + 1, facts = facts + NEW.facts, timeline = timeline + NEW.timeline,
+        relations = relations + NEW.relations, body = body + NEW.body;
+END;
+CREATE TRIGGER IF NOT EXISTS doclens_removed AFTER DELETE ON doclens BEGIN
+    UPDATE fieldstats SET docs = docs - 1, facts = facts - OLD.facts, timeline = timeline - OLD.timeline,
+        relations = relations - OLD.relations, body = body - OLD.body;
+END;
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def analyze(content: str) -> tuple[dict[str, list], list[int]]:
+    """Token -> [positions, facts, timeline, relations, body counts], and the field lengths."""
+    entries: dict[str, list] = {}
+    lengths = [0] * len(FIELDS)
+    position = 0
+    field = BODY
+    for chunk in HEADER_SPLIT.split(content.lower()):
+        if chunk.startswith("## "):
+            field = SECTION_FIELDS.get(chunk.partition("\n")[0][3:].strip(), BODY)
+        elif chunk.startswith("### [["):
+            field = TIMELINE
+        elif chunk.startswith("# "):
+            field = BODY
+        tokens = TOKEN_RE.findall(chunk)
+        lengths[field] += len(tokens)
+        slot = field + 1
+        for token in tokens:
+            entry = entries.get(token)
+            if entry is None:
+                entry = entries[token] = [array("I"), 0, 0, 0, 0]
+            entry[0].append(position)
+            entry[slot] += 1
+            position += 1
+    return entries, lengths
+
+
+class TextIndex:
+    """Posting lists stored next to the catalog rows they index (same connection)."""
+
+    TABLES = ("postings", "terms", "doclens", "fieldstats")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        conn.executescript(SCHEMA)
+
+    def index(self, doc: int, content: str):
+        """(Re)index a page. Run inside the caller's transaction."""
+        self.remove(doc)
+        entries, lengths = analyze(content)
+        self._conn.executemany(
+            "INSERT INTO postings (token, doc, positions, facts, timeline, relations, body)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((token, doc, pos.tobytes(), *counts) for token, (pos, *counts) in entries.items()),
+        )
+        self._conn.execute("INSERT INTO doclens (doc, facts, timeline, relations, body) VALUES (?, ?, ?, ?, ?)",
+                           (doc, *lengths))
+
+    def remove(self, doc: int):
+        self._conn.execute("DELETE FROM postings WHERE doc = ?", (doc,))
+        self._conn.execute("DELETE FROM doclens WHERE doc = ?", (doc,))
+
+    def docs(self, token: str) -> set[int]:
+        """Pages containing a token."""
+        return {d for (d,) in self._conn.execute("SELECT doc FROM postings WHERE token = ?", (token,))}
+
+    def _positions(self, token: str, docs: Iterable[int]) -> dict[int, set[int]]:
+        docs = list(docs)
+        result = {}
+        for i in range(0, len(docs), 500):
+            chunk = docs[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT doc, positions FROM postings WHERE token = ? AND doc IN ({','.join('?' * len(chunk))})",
+                (token, *chunk),
+            )
+            for doc, blob in rows:
+                pos = array("I")
+                pos.frombytes(blob)
+                result[doc] = set(pos)
+        return result
+
+    def phrase_docs(self, tokens: list[str]) -> set[int]:
+        """Pages containing the tokens consecutively."""
+        if not tokens:
+            return set()
+        if len(tokens) == 1:
+            return self.docs(tokens[0])
+        # Start from the rarest token, then keep only pages that have all of them
+        candidates = None
+        for token in sorted(set(tokens), key=self.df):
+            docs = self.docs(token)
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return set()
+        starts = self._positions(tokens[0], candidates)
+        for offset, token in enumerate(tokens[1:], 1):
+            following = self._positions(token, starts)
+            starts = {
+                doc: kept for doc, first in starts.items()
+                if (kept := {p for p in first if p + offset in following.get(doc, ())})
+            }
+        return set(starts)
+
+    def df(self, token: str) -> int:
+        """Number of pages containing a token."""
+        row = self._conn.execute("SELECT df FROM terms WHERE token = ?", (token,)).fetchone()
+        return row[0] if row else 0
+
+    def terms(self, tokens: Iterable[str]) -> dict[str, tuple[int, float]]:
+        """Index tokens a query's words match: token -> (document frequency, weight)."""
+        terms = {}
+        for token in dict.fromkeys(tokens):
+            df = self.df(token)
+            if df:
+                terms[token] = (df, 1.0)
+            if len(token) < 3:
+                continue
+            rows = self._conn.execute(
+                "SELECT token, df FROM terms WHERE token > ? AND token < ? ORDER BY df DESC LIMIT ?",
+                (token, token + "\U0010ffff", MAX_EXPANSIONS),
+            )
+            for longer, df in rows:
+                terms.setdefault(longer, (df, PREFIX_WEIGHT))
+        return terms
+
+    def bm25(self, tokens: Iterable[str]) -> dict[int, float]:
+        """BM25F relevance of every page matching any of the tokens."""
+        docs, *totals = self._conn.execute(
+            "SELECT docs, facts, timeline, relations, body FROM fieldstats"
+        ).fetchone()
+        if not docs:
+            return {}
+        # Per field: weight * tf / ((1 - B) + B * length / average length)
+        norms, params = [], []
+        for field, total in zip(FIELDS, totals):
+            norms.append(f"? * p.{field} / (? + ? * d.{field})")
+            params += [FIELD_WEIGHTS[field], 1.0 - B, B * docs / total if total else 0.0]
+        query = (
+            f"SELECT doc, ? * tf / (? + tf) FROM (SELECT p.doc AS doc, {' + '.join(norms)} AS tf"
+            " FROM postings p JOIN doclens d ON d.doc = p.doc WHERE p.token = ?)"
+        )
+        scores: dict[int, float] = {}
+        for token, (df, weight) in self.terms(tokens).items():
+            idf = math.log(1.0 + (docs - df + 0.5) / (df + 0.5)) * weight
+            for doc, score in self._conn.execute(query, (idf, K1, *params, token)):
+                scores[doc] = scores.get(doc, 0.0) + score
+        return scores
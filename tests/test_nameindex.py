@@ -0,0 +1,81 @@
+"""NameIndex must rank names exactly as scoring every name with fuzzy_score did."""
+
+import random
+import string
+
+import pytest
+
+from skills.engram import recall
+from skills.engram.nameindex import NameIndex
+from skills.engram.recall import fuzzy_score, levenshtein
+
+WORDS = [
+    "peter", "steinberger", "marcus", "widing", "openclaw", "greptile", "sana", "labs",
+    "anna", "tanaka", "kafka", "cluster", "project", "atlas", "bob", "al", "x", "go",
+    "stein", "berg", "ann", "deep", "mind", "rust", "lang", "data", "dog", "road", "map",
+]
+
+
+def random_name(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.choice([1, 1, 2, 2, 3]))]
+    if rng.random() < 0.3:
+        words.append(str(rng.randint(1, 99)))
+    return " ".join(w.capitalize() if rng.random() < 0.7 else w for w in words)
+
+
+def typo(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(1, 3)):
+        op = rng.randrange(3)
+        i = rng.randrange(len(chars) + 1)
+        if op == 0:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif chars and op == 1:
+            del chars[min(i, len(chars) - 1)]
+        elif chars:
+            chars[min(i, len(chars) - 1)] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def random_query(rng: random.Random, names: list[str]) -> str:
+    name = rng.choice(names)
+    kind = rng.randrange(7)
+    if kind == 0:
+        return name
+    if kind == 1:
+        return typo(rng, name.lower())
+    if kind == 2:
+        start = rng.randrange(len(name))
+        return name[start:start + rng.randint(1, 8)]
+    if kind == 3:
+        return "".join(w[0].upper() for w in name.split())
+    if kind == 4:
+        return typo(rng, rng.choice(name.split()))
+    if kind == 5:
+        return f"{rng.choice(WORDS)} {typo(rng, rng.choice(WORDS))}"
+    return "".join(rng.choice(string.ascii_letters + " ") for _ in range(rng.randint(1, 12)))
+
+
+def full_pass(query: str, names: list[str], threshold: float) -> dict[str, float]:
+    """The old way: every name through fuzzy_score, with an unbounded Levenshtein."""
+    scores = {}
+    for name in names:
+        score = fuzzy_score(query, name, threshold)
+        if score:
+            scores[name] = score
+    return scores
+
+
+@pytest.mark.parametrize("threshold, count", [(0.6, 1500), (0.4, 300)])
+def test_search_matches_full_fuzzy_pass(monkeypatch, threshold, count):
+    rng = random.Random(43)
+    names = sorted({random_name(rng) for _ in range(120)})
+    index = NameIndex(names)
+    queries = [random_query(rng, names) for _ in range(count)]
+
+    found = {q: index.search(q, threshold) for q in queries}
+    monkeypatch.setattr(recall, "bounded_levenshtein", lambda s1, s2, limit: levenshtein(s1, s2))
+    for query in queries:
+        expected = full_pass(query, names, threshold)
+        # Same names with the same scores, so the same ranking
+        assert found[query] == expected, query
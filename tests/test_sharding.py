@@ -0,0 +1,94 @@
+"""
+Several bot processes sharing one memory/ directory.
+
+Each worker stands in for a shard's gateway: it sees the same stream of
+messages (in its own order, as after a reconnect or overlapping shards),
+claims each through SharedStore and logs the ones it won through
+MemoryManager, as AgentBot.on_message does.
+"""
+
+import json
+import random
+import multiprocessing as mp
+from pathlib import Path
+
+from core.journal import INDEX_RECORD
+from core.memory import MemoryManager
+from core.store import SharedStore
+
+PROCESSES = 6
+MESSAGES = 120
+BODY = 3000  # characters per message, well past a single small write
+
+
+def message(i: int) -> str:
+    return f"<{i}>" + chr(ord("a") + i % 26) * BODY + f"</{i}>"
+
+
+def gateway(worker: int, memory_dir: Path, start, claimed):
+    store = SharedStore(memory_dir / "swarm.db")
+    memory = MemoryManager(memory_dir)
+    ids = list(range(MESSAGES))
+    random.Random(worker).shuffle(ids)
+    won = []
+    start.wait()
+    for i in ids:
+        if store.claim(f"message:{i}", f"node{worker}"):
+            memory.log_interaction(f"agent{worker}", "general", "user", message(i), f"reply {i}")
+            won.append(i)
+    store.close()
+    claimed.put(won)
+
+
+def test_each_message_is_handled_once_and_logged_whole(tmp_path):
+    ctx = mp.get_context("fork")
+    start = ctx.Barrier(PROCESSES)
+    claimed = ctx.Queue()
+    workers = [
+        ctx.Process(target=gateway, args=(n, tmp_path, start, claimed)) for n in range(PROCESSES)
+    ]
+    for worker in workers:
+        worker.start()
+    won = [i for _ in workers for i in claimed.get(timeout=120)]
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    # Exactly one claim per message
+    assert sorted(won) == list(range(MESSAGES))
+
+    daily = tmp_path / "daily"
+    records = []
+    for path in sorted(daily.glob("*.jsonl")):  # more than one if the run crosses midnight
+        data = path.read_bytes()
+        lines = data.splitlines(keepends=True)
+        assert all(line.endswith(b"\n") for line in lines)
+        records += [json.loads(line) for line in lines]
+
+        # Index offsets land on record boundaries
+        starts = {0}
+        for line in lines[:-1]:
+            starts.add(max(starts) + len(line))
+        index = path.with_suffix(".idx").read_bytes()
+        offsets = [INDEX_RECORD.unpack_from(index, n)[1] for n in range(0, len(index), INDEX_RECORD.size)]
+        assert sorted(offsets) == sorted(starts)
+
+    assert sorted(int(r["message"][1:r["message"].index(">")]) for r in records) == list(range(MESSAGES))
+    for r in records:
+        i = int(r["message"][1:r["message"].index(">")])
+        assert r["message"] == message(i)
+        assert r["response"] == f"reply {i}"
+
+    # Markdown view: one header per file, every entry whole
+    entries = 0
+    for path in sorted(daily.glob("*.md")):
+        text = path.read_text()
+        day = path.stem
+        assert text.startswith(f"# {day}\n") and text.count(f"# {day}\n") == 1
+        for block in text.split("\n### ")[1:]:
+            heading, user_line, agent_line = block.rstrip("\n").split("\n")
+            i = int(user_line.split("<", 1)[1].split(">", 1)[0])
+            assert user_line == f"**user:** {message(i)[:200]}"
+            assert agent_line.endswith(f":** reply {i}")
+            entries += 1
+    assert entries == MESSAGES
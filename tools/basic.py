@@ -68,6 +68,32 @@ def write_file(path: str, content: str) -> str:
     return f"Written to {path}"
 
 
+@tool(description="Search daily memory logs; returns BM25-ranked snippets")
+def search_memory(
+    query: str,
+    agent: str = None,
+    channel: str = None,
+    since: str = None,
+    until: str = None,
+    limit: int = 10,
+) -> str:
+    """Full-text search over memory/daily/. Dates are YYYY-MM-DD, inclusive."""
+    from core.memory import MemoryManager
+    manager = MemoryManager()
+    results = manager.index.search(query, agent=agent, channel=channel, since=since, until=until, limit=limit)
+    if not results:
+        return f"No memory entries match '{query}'"
+    return "\n".join(str(r) for r in results)
+
+
+@tool(description="Show LLM token and cost usage rollups")
+def usage_stats(day: str = None, by: str = "agent,model") -> str:
+    """Summarize memory/usage.jsonl, optionally for one day (YYYY-MM-DD)."""
+    from core.usage import rollup, format_rollup
+    keys = tuple(k.strip() for k in by.split(",") if k.strip())
+    return format_rollup(rollup(day=day, by=keys), keys)
+
+
 @tool(description="Execute a shell command (use with caution)")
 def shell(command: str) -> str:
     """Execute a shell command and return output. Timeout: 30s."""